@@ -0,0 +1,82 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+ALOHA: A(IBoM) tooL generatOr from Hugging fAce.
+
+Generates AI Bills of Materials in CycloneDX 1.6 format for models hosted on Hugging Face:
+
+    import aloha
+    bom = aloha.generate_aibom("bigcode/starpii")
+
+Importing the package has no side effects and does not import requests, which is loaded
+on the first HTTP request.
+"""
+
+from .bom import build_aibom, generate_aibom, generate_cyclonedx_component, get_model_data
+from .cache import ResponseCache
+from .canonical import bom_content_hash, canonicalize
+from .dataset import DatasetRegistry, generate_dataset_component
+from .diff import diff_aibom_sources, diff_aiboms, iter_aiboms
+from .discovery import iter_hub_models
+from .exceptions import ALOHAError, FetchError, LicenseListError, ModelNotFoundError, OfflineError
+from .incremental import Manifest, generate_aibom_incremental
+from .lineage import LineageRegistry
+from .local import load_local_model
+from .metrics import Metrics
+from .output import DirectoryWriter, NDJSONWriter, open_writer
+from .readme import ModelReadme
+from .transport import HTTPTransport
+
+__version__ = "1.1.0"
+
+
+def main(argv=None):
+    """
+    Command line entry point (see aloha.cli.main); the command line interface, with the service
+    and the catalog, is only imported when it runs.
+    """
+    from .cli import main as cli_main
+    return cli_main(argv)
+
+
+#Function to import the catalog (and sqlite3) on the first access to aloha.Catalog.
+def __getattr__(name):
+    if name == "Catalog":
+        from .catalog import Catalog
+        return Catalog
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = [
+    "ALOHAError",
+    "Catalog",
+    "DatasetRegistry",
+    "DirectoryWriter",
+    "FetchError",
+    "HTTPTransport",
+    "LicenseListError",
+    "LineageRegistry",
+    "Manifest",
+    "Metrics",
+    "ModelNotFoundError",
+    "ModelReadme",
+    "NDJSONWriter",
+    "OfflineError",
+    "ResponseCache",
+    "bom_content_hash",
+    "build_aibom",
+    "canonicalize",
+    "diff_aibom_sources",
+    "diff_aiboms",
+    "generate_aibom",
+    "generate_aibom_incremental",
+    "generate_cyclonedx_component",
+    "generate_dataset_component",
+    "get_model_data",
+    "iter_aiboms",
+    "iter_hub_models",
+    "load_local_model",
+    "main",
+    "open_writer",
+]
@@ -0,0 +1,123 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+from .bom import generate_aibom
+from .incremental import generate_aibom_incremental
+from .metrics import span
+from .output import DirectoryWriter
+from .transport import resolve_transport
+
+
+# Save the BOM to a JSON file
+def save_aibom(aibom, model_id, output_dir=None):
+    return DirectoryWriter(output_dir).write(aibom, model_id)
+
+#Function to read the model IDs of a batch: one ID per line, empty lines and lines starting with '#' are ignored.
+def read_model_ids(source):
+    f = sys.stdin if source == '-' else open(source, "r", encoding="utf-8")
+    try:
+        for line in f:
+            model_id = line.strip()
+            if model_id and not model_id.startswith('#'):
+                yield model_id
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def generate_aibom_batch(model_ids, output_dir=None, workers=8, session=None, writer=None, manifest=None):
+    """
+    Generates the AIBOM of many models concurrently, saving each one as soon as it is complete.
+
+    At most 2 * workers models are in flight: the input (e.g. an unbounded discovery listing) is read
+    only as fast as the AIBOMs are written, and an AIBOM is released once it is written. A model that
+    cannot be processed is reported and skipped, the rest of the batch goes on. If the input itself
+    fails (e.g. a page of the listing), the models already read are completed and written first.
+
+    :param model_ids: Iterable of model IDs, or of model metadata dicts already retrieved (see aloha.discovery)
+    :param output_dir: Directory where the AIBOMs are saved (current directory if None), when no writer is given
+    :param workers: Number of models processed at the same time
+    :param session: HTTPTransport or requests.Session to use (the shared transport if None)
+    :param writer: Output writer (see aloha.output), one JSON file per model in output_dir if None
+    :param manifest: Manifest of an incremental run (see aloha.incremental): unchanged models are skipped
+    :return: Tuple (number of AIBOMs created, list of model IDs that failed)
+    :raises Exception: The error of the input iterator, once the models read before it are written
+    """
+    created = 0
+    skipped = 0
+    failed = []
+    input_error = None
+    start = time.perf_counter()
+    transport = resolve_transport(session)
+    if writer is None:
+        writer = DirectoryWriter(output_dir)
+    max_pending = 2 * workers
+    futures = {} # Future -> model ID, of the models in flight.
+
+    def generate(model_id, data):
+        if manifest is None:
+            return generate_aibom(model_id, session=transport, data=data), None
+        return generate_aibom_incremental(model_id, manifest, session=transport, data=data)
+
+    def write(future):
+        nonlocal created, skipped
+        model_id = futures.pop(future)
+        try:
+            aibom, entry = future.result()
+            if aibom is None:
+                if entry is not None:
+                    manifest.update(model_id, entry)
+                skipped += 1
+                return
+            with span("serialize"):
+                path = writer.write(aibom, model_id)
+            # The manifest records the model only once its AIBOM is written.
+            if entry is not None:
+                manifest.update(model_id, entry)
+            created += 1
+            print(f"✅ AIBoM successfully created: {path}")
+        except Exception as e:
+            failed.append(model_id)
+            print(f"❌ Error in AIBoM creation for {model_id}: {e}")
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aloha-model") as executor:
+            try:
+                for model in model_ids:
+                    model_id, data = (model, None) if isinstance(model, str) else (model['id'], model)
+                    futures[executor.submit(generate, model_id, data)] = model_id
+                    if len(futures) >= max_pending:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            write(future)
+            except Exception as e:
+                # e.g. a page of a discovery listing could not be retrieved: raised once the models in flight are written.
+                input_error = e
+            for future in as_completed(list(futures)):
+                write(future)
+    finally:
+        if manifest is not None:
+            manifest.save()
+
+    print_batch_summary(created, skipped, failed, time.perf_counter() - start, transport)
+    if input_error is not None:
+        raise input_error
+    return created, failed
+
+
+def print_batch_summary(created, skipped, failed, elapsed, transport):
+    """
+    Prints the totals of a batch run: models processed, throughput, HTTP and cache statistics.
+    """
+    processed = created + skipped + len(failed)
+    throughput = processed / elapsed if elapsed > 0 else 0.0
+    print(f"Processed {processed} models ({created} created, {skipped} unchanged, {len(failed)} failed) in {elapsed:.1f}s: {throughput:.2f} models/s")
+    stats = transport.get_stats()
+    print(f"HTTP: {stats['requests']} requests, {stats['retries']} retries, {stats['bytes'] / 1e6:.1f} MB, average latency {stats['avg_latency'] * 1000:.0f} ms")
+    if transport.cache is not None:
+        cache_stats = transport.cache.get_stats()
+        print(f"HTTP cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated, {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)")
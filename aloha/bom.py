@@ -0,0 +1,341 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import contextvars
+import itertools
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from . import canonical, limits
+from .canonical import canonicalize
+from .dataset import get_dataset_registry
+from .exceptions import FetchError, ModelNotFoundError
+from .licenses import is_license_recognized
+from .limits import decode_json, dropped_length, model_decode_caps, total_length
+from .mapping import Field, Mapping, as_property, present
+from .metrics import span, timed
+from .readme import get_model_readme
+from .transport import get_fetch_executor, http_get_cached, hub_url, resolve_transport
+from .utils import generate_bom_ref, generate_properties, list_to_string
+
+# Fields of the model metadata read by ALOHA: the model API is asked for these only (expand[]), not for
+# the full metadata with its list of files, which can be very long for sharded or GGUF repositories.
+MODEL_FIELDS = ("author", "pipeline_tag", "library_name", "tags", "config", "cardData", "sha", "lastModified")
+_expand_supported = True # False once the Hub (e.g. an older mirror) rejected expand[], the full metadata is requested.
+
+
+def initialize_bom_structure():
+    uuid_v4 = uuid.uuid4()
+    urn_uuid = f"urn:uuid:{uuid_v4}"
+    # Struttura base del BOM CycloneDX
+    cyclonedx_bom = {
+        "bomFormat": "CycloneDX",
+        "specVersion": "1.6",
+        "serialNumber": urn_uuid,
+        "version": 1,
+        "metadata":{}
+    }
+    
+    return cyclonedx_bom
+
+#Function to convert a license of the card data into a CycloneDX license entry.
+def _license_entry(lic, card_data):
+    lic_info = is_license_recognized(lic)
+    if lic_info:
+        #The license is recognized by SPDX
+        #components->licenses->license->id, #components->licenses->license->url
+        return {"license": {"id": lic_info['licenseId'], "url": lic_info['reference']}}
+    #The license is not recognized by SPDX.
+    if lic == 'other' and 'license_name' in card_data: #https://github.com/huggingface/hub-docs/blob/main/datasetcard.md?plain=1
+        license_entry = {"license": {"name": card_data['license_name']}} #components->licenses->license->name
+        if 'license_link' in card_data:
+            license_entry['license']['url'] = card_data['license_link'] #components->licenses->license->url
+        if 'license_details' in card_data:
+            license_entry['license']['properties'] = [generate_properties('license_details', card_data['license_details'])] #components->licenses->license->properties
+        return license_entry
+    #If SPDX does not define the license used, or license == other but license_name is not defined
+    return {"license": {"name": lic}} #components->licenses->license->name
+
+#license is sometimes a list, sometimes a single license.
+def _license_entries(card_data):
+    licenses = card_data['license']
+    if not isinstance(licenses, list):
+        licenses = [licenses]
+    return [_license_entry(lic, card_data) for lic in licenses]
+
+#Function to convert the model-index of the card data into CycloneDX performance metrics, one at a time.
+def _iter_performance_metrics(model_index):
+    for entry in model_index or []:
+        # As many results as the decoder keeps (see model_decode_caps), so the metrics are the same with or without ijson.
+        for result in itertools.islice(entry.get('results') or [], limits.MAX_PERFORMANCE_METRICS):
+            #type, split, config  dataset
+            dataset_name_mi = result.get('dataset',{}).get('type',{}) # dataset id
+            dataset_split_mi = result.get('dataset',{}).get('split',{}) # Example: test
+            dataset_config_mi = result.get('dataset',{}).get('config',{}) #The name of the dataset subset used in `load_dataset()`. Example: fr in `load_dataset("common_voice", "fr")`. See the `datasets` docs for more info: https://huggingface.co/docs/datasets/package_reference/loading_methods#datasets.load_dataset.name
+
+            slice_mi = f"dataset: {dataset_name_mi}"
+            # Add 'split' if present.
+            if dataset_split_mi:
+                slice_mi += f", split: {dataset_split_mi}"
+            # Add 'config' if present.
+            if dataset_config_mi:
+                slice_mi += f", config: {dataset_config_mi}"
+
+            for metric in result.get('metrics', {}):
+                yield {"slice": slice_mi,
+                       "type": metric.get('type', {}), #Example: wer. Use metric id from https://hf.co/metrics
+                       "value": metric.get('value', {})}
+
+#Only the first MAX_PERFORMANCE_METRICS metrics are converted, leaderboard models can list thousands of them.
+def _performance_metrics(model_index):
+    return list(itertools.islice(_iter_performance_metrics(model_index), limits.MAX_PERFORMANCE_METRICS))
+
+#Function to count the metrics left out of performanceMetrics, including those of the results dropped while decoding.
+def _performance_metrics_omitted(model_index):
+    total = 0
+    for entry in model_index or []:
+        results = entry.get('results') or []
+        total += dropped_length(results, 'metrics')
+        for result in results:
+            total += total_length(result.get('metrics') or [])
+    omitted = total - limits.MAX_PERFORMANCE_METRICS
+    return generate_properties('performanceMetrics_omitted', str(omitted)) if omitted > 0 else None
+
+def _tags(tags):
+    return list(itertools.islice(tags, limits.MAX_TAGS))
+
+def _tags_omitted(tags):
+    omitted = total_length(tags) - limits.MAX_TAGS
+    return generate_properties('tags_omitted', str(omitted)) if omitted > 0 else None
+
+#Function to convert co2_eq_emissions (a dict, or only the emissions) into CycloneDX properties.
+def _environmental_considerations(co2_eq_emissions):
+    properties = []
+    if isinstance(co2_eq_emissions, dict):
+        for name in ('emissions', 'source', 'training_type', 'geographical_location', 'hardware_used'):
+            if co2_eq_emissions.get(name, {}):
+                properties.append(generate_properties(name, co2_eq_emissions[name]))
+    else:
+        properties.append(generate_properties('emissions', co2_eq_emissions))
+    return {'properties': properties}
+
+#Function to build a transform extracting the first README section with one of the given headings.
+def _readme_section(valid_titles, fallback_titles=None):
+    def section(readme):
+        text = readme.get_section(valid_titles)
+        if not text and fallback_titles:
+            text = readme.get_section(fallback_titles)
+        return text or None
+    return section
+
+VALID_TITLES_MODEL_DESCRIPTION = ['model description', 'model details', 'about', 'description', 'details', 'intro', 'introduction', 'model', 'model info', 'model information', 'model overview','model summary','model type','overview','system info']
+VALID_TITLES_USES = ['responsibility & safety','responsible deployment','use','uses','uses and limitations','direct use','use cases','intended use','intended uses','intended uses & limitations']
+
+# Mapping of the model metadata ('model', as returned by get_model_data) and README ('readme', a
+# ModelReadme) to the model component. The rules are applied in order, which is the order of the keys in the AIBOM.
+MODEL_COMPONENT_FIELDS = [
+    Field("model.pipeline_tag", "modelCard.modelParameters.task", truthy=True), #components->modelCard->task
+    Field("model.config.model_type", "modelCard.modelParameters.architectureFamily"), #components->modelCard->modelParameters->architectureFamily
+    Field("model.config.architectures", "modelCard.modelParameters.modelArchitecture", ", ".join), #components->modelCard->modelParameters->modelArchitecture
+    Field("model.library_name", "modelCard.properties[]", as_property('library_name'), truthy=True), #components->modelCard->properties "library_name"
+    Field("model.author", "authors", lambda author: [{'name': author}], truthy=True), #components->authors
+    Field("model.cardData", "licenses[*]", _license_entries, condition=present("model.cardData.license")), #components->licenses
+    Field("readme", "description", _readme_section(VALID_TITLES_MODEL_DESCRIPTION, ['model description']), truthy=True), #components->description (text description)
+    Field("model.tags", "tags", _tags, truthy=True), #components->tags
+    Field("model.cardData.model-index", "modelCard.quantitativeAnalysis.performanceMetrics[*]", _performance_metrics), #components->modelCard->quantitativeAnalysis->performanceMetrics
+    Field("model.cardData.base_model", "modelCard.properties[]", as_property('base_model', list_to_string)), #components->modelCard->properties
+    Field("model.cardData.base_model_relation", "modelCard.properties[]", as_property('base_model_relation'), condition=present("model.cardData.base_model")),
+    Field("readme", "modelCard.consideration.useCases", _readme_section(VALID_TITLES_USES), truthy=True), #modelCard->consideration->useCases (text description)
+    Field("model.cardData.co2_eq_emissions", "modelCard.consideration.environmentalConsiderations", _environmental_considerations), #modelCard->consideration->environmentalConsiderations->properties
+    # Number of tags and metrics left out by the caps of aloha.limits, when there are any.
+    Field("model.tags", "modelCard.properties[]", _tags_omitted, truthy=True),
+    Field("model.cardData.model-index", "modelCard.properties[]", _performance_metrics_omitted),
+]
+MODEL_COMPONENT_MAPPING = Mapping(MODEL_COMPONENT_FIELDS)
+
+
+@timed("component")
+def generate_cyclonedx_component(data, readme=None, transport=None):
+
+    # The README is downloaded and split into sections once, every section lookup is a dict access.
+    if readme is None:
+        readme = get_model_readme(data.get('id'), transport)
+
+    #Structure of the single component representing the machine learning model.
+    component = {
+        "type": "machine-learning-model",
+        "bom-ref": generate_bom_ref(data.get('id')),
+        "name": data.get('id'), #components->name
+        "externalReferences": [{
+            "url":  f"https://huggingface.co/{data.get('id')}",
+            "type": 'documentation'
+        }
+        ]
+    }
+
+    return MODEL_COMPONENT_MAPPING.convert({"model": data, "readme": readme}, component)
+
+
+@timed("model_api")
+def get_model_data(model_id, transport=None):
+    """
+    Retrieves the metadata of a model from the Hugging Face API.
+
+    :param model_id: Model ID (e.g., 'google-bert/bert-base-uncased')
+    :param transport: HTTPTransport to use (the shared one if None)
+    :return: The API response as a dict
+    :raises ModelNotFoundError: The model does not exist or is not accessible
+    :raises FetchError: The API could not be reached or returned an error
+    """
+    global _expand_supported
+
+    API_URL_ = hub_url(f"api/models/{model_id}")
+    PROJECTED_URL_ = f"{API_URL_}?{urlencode([('expand[]', field) for field in MODEL_FIELDS])}"
+
+    response_ = http_get_cached(PROJECTED_URL_ if _expand_supported else API_URL_, transport=transport)
+    if response_.status_code == 400 and _expand_supported:
+        # A field cannot be expanded by this endpoint: the full metadata is requested instead, and
+        # from then on for every model if that works (a 400 for a malformed model ID stays an error).
+        response_ = http_get_cached(API_URL_, transport=transport)
+        if response_.status_code == 200:
+            _expand_supported = False
+    if response_.status_code in (401, 404):
+        # The Hub answers 401 instead of 404 to anonymous requests for missing repositories.
+        raise ModelNotFoundError(f"Model {model_id} not found (status code {response_.status_code})")
+    if response_.status_code != 200:
+        raise FetchError(f"Failed to retrieve model {model_id}: status code {response_.status_code}")
+    try:
+        return decode_json(response_.content, model_decode_caps())
+    except ValueError as e:
+        raise FetchError(f"Invalid response for model {model_id}: {e}") from e
+
+
+#Function to read the datasets of a model from its API metadata, as a list of dataset IDs.
+def get_dataset_ids(data):
+    datasets = []
+    if 'datasets' in data.get('cardData', {}):
+        datasets = data['cardData']['datasets']
+        if isinstance(datasets, str): 
+            datasets = [datasets]  # Trasforma la stringa in una lista con l'elemento come unico elemento    
+        datasets = list(dict.fromkeys(datasets)) # A dataset listed twice is referenced (and added to the components) once
+    return datasets
+
+
+#Function to read the base_model_relation property of a model component (e.g. quantized), None if it has none.
+def _base_model_relation(component):
+    properties = (component.get('modelCard') or {}).get('properties') or []
+    return next((prop['value'] for prop in properties if prop.get('name') == 'base_model_relation'), None)
+
+#Function to link the model to its resolved base models: pedigree.ancestors references their components by bom-ref, and the
+#relation of each edge of the graph is recorded as a 'base_model_relation:<base model>-><model>' metadata property.
+def _add_lineage(bom, component, ancestors, dependencies):
+    component.setdefault('pedigree', {})['ancestors'] = [{"type": ancestor['type'], "bom-ref": ancestor['bom-ref'], "name": ancestor['name']}
+                                                          for ancestor in ancestors]
+    models = {model['bom-ref']: model for model in [component] + ancestors}
+    properties = []
+    for dependency in dependencies:
+        child = models.get(dependency['ref'])
+        relation = _base_model_relation(child) if child is not None else None
+        if relation:
+            properties.extend(generate_properties(f"base_model_relation:{models[ref]['name']}->{child['name']}", relation)
+                              for ref in dependency['dependsOn'] if ref in models)
+    if properties:
+        bom['metadata'].setdefault('properties', []).extend(properties)
+
+
+def assemble_aibom(component, datasets, ancestors=None, dependencies=None, last_modified=None):
+    """
+    Builds the AIBOM around a model component whose resources are already retrieved; no request is sent.
+
+    :param component: Model component, as returned by generate_cyclonedx_component (modified in place)
+    :param datasets: List of (dataset ID, dataset component) tuples
+    :param ancestors: Base model components (see aloha.lineage), also referenced by the pedigree of the model
+    :param dependencies: CycloneDX dependencies linking the models to their base models
+    :param last_modified: lastModified date of the model, the timestamp of a canonical AIBOM (see aloha.canonical)
+    :return: The AIBOM as a dict
+    """
+    # Generates the basic structure of the BOM
+    bom = initialize_bom_structure()
+
+    # Add the datasets to the component
+    for name_dataset, dataset_component in datasets:
+        component.setdefault('modelCard', {}).setdefault('modelParameters', {}).setdefault('datasets', []) # Ensure that the nested structure exists before appending the dataset reference
+        component['modelCard']['modelParameters']['datasets'].append({'ref':generate_bom_ref(name_dataset)})
+
+        bom.setdefault('components',[])
+        bom['components'].append(dataset_component)
+
+    if ancestors:
+        bom.setdefault('components', []).extend(ancestors)
+        bom['dependencies'] = dependencies
+        _add_lineage(bom, component, ancestors, dependencies)
+
+    timestamp_iso = datetime.now(timezone.utc).isoformat()
+    bom['metadata']['timestamp'] = timestamp_iso
+
+    bom['metadata']['component'] = component 
+
+    if canonical.CANONICAL_OUTPUT:
+        canonicalize(bom, last_modified)
+
+    return bom
+
+
+def build_aibom(data, transport=None, readme=None, lineage_depth=None):
+    """
+    Builds the AIBOM of a model from its API metadata.
+
+    :param data: Model metadata as returned by get_model_data
+    :param transport: HTTPTransport used for the README and the datasets (the shared one if None)
+    :param readme: ModelReadme of the model, fetched if None
+    :param lineage_depth: Levels of base models added as components, linked through 'dependencies' (see aloha.lineage; the configured depth if None)
+    :return: The AIBOM as a dict
+    """
+    from .lineage import get_lineage_registry # aloha.lineage builds its components with this module.
+
+    datasets = get_dataset_ids(data)
+
+    # The dataset cards are fetched in the background while the model component and its README are processed.
+    # Each task runs in a copy of the current context, so its requests are attributed to this model in the metrics.
+    executor = get_fetch_executor()
+    registry = get_dataset_registry()
+    dataset_futures = [executor.submit(contextvars.copy_context().run, registry.get, name_dataset, None, transport) for name_dataset in datasets]
+
+    # Generate the component
+    component = generate_cyclonedx_component(data, readme, transport)
+
+    # Base models, resolved while the dataset cards are still being fetched; each one is fetched once per run however many models derive from it.
+    ancestors, dependencies = [], []
+    lineage = get_lineage_registry()
+    if (lineage.max_depth if lineage_depth is None else lineage_depth) > 0:
+        ancestors, dependencies = lineage.resolve(data, transport, lineage_depth)
+
+    dataset_components = [(name_dataset, dataset_future.result()) for name_dataset, dataset_future in zip(datasets, dataset_futures)]
+    return assemble_aibom(component, dataset_components, ancestors, dependencies, data.get('lastModified'))
+
+
+def generate_aibom(model_id, *, session=None, cache=None, data=None, readme=None):
+    """
+    Generates the AIBOM of a Hugging Face model.
+
+    :param model_id: Model ID (e.g., 'google-bert/bert-base-uncased')
+    :param session: HTTPTransport or requests.Session to use (the shared transport if None)
+    :param cache: ResponseCache for the Hub responses (the cache of the transport if None)
+    :param data: Metadata of the model already retrieved (e.g., by aloha.discovery), the model API is not called
+    :param readme: ModelReadme of the model already retrieved (e.g., by aloha.local), the README is not downloaded
+    :return: The AIBOM as a dict, in CycloneDX 1.6 format
+    :raises ModelNotFoundError: The model does not exist or is not accessible
+    :raises FetchError: A resource could not be retrieved
+    """
+    transport = resolve_transport(session, cache)
+    with span("generate_aibom", model_id):
+        if data is None:
+            data = get_model_data(model_id, transport)
+        return build_aibom(data, transport, readme)
+
+
+#Kept for the scripts written against the first versions of ALOHA.
+def generateAIBOM(modelID):
+    return generate_aibom(modelID)
@@ -0,0 +1,159 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from .utils import atomic_write
+
+HTTP_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "aloha", "http")
+HTTP_CACHE_MAX_SIZE = 1024 * 1024 * 1024 # Bytes of compressed bodies kept in the HTTP cache.
+
+
+class ResponseCache:
+    """
+    On-disk cache of Hugging Face Hub responses (model API, README, dataset API).
+
+    Entries are keyed by URL and revision and keep the ETag / Last-Modified validators of the
+    response; bodies are stored gzip-compressed under the SHA-256 of their content, so identical
+    bodies are stored once. When the compressed bodies exceed max_size, the least recently used
+    entries are evicted. In offline mode the cache is a read-only replay source.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_size=HTTP_CACHE_MAX_SIZE, offline=False):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.offline = offline
+        self.entries_dir = os.path.join(cache_dir, "entries")
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        os.makedirs(self.entries_dir, exist_ok=True)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = None # Total size of the stored bodies, computed on the first store.
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _entry_path(self, url, revision):
+        key = hashlib.sha256(f"{revision or ''}\n{url}".encode("utf-8")).hexdigest()
+        return os.path.join(self.entries_dir, f"{key}.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.gz")
+
+    def count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def lookup(self, url, revision=None):
+        path = self._entry_path(url, revision)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path) # The modification time of an entry is its last use, for LRU eviction.
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def load_body(self, entry):
+        try:
+            with gzip.open(self._object_path(entry["digest"]), "rb") as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def store(self, url, revision, response):
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        added = 0
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            atomic_write(object_path, gzip.compress(body))
+            added = os.path.getsize(object_path)
+        entry = {
+            "url": url,
+            "revision": revision,
+            "digest": digest,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type"),
+            "encoding": response.encoding,
+            "stored_at": time.time()
+        }
+        atomic_write(self._entry_path(url, revision), json.dumps(entry).encode("utf-8"))
+        self.count("stores")
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_size()
+            else:
+                self._size += added
+            evict = self._size > self.max_size
+        if evict:
+            self.evict()
+        return entry
+
+    def _disk_size(self):
+        size = 0
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                size += os.path.getsize(os.path.join(root, name))
+        return size
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the bodies use at most 90% of max_size.
+        """
+        with self._lock:
+            entries = []
+            references = {}
+            for name in os.listdir(self.entries_dir):
+                path = os.path.join(self.entries_dir, name)
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        digest = json.load(f)["digest"]
+                    entries.append((os.path.getmtime(path), path, digest))
+                except (OSError, ValueError, KeyError):
+                    continue
+                references[digest] = references.get(digest, 0) + 1
+            size = self._disk_size()
+            for _, path, digest in sorted(entries):
+                if size <= self.max_size * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._stats["evictions"] += 1
+                references[digest] -= 1
+                if references[digest] == 0:
+                    object_path = self._object_path(digest)
+                    try:
+                        size -= os.path.getsize(object_path)
+                        os.remove(object_path)
+                    except OSError:
+                        pass
+            self._size = size
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
+
+
+def cached_response(url, entry, body):
+    import requests
+
+    response = requests.models.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.encoding = entry.get("encoding")
+    if entry.get("content_type"):
+        response.headers["Content-Type"] = entry["content_type"]
+    return response
@@ -0,0 +1,94 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Canonical output: AIBOMs generated twice from the same Hub metadata are identical, byte for byte.
+
+By default every AIBOM gets a random serialNumber and the current time as timestamp. In canonical
+mode (--canonical), assemble_aibom calls canonicalize(), which:
+
+- sorts the components (and pedigree ancestors), dependencies, licenses, dataset references and properties
+- sets the timestamp to the lastModified date of the model on the Hub (no timestamp without it)
+- adds the SHA-256 of the content (bom_content_hash) to the metadata properties, as 'bomHash'
+- derives the serialNumber from that hash (UUID version 5)
+
+and the writers encode the AIBOMs with sorted keys (see aloha.output), so identical AIBOMs can be
+recognized by their hash, or by their bytes, and are not written again.
+"""
+
+import hashlib
+import json
+import uuid
+
+CANONICAL_OUTPUT = False
+BOM_HASH_PROPERTY = "bomHash"
+
+# Key of the items of the lists sorted by canonicalize(), by name of the list; sorted() is stable, so
+# properties with the same name (e.g. the 'configs' of a dataset) keep their order.
+_SORT_KEYS = {
+    "components": lambda component: component.get("bom-ref", ""),
+    "ancestors": lambda component: component.get("bom-ref", ""),
+    "dependencies": lambda dependency: dependency.get("ref", ""),
+    "dependsOn": lambda ref: ref,
+    "datasets": lambda dataset: dataset.get("ref", "") if isinstance(dataset, dict) else "",
+    "licenses": lambda entry: (entry.get("license", {}).get("id") or "", entry.get("license", {}).get("name") or ""),
+    "properties": lambda prop: prop.get("name", ""),
+}
+
+
+def configure_canonical_output(enabled=True):
+    """
+    Enables (or disables) the canonical output of the AIBOMs assembled and written from now on.
+    """
+    global CANONICAL_OUTPUT
+    CANONICAL_OUTPUT = enabled
+
+
+#Function to compute the hash of the content of an AIBOM, ignoring serialNumber, version, timestamp and the hash property itself.
+def bom_content_hash(bom):
+    content = dict(bom)
+    content.pop("serialNumber", None)
+    content.pop("version", None)
+    metadata = {key: value for key, value in bom.get("metadata", {}).items() if key != "timestamp"}
+    if "properties" in metadata:
+        metadata["properties"] = [prop for prop in metadata["properties"] if prop.get("name") != BOM_HASH_PROPERTY]
+        if not metadata["properties"]:
+            del metadata["properties"]
+    content["metadata"] = metadata
+    # Always the standard encoder: the hash must not depend on the JSON library installed.
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _sort_lists(node):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            _sort_lists(value)
+            if key in _SORT_KEYS and isinstance(value, list):
+                node[key] = sorted(value, key=_SORT_KEYS[key])
+    elif isinstance(node, list):
+        for item in node:
+            _sort_lists(item)
+
+
+def canonicalize(bom, last_modified=None):
+    """
+    Turns an AIBOM into its canonical form (see the module docstring).
+
+    :param bom: The AIBOM, modified in place
+    :param last_modified: lastModified date of the model on the Hub, used as timestamp
+    :return: The SHA-256 of the content of the AIBOM
+    """
+    _sort_lists(bom)
+    metadata = bom.setdefault("metadata", {})
+    if last_modified:
+        metadata["timestamp"] = last_modified
+    else:
+        metadata.pop("timestamp", None)
+    bom_hash = bom_content_hash(bom)
+    properties = [prop for prop in metadata.get("properties", []) if prop.get("name") != BOM_HASH_PROPERTY]
+    properties.append({"name": BOM_HASH_PROPERTY, "value": bom_hash})
+    metadata["properties"] = sorted(properties, key=_SORT_KEYS["properties"])
+    bom["serialNumber"] = f"urn:uuid:{uuid.uuid5(uuid.NAMESPACE_OID, bom_hash)}"
+    return bom_hash
@@ -0,0 +1,385 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Catalog: a local SQLite database of the generated AIBOMs, for license, dataset and architecture queries.
+
+Every AIBOM written with --catalog (or imported with 'aloha query import') is normalized into one
+row of 'models' and the rows of its components, licenses (SPDX id or name), datasets, base models
+and performance metrics, replacing the rows of the previous AIBOM of the same model. The columns
+queried by 'aloha query' are indexed, so a query over 100k models takes milliseconds instead of
+a scan of every AIBOM. AIBOMs are inserted in batches, one transaction per batch.
+"""
+
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+
+from .canonical import BOM_HASH_PROPERTY
+from .diff import decode_aibom, get_aibom_model_id
+from .exceptions import ALOHAError
+from .metrics import get_metrics
+
+CATALOG_PATH = os.path.join(os.path.expanduser("~"), ".cache", "aloha", "catalog.sqlite")
+CATALOG_BATCH_SIZE = 500 # AIBOMs inserted per transaction.
+
+# The child tables reference models(id): replacing the row of a model deletes its rows (ON DELETE CASCADE).
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY,
+    model_id TEXT NOT NULL UNIQUE,
+    bom_ref TEXT,
+    serial_number TEXT,
+    version INTEGER,
+    timestamp TEXT,
+    bom_hash TEXT,
+    task TEXT,
+    architecture_family TEXT COLLATE NOCASE,
+    model_architecture TEXT,
+    library_name TEXT,
+    cataloged_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS components (
+    model INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    bom_ref TEXT,
+    type TEXT,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS licenses (
+    model INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    component_ref TEXT,
+    spdx_id TEXT COLLATE NOCASE,
+    name TEXT COLLATE NOCASE,
+    url TEXT
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    model INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    dataset_id TEXT NOT NULL,
+    license TEXT
+);
+CREATE TABLE IF NOT EXISTS base_models (
+    model INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    base_model_id TEXT NOT NULL,
+    relation TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    model INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    slice TEXT,
+    type TEXT,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS models_architecture_family ON models(architecture_family);
+CREATE INDEX IF NOT EXISTS models_task ON models(task);
+CREATE INDEX IF NOT EXISTS components_model ON components(model);
+CREATE INDEX IF NOT EXISTS licenses_model ON licenses(model);
+CREATE INDEX IF NOT EXISTS licenses_spdx_id ON licenses(spdx_id);
+CREATE INDEX IF NOT EXISTS licenses_name ON licenses(name);
+CREATE INDEX IF NOT EXISTS datasets_model ON datasets(model);
+CREATE INDEX IF NOT EXISTS datasets_dataset_id ON datasets(dataset_id);
+CREATE INDEX IF NOT EXISTS base_models_model ON base_models(model);
+CREATE INDEX IF NOT EXISTS base_models_base_model_id ON base_models(base_model_id);
+CREATE INDEX IF NOT EXISTS metrics_model ON metrics(model);
+CREATE INDEX IF NOT EXISTS metrics_type_value ON metrics(type, value);
+"""
+
+_INSERTS = {
+    "components": "INSERT INTO components (model, bom_ref, type, name) VALUES (?, ?, ?, ?)",
+    "licenses": "INSERT INTO licenses (model, component_ref, spdx_id, name, url) VALUES (?, ?, ?, ?, ?)",
+    "datasets": "INSERT INTO datasets (model, dataset_id, license) VALUES (?, ?, ?)",
+    "base_models": "INSERT INTO base_models (model, base_model_id, relation) VALUES (?, ?, ?)",
+    "metrics": "INSERT INTO metrics (model, slice, type, value) VALUES (?, ?, ?, ?)",
+}
+
+# Queries of 'aloha query', by name: (SQL, description). Licenses are those of the model itself, not of its base models.
+QUERIES = {
+    "non-spdx": ("SELECT m.model_id AS model, l.name AS license, l.url AS url FROM licenses l JOIN models m ON m.id = l.model "
+                 "WHERE l.spdx_id IS NULL AND l.component_ref IS m.bom_ref ORDER BY m.model_id",
+                 "Models with a license that is not on the SPDX license list"),
+    "license": ("SELECT m.model_id AS model, l.spdx_id AS spdx_id, l.name AS license FROM licenses l JOIN models m ON m.id = l.model "
+                "WHERE (l.spdx_id = :value OR l.name = :value) AND l.component_ref IS m.bom_ref ORDER BY m.model_id",
+                "Models under a license (SPDX id or name, case insensitive)"),
+    "dataset": ("SELECT m.model_id AS model, d.dataset_id AS dataset, d.license AS license FROM datasets d JOIN models m ON m.id = d.model "
+                "WHERE d.dataset_id = :value ORDER BY m.model_id",
+                "Models trained or evaluated on a dataset"),
+    "base-model": ("SELECT m.model_id AS model, b.relation AS relation FROM base_models b JOIN models m ON m.id = b.model "
+                   "WHERE b.base_model_id = :value ORDER BY m.model_id",
+                   "Models derived from a base model (cardData.base_model)"),
+    "architecture": ("SELECT model_id AS model, architecture_family, model_architecture FROM models "
+                     "WHERE architecture_family = :value ORDER BY model_id",
+                     "Models of an architecture family (config.model_type, e.g. llama)"),
+    "metric": ("SELECT m.model_id AS model, x.slice AS slice, x.value AS value FROM metrics x JOIN models m ON m.id = x.model "
+               "WHERE x.type = :value AND x.value >= :min AND x.value <= :max ORDER BY x.value DESC, m.model_id",
+               "Performance metrics of a type (e.g. accuracy), between --min and --max"),
+}
+
+
+#Function to get the value of the property with the given name, None if it is missing.
+def _property(properties, name):
+    for prop in properties or []:
+        if prop.get("name") == name:
+            return prop.get("value")
+    return None
+
+#Function to convert a metric value to a number; values that are not numbers (e.g. '45.3%') are stored as NULL.
+def _metric_value(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def _license_rows(component):
+    rows = []
+    for entry in component.get("licenses") or []:
+        lic = entry.get("license") or {}
+        rows.append((component.get("bom-ref"), lic.get("id"), lic.get("name"), lic.get("url")))
+    return rows
+
+def _dataset_license(component):
+    for data in component.get("data") or []:
+        value = _property((data.get("contents") or {}).get("properties"), "license")
+        if value is not None:
+            return value
+    return None
+
+def _catalog_rows(aibom):
+    """
+    Normalizes an AIBOM into the row of the model and the rows of the child tables (without the model column).
+    """
+    metadata = aibom.get("metadata") or {}
+    component = metadata.get("component") or {}
+    card = component.get("modelCard") or {}
+    parameters = card.get("modelParameters") or {}
+    model_id = get_aibom_model_id(aibom)
+    if not model_id:
+        raise ALOHAError("The AIBOM has no model component (metadata.component.name)")
+
+    model = {
+        "model_id": model_id,
+        "bom_ref": component.get("bom-ref"),
+        "serial_number": aibom.get("serialNumber"),
+        "version": aibom.get("version"),
+        "timestamp": metadata.get("timestamp"),
+        "bom_hash": _property(metadata.get("properties"), BOM_HASH_PROPERTY),
+        "task": parameters.get("task"),
+        "architecture_family": parameters.get("architectureFamily"),
+        "model_architecture": parameters.get("modelArchitecture"),
+        "library_name": _property(card.get("properties"), "library_name"),
+    }
+    children = {table: [] for table in _INSERTS}
+    children["licenses"].extend(_license_rows(component))
+    for other in aibom.get("components") or []:
+        if not isinstance(other, dict):
+            continue # AIBOMs written by older versions may list a null dataset component.
+        children["components"].append((other.get("bom-ref"), other.get("type"), other.get("name")))
+        children["licenses"].extend(_license_rows(other))
+        if other.get("type") == "data":
+            children["datasets"].append((other.get("name"), _dataset_license(other)))
+    # cardData.base_model is recorded as a comma separated property (see aloha.bom).
+    base_models = _property(card.get("properties"), "base_model")
+    relation = _property(card.get("properties"), "base_model_relation")
+    for base_model_id in str(base_models or "").split(","):
+        if base_model_id.strip():
+            children["base_models"].append((base_model_id.strip(), relation))
+    for metric in (card.get("quantitativeAnalysis") or {}).get("performanceMetrics") or []:
+        metric_type = metric.get("type")
+        children["metrics"].append((metric.get("slice"), metric_type if isinstance(metric_type, str) else None, _metric_value(metric.get("value"))))
+    return model, children
+
+
+class Catalog:
+    """
+    SQLite catalog of AIBOMs (see the module docstring), safe to share between threads.
+
+    add() queues an AIBOM; the queued AIBOMs are written in one transaction every batch_size
+    AIBOMs and by flush() and close(). The AIBOM of a model replaces its previous one; an AIBOM
+    whose bomHash (canonical output) is the one already cataloged is not written again.
+    """
+
+    def __init__(self, path=None, batch_size=CATALOG_BATCH_SIZE, readonly=False):
+        """
+        :param path: Path of the SQLite database, created if missing (CATALOG_PATH if None)
+        :param readonly: Open an existing catalog for queries only
+        :raises ALOHAError: The catalog cannot be opened
+        """
+        self.path = path or CATALOG_PATH
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = []
+        try:
+            if readonly:
+                if not os.path.exists(self.path):
+                    raise ALOHAError(f"No catalog at {self.path}")
+                uri = f"{pathlib.Path(self.path).resolve().as_uri()}?mode=ro"
+                self._connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            else:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._connection = sqlite3.connect(self.path, check_same_thread=False)
+                # WAL: queries can run while a batch is being written; NORMAL is durable enough for a catalog that can be rebuilt.
+                self._connection.execute("PRAGMA journal_mode = WAL")
+                self._connection.execute("PRAGMA synchronous = NORMAL")
+                self._connection.executescript(_SCHEMA)
+            self._connection.execute("PRAGMA foreign_keys = ON")
+        except (sqlite3.Error, OSError) as e:
+            raise ALOHAError(f"Cannot open the catalog {self.path}: {e}") from e
+
+    def add(self, aibom):
+        """
+        Queues an AIBOM, and writes the queued AIBOMs if there are batch_size of them.
+
+        :raises ALOHAError: The AIBOM has no model component, or the batch could not be written (it stays queued, and is written again by the next write)
+        """
+        rows = _catalog_rows(aibom)
+        with self._lock:
+            self._pending.append(rows)
+            if len(self._pending) >= self.batch_size:
+                self._write_pending()
+
+    def flush(self):
+        """
+        Writes the queued AIBOMs.
+        """
+        with self._lock:
+            self._write_pending()
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        # Only the last AIBOM queued for a model is written: the rows of an earlier one would be queued under a deleted (or reused) id.
+        pending = list({model["model_id"]: (model, rows) for model, rows in self._pending}.values())
+        children = {table: [] for table in _INSERTS}
+        now = time.time()
+        try:
+            with get_metrics().span("catalog"), self._connection:
+                for model, model_children in pending:
+                    row = self._connection.execute("SELECT bom_hash FROM models WHERE model_id = ?", (model["model_id"],)).fetchone()
+                    if row is not None and model["bom_hash"] and row[0] == model["bom_hash"]:
+                        continue
+                    self._connection.execute("DELETE FROM models WHERE model_id = ?", (model["model_id"],))
+                    model_pk = self._connection.execute(
+                        "INSERT INTO models (model_id, bom_ref, serial_number, version, timestamp, bom_hash, task, architecture_family, "
+                        "model_architecture, library_name, cataloged_at) VALUES (:model_id, :bom_ref, :serial_number, :version, :timestamp, "
+                        ":bom_hash, :task, :architecture_family, :model_architecture, :library_name, :cataloged_at)",
+                        dict(model, cataloged_at=now)).lastrowid
+                    for table, rows in model_children.items():
+                        children[table].extend((model_pk,) + row for row in rows)
+                for table, rows in children.items():
+                    if rows:
+                        self._connection.executemany(_INSERTS[table], rows)
+            # Only once the transaction is committed: a batch that failed (e.g. the database was locked) stays queued for the next write.
+            self._pending = []
+        except sqlite3.Error as e:
+            raise ALOHAError(f"Cannot write to the catalog {self.path}: {e}") from e
+
+    def add_all(self, aiboms):
+        """
+        Catalogs many AIBOMs (e.g. those of iter_aiboms) in batches.
+
+        :param aiboms: Iterable of AIBOMs
+        :return: Number of AIBOMs cataloged
+        """
+        count = 0
+        for aibom in aiboms:
+            self.add(aibom)
+            count += 1
+        self.flush()
+        return count
+
+    def query(self, sql, params=()):
+        """
+        Runs a query on the catalog.
+
+        :param sql: SQL query (see QUERIES and the tables of _SCHEMA)
+        :param params: Parameters of the query, a sequence or a dict of named parameters
+        :return: List of rows, as dicts by column name
+        :raises ALOHAError: The query is invalid
+        """
+        with self._lock:
+            try:
+                cursor = self._connection.execute(sql, params)
+                columns = [column[0] for column in cursor.description or []]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            except sqlite3.Error as e:
+                raise ALOHAError(f"Invalid query on the catalog {self.path}: {e}") from e
+
+    def run(self, name, value=None, minimum=None, maximum=None):
+        """
+        Runs one of the QUERIES.
+
+        :param name: Name of the query, e.g. 'license'
+        :param value: License, dataset ID, base model ID, architecture family or metric type queried
+        :param minimum: Lowest metric value (metric query)
+        :param maximum: Highest metric value (metric query)
+        :return: List of rows, as dicts by column name
+        """
+        if name not in QUERIES:
+            raise ALOHAError(f"Unknown query: {name}")
+        params = {"value": value, "min": float("-inf") if minimum is None else minimum, "max": float("inf") if maximum is None else maximum}
+        return self.query(QUERIES[name][0], params)
+
+    def count_models(self):
+        """
+        :return: Number of models in the catalog
+        """
+        return self.query("SELECT COUNT(*) AS models FROM models")[0]["models"]
+
+    def close(self):
+        """
+        Writes the queued AIBOMs and closes the database.
+        """
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CatalogWriter:
+    """
+    Wraps a writer (see aloha.output) to also add every AIBOM it writes to a catalog.
+
+    AIBOMs already encoded by the CPU stages of a pipeline are decoded again for the catalog.
+    Closing the writer closes the catalog.
+    """
+
+    def __init__(self, writer, catalog):
+        self.writer = writer
+        self.catalog = catalog
+        self.encode = writer.encode
+
+    def write(self, aibom, model_id=None):
+        path = self.writer.write(aibom, model_id)
+        self.catalog.add(aibom)
+        return path
+
+    def write_encoded(self, data, model_id=None):
+        path = self.writer.write_encoded(data, model_id)
+        self.catalog.add(decode_aibom(data))
+        return path
+
+    def close(self):
+        try:
+            self.writer.close()
+        finally:
+            self.catalog.close()
+
+    def __getattr__(self, name):
+        return getattr(self.writer, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
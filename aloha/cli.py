@@ -0,0 +1,365 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+from . import limits
+from .batch import generate_aibom_batch, read_model_ids
+from .bom import generate_aibom
+from .cache import HTTP_CACHE_DIR, HTTP_CACHE_MAX_SIZE, ResponseCache
+from .canonical import configure_canonical_output
+from .dataset import DATASET_STORE_DIR, DATASET_STORE_TTL, configure_dataset_registry
+from .discovery import iter_hub_models
+from .exceptions import ALOHAError
+from .incremental import Manifest, generate_aibom_incremental
+from .licenses import configure_spdx_license_index
+from .limits import configure_limits
+from .lineage import LINEAGE_DEPTH, configure_lineage_registry
+from .local import load_local_model
+from .metrics import configure_metrics, span
+from .output import open_writer
+from .pipeline import PIPELINE_CPU_WORKERS, PIPELINE_QUEUE_SIZE, generate_aibom_pipeline
+from .transport import MAX_REQUESTS_PER_HOST, MAX_RETRIES, REQUEST_TIMEOUT, configure_transport
+
+
+def add_configuration_arguments(parser):
+    """
+    Adds the options read by configure(): network, caches, registries, caps, output mode and metrics.
+    """
+    parser.add_argument("--lineage-depth", type=int, help="Levels of base models (cardData.base_model) added to the AIBOM as components linked through 'dependencies'; 0 only records them as a property", default=LINEAGE_DEPTH)
+    parser.add_argument("--offline", action="store_true", help="Do not access the network: Hub responses are replayed from the HTTP cache, the SPDX license list comes from its cache or --spdx-snapshot")
+    parser.add_argument("--spdx-snapshot", type=str, help="Path to a local copy of https://spdx.org/licenses/licenses.json", default=None)
+    parser.add_argument("--max-per-host", type=int, help="Maximum number of concurrent requests to the same host", default=MAX_REQUESTS_PER_HOST)
+    parser.add_argument("--timeout", type=float, help="Timeout in seconds of every HTTP request", default=REQUEST_TIMEOUT)
+    parser.add_argument("--cache-dir", type=str, help="Directory of the HTTP cache of Hugging Face responses", default=HTTP_CACHE_DIR)
+    parser.add_argument("--cache-max-size", type=int, help="Maximum size in MB of the HTTP cache", default=HTTP_CACHE_MAX_SIZE // (1024 * 1024))
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the HTTP cache nor the dataset store")
+    parser.add_argument("--dataset-store", type=str, help="Directory where dataset components are stored and shared across runs", default=DATASET_STORE_DIR)
+    parser.add_argument("--dataset-ttl", type=int, help="Seconds a stored dataset component is reused before being fetched again", default=DATASET_STORE_TTL)
+    parser.add_argument("--metrics-jsonl", type=str, metavar="PATH", help="Append every timed stage and the per-model totals to this JSON lines file", default=None)
+    parser.add_argument("--retries", type=int, help="Number of retries of a failed HTTP request (connection errors, timeouts, 429 and 5xx)", default=MAX_RETRIES)
+    parser.add_argument("--max-metrics", type=int, help="Maximum number of performance metrics (cardData.model-index) in an AIBOM; the others are only counted", default=limits.MAX_PERFORMANCE_METRICS)
+    parser.add_argument("--max-tags", type=int, help="Maximum number of tags of a model in an AIBOM; the others are only counted", default=limits.MAX_TAGS)
+    parser.add_argument("--max-configs", type=int, help="Maximum number of subsets (configs) described for a dataset", default=limits.MAX_CONFIGS)
+    parser.add_argument("--max-data-files", type=int, help="Maximum number of data files listed for each subset of a dataset", default=limits.MAX_CONFIG_DATA_FILES)
+    parser.add_argument("--canonical", action="store_true", help="Deterministic output: sorted keys and lists, serialNumber derived from the content, timestamp from the model's lastModified, SHA-256 of the content in the metadata properties (bomHash)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="aloha", description="This script takes the Hugging Face model ID as input and generates an AIBOM (AI Bill of Materials) in CycloneDX format (.json). The AIBOM includes essential information about the model, such as dependencies, datasets, and associated metadata, to facilitate transparency, reproducibility, and proper tracking of machine learning models.")
+    parser.add_argument("model_id", type=str, nargs="?", help="ID of the Hugging Face machine learning model to create the AIBOM")
+    parser.add_argument("-o", "--output", type=str, help="Directory where the output files are saved", default=None)
+    parser.add_argument("--format", choices=["json", "ndjson"], help="json: one indented file per model; ndjson: compact AIBOMs appended one per line to aiboms.ndjson", default="json")
+    parser.add_argument("--compress", choices=["gzip", "zstd"], help="Compression of the ndjson output (zstd requires the zstandard package)", default=None)
+    parser.add_argument("--shard-records", type=int, help="Rotate the ndjson output into shards of at most this many AIBOMs", default=None)
+    parser.add_argument("--shard-size", type=int, help="Rotate the ndjson output into shards of about this many MB (uncompressed)", default=None)
+    parser.add_argument("--incremental", type=str, metavar="MANIFEST", help="Manifest of the AIBOMs already generated: models whose Hub commit did not change are skipped", default=None)
+    parser.add_argument("--batch", type=str, help="File with one model ID per line ('-' to read from stdin); an AIBOM is generated for each model", default=None)
+    parser.add_argument("--author", type=str, help="Generate the AIBOM of every model of this user or organization", default=None)
+    parser.add_argument("--search", type=str, help="Generate the AIBOM of every model whose ID contains this text", default=None)
+    parser.add_argument("--filter", type=str, action="append", help="Generate the AIBOM of every model with this tag (repeatable, e.g. --filter text-generation --filter license:mit)", default=None)
+    parser.add_argument("--limit", type=int, help="Maximum number of models listed by --author, --search or --filter", default=None)
+    parser.add_argument("--local", type=str, nargs="+", metavar="PATH", help="Generate the AIBOM of local model directories (config.json, README.md) or Hugging Face cache repositories, without accessing the network; the model_id, if given, names the model", default=None)
+    parser.add_argument("--workers", type=int, help="Number of models processed concurrently in batch mode (with --pipeline, models being fetched concurrently)", default=8)
+    parser.add_argument("--pipeline", action="store_true", help="Batch mode: fetch, parse, assemble and serialize the AIBOMs in separate stages linked by bounded queues, so network and CPU work overlap")
+    parser.add_argument("--cpu-workers", type=int, help="With --pipeline, threads of each CPU stage (README parsing, assembly, serialization)", default=PIPELINE_CPU_WORKERS)
+    parser.add_argument("--processes", type=int, help="With --pipeline, run the CPU stages on this many worker processes instead of threads", default=0)
+    parser.add_argument("--queue-size", type=int, help="With --pipeline, models waiting between two stages before the previous stage blocks", default=PIPELINE_QUEUE_SIZE)
+    parser.add_argument("--profile", action="store_true", help="Print the time spent in each stage (model API, README, SPDX, datasets, serialization) at the end of the run")
+    parser.add_argument("--metrics-prom", type=str, metavar="PATH", help="Write the metrics of the run to this file in the Prometheus text format", default=None)
+    parser.add_argument("--catalog", type=str, metavar="PATH", help="Also add every AIBOM written to this SQLite catalog, queried with 'aloha query' (e.g. ~/.cache/aloha/catalog.sqlite)", default=None)
+    add_configuration_arguments(parser)
+    return parser
+
+
+def build_serve_parser():
+    from .service import SERVICE_HOST, SERVICE_PORT
+    parser = argparse.ArgumentParser(prog="aloha serve", description="Runs ALOHA as a local HTTP service: GET /aibom/<model_id> returns the AIBOM of the model, /metrics the metrics in the Prometheus text format, /healthz the status of the service. Caches, connections and the SPDX license list stay warm between requests.")
+    parser.add_argument("--host", type=str, help="Address the service listens on", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, help="Port the service listens on", default=SERVICE_PORT)
+    add_configuration_arguments(parser)
+    return parser
+
+
+def configure(args):
+    """
+    Configures the shared transport, HTTP cache, dataset and lineage registries, SPDX license index, caps, output mode and metrics from the command line arguments.
+    """
+    configure_spdx_license_index(offline=args.offline, snapshot=args.spdx_snapshot)
+    configure_limits(performance_metrics=args.max_metrics, tags=args.max_tags, configs=args.max_configs, data_files=args.max_data_files)
+    configure_canonical_output(args.canonical)
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, args.cache_max_size * 1024 * 1024, offline=args.offline)
+    configure_transport(timeout=args.timeout, max_retries=args.retries, max_per_host=args.max_per_host, cache=cache)
+    configure_dataset_registry(store_dir=None if args.no_cache else args.dataset_store, ttl=args.dataset_ttl, offline=args.offline)
+    configure_lineage_registry(max_depth=args.lineage_depth)
+    return configure_metrics(jsonl_path=args.metrics_jsonl)
+
+
+def build_diff_parser():
+    parser = argparse.ArgumentParser(prog="aloha diff", description="Compares two generations of AIBOMs: two AIBOM files, or two outputs of ALOHA (directories of JSON files, NDJSON files or directories of NDJSON shards) model by model. Components are matched by bom-ref, properties by name, metrics by slice and type. Exits with 0 if nothing changed, 1 if something changed, 2 on errors.")
+    parser.add_argument("old", type=str, help="Previous AIBOM file or output")
+    parser.add_argument("new", type=str, help="New AIBOM file or output")
+    parser.add_argument("-o", "--output", type=str, help="Write the report to this file instead of the standard output", default=None)
+    parser.add_argument("--format", choices=["text", "json"], help="text: one line per change; json: one JSON line per model ({\"model\", \"status\", \"changes\"})", default="text")
+    parser.add_argument("--all", action="store_true", help="Also report the unchanged models")
+    return parser
+
+
+_QUERY_VALUES = {"license": "LICENSE", "dataset": "DATASET_ID", "base-model": "MODEL_ID", "architecture": "FAMILY", "metric": "TYPE"}
+
+def build_query_parser():
+    from .catalog import CATALOG_PATH, QUERIES
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument("--catalog", type=str, metavar="PATH", help="SQLite catalog written with --catalog", default=CATALOG_PATH)
+    options.add_argument("--format", choices=["text", "json"], help="text: one tab separated line per row; json: one JSON object per row", default="text")
+    parser = argparse.ArgumentParser(prog="aloha query", description="Queries the catalog of the AIBOMs generated with --catalog: licenses, datasets, base models, architectures and metrics of the models. Exits with 0 if rows were found, 1 if none, 2 on errors.")
+    queries = parser.add_subparsers(dest="query", metavar="QUERY", required=True)
+    for name, (_, description) in QUERIES.items():
+        query = queries.add_parser(name, parents=[options], help=description, description=description)
+        if name in _QUERY_VALUES:
+            query.add_argument("value", metavar=_QUERY_VALUES[name])
+        if name == "metric":
+            query.add_argument("--min", type=float, help="Lowest value", default=None)
+            query.add_argument("--max", type=float, help="Highest value", default=None)
+    query = queries.add_parser("sql", parents=[options], help="Runs a read-only SQL query (tables: models, components, licenses, datasets, base_models, metrics)")
+    query.add_argument("sql", metavar="SQL")
+    query = queries.add_parser("import", parents=[options], help="Adds the AIBOMs of outputs already written (JSON files, NDJSON files or directories of them) to the catalog")
+    query.add_argument("paths", metavar="PATH", nargs="+")
+    return parser
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    :param argv: Command line arguments (sys.argv[1:] if None)
+    :return: Exit code, 0 on success
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        return main_serve(argv[1:])
+    if argv and argv[0] == "diff":
+        return main_diff(argv[1:])
+    if argv and argv[0] == "query":
+        return main_query(argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    discovery = bool(args.author or args.search or args.filter)
+    if args.local:
+        if args.batch is not None or discovery:
+            parser.error("--local cannot be combined with --batch or --author/--search/--filter")
+        if args.model_id is not None and len(args.local) > 1:
+            parser.error("a model_id can only name a single --local model")
+        if args.no_cache:
+            parser.error("--local reads the datasets and base models from the HTTP cache and the dataset store, --no-cache cannot be used")
+        args.offline = True # Datasets, base models and licenses come from the local caches.
+    elif (args.model_id is not None) + (args.batch is not None) + discovery != 1:
+        parser.error("either a model_id, --batch, --local or --author/--search/--filter must be given")
+    if args.pipeline and args.batch is None and not discovery:
+        parser.error("--pipeline can only be used with --batch or --author/--search/--filter")
+    try:
+        metrics = configure(args)
+        writer = open_writer(args.output, args.format, args.compress, args.shard_records,
+                             args.shard_size * 1024 * 1024 if args.shard_size else None)
+        if args.catalog:
+            from .catalog import Catalog, CatalogWriter
+            writer = CatalogWriter(writer, Catalog(args.catalog))
+    except (ALOHAError, OSError) as e:
+        parser.error(str(e))
+
+    manifest = Manifest(args.incremental) if args.incremental else None
+    try:
+        with writer:
+            if args.batch is not None or discovery:
+                if args.batch is not None:
+                    models = read_model_ids(args.batch)
+                else:
+                    # The listing records already hold the model metadata, so the model API is not called per model.
+                    models = iter_hub_models(args.author, args.search, args.filter, args.limit)
+                if args.pipeline:
+                    created, failed = generate_aibom_pipeline(models, writer=writer, manifest=manifest, fetch_workers=args.workers,
+                                                              cpu_workers=args.cpu_workers, processes=args.processes, queue_size=args.queue_size)
+                else:
+                    created, failed = generate_aibom_batch(models, workers=args.workers, writer=writer, manifest=manifest)
+                return 1 if failed else 0
+            if args.local:
+                return generate_local(args.local, writer, manifest, args.model_id)
+            return generate_single(args.model_id, writer, manifest)
+    except ALOHAError as e:
+        print(f"❌ Request failed. Error: {e}")
+        return 1
+    finally:
+        report_metrics(metrics, args)
+
+
+def main_serve(argv):
+    """
+    Entry point of 'aloha serve'.
+    """
+    from .service import serve
+    parser = build_serve_parser()
+    args = parser.parse_args(argv)
+    try:
+        metrics = configure(args)
+    except (ALOHAError, OSError) as e:
+        parser.error(str(e))
+    try:
+        serve(args.host, args.port)
+    except (ALOHAError, OSError) as e:
+        print(f"❌ Failed to start the service: {e}")
+        return 1
+    finally:
+        metrics.close()
+    return 0
+
+
+def main_diff(argv):
+    """
+    Entry point of 'aloha diff'.
+
+    :return: Exit code: 0 if the AIBOMs are equivalent, 1 if they differ, 2 on errors
+    """
+    from .diff import diff_aibom_sources, diff_aiboms, format_change, get_aibom_model_id, iter_aiboms
+    parser = build_diff_parser()
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    counts = dict.fromkeys(("changed", "added", "removed", "unchanged"), 0)
+    try:
+        if _is_aibom_file(args.old) and _is_aibom_file(args.new):
+            (_, old), (_, new) = next(iter_aiboms(args.old)), next(iter_aiboms(args.new))
+            changes = diff_aiboms(old, new)
+            entries = [{"model": get_aibom_model_id(new), "status": "changed" if changes else "unchanged", "changes": changes}]
+        else:
+            entries = diff_aibom_sources(args.old, args.new)
+        with (open(args.output, "w", encoding="utf-8") if args.output else contextlib.nullcontext(sys.stdout)) as out:
+            for entry in entries:
+                counts[entry["status"]] += 1
+                if entry["status"] == "unchanged" and not args.all:
+                    continue
+                if args.format == "json":
+                    out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                else:
+                    symbol = {"changed": "~", "added": "+", "removed": "-", "unchanged": "="}[entry["status"]]
+                    out.write(f"{symbol} {entry['model']} ({entry['status']})\n")
+                    for change in entry.get("changes", []):
+                        out.write(format_change(change) + "\n")
+    except (ALOHAError, OSError, ValueError) as e:
+        print(f"❌ Diff failed. Error: {e}", file=sys.stderr)
+        return 2
+    # The summary goes to stderr, so the report on stdout can be piped.
+    print(f"✅ {counts['changed']} changed, {counts['added']} added, {counts['removed']} removed, {counts['unchanged']} unchanged "
+          f"in {time.perf_counter() - start:.2f} seconds", file=sys.stderr)
+    return 1 if counts["changed"] or counts["added"] or counts["removed"] else 0
+
+
+def main_query(argv):
+    """
+    Entry point of 'aloha query'.
+
+    :return: Exit code: 0 if rows were found (or AIBOMs imported), 1 if none, 2 on errors
+    """
+    from .catalog import Catalog
+    from .diff import iter_aiboms
+    parser = build_query_parser()
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    try:
+        if args.query == "import":
+            with Catalog(args.catalog) as catalog:
+                count = sum(catalog.add_all(aibom for _, aibom in iter_aiboms(path)) for path in args.paths)
+            print(f"✅ {count} AIBOMs added to {args.catalog} in {time.perf_counter() - start:.2f} seconds", file=sys.stderr)
+            return 0 if count else 1
+        with Catalog(args.catalog, readonly=True) as catalog:
+            start = time.perf_counter()
+            if args.query == "sql":
+                rows = catalog.query(args.sql)
+            else:
+                rows = catalog.run(args.query, getattr(args, "value", None), getattr(args, "min", None), getattr(args, "max", None))
+            seconds = time.perf_counter() - start
+    except (ALOHAError, OSError) as e:
+        print(f"❌ Query failed. Error: {e}", file=sys.stderr)
+        return 2
+    for row in rows:
+        if args.format == "json":
+            print(json.dumps(row, ensure_ascii=False))
+        else:
+            print("\t".join("" if value is None else str(value) for value in row.values()))
+    # The summary goes to stderr, so the rows on stdout can be piped.
+    print(f"✅ {len(rows)} rows in {seconds * 1000:.1f} ms", file=sys.stderr)
+    return 0 if rows else 1
+
+
+#Function to tell a single AIBOM file from an output of many AIBOMs (directory or NDJSON).
+def _is_aibom_file(path):
+    return os.path.isfile(path) and path.endswith(".json")
+
+
+def report_metrics(metrics, args):
+    """
+    Prints the per-stage breakdown (--profile) and exports the metrics of the run (--metrics-jsonl, --metrics-prom).
+    """
+    metrics.close()
+    if args.profile:
+        print(metrics.format_profile())
+    if args.metrics_prom:
+        try:
+            metrics.write_prometheus(args.metrics_prom)
+        except OSError as e:
+            print(f"❌ Failed to write the metrics to {args.metrics_prom}: {e}")
+
+
+def generate_local(paths, writer, manifest=None, modelID=None):
+    """
+    Generates the AIBOM of each local model directory.
+
+    :return: Exit code, 1 if any model failed
+    """
+    exit_code = 0
+    for path in paths:
+        try:
+            data, readme = load_local_model(path, modelID)
+        except ALOHAError as e:
+            print(f"❌ Failed to read the local model {path}: {e}")
+            exit_code = 1
+            continue
+        exit_code |= generate_single(data['id'], writer, manifest, data, readme)
+    return exit_code
+
+
+def generate_single(modelID, writer, manifest=None, data=None, readme=None):
+    try:
+        if manifest is None:
+            aibom, entry = generate_aibom(modelID, data=data, readme=readme), None
+        else:
+            aibom, entry = generate_aibom_incremental(modelID, manifest, data=data, readme=readme)
+        print(f"✅ Successfully retrieved model info for: {modelID}")
+    except ALOHAError as e:
+        print(f"❌ Request failed. Error: {e}")
+        return 1
+
+    if aibom is None:
+        if entry is not None:
+            manifest.update(modelID, entry)
+            manifest.save()
+        print(f"✅ AIBoM of {modelID} is up to date")
+        return 0
+
+    try:
+        with span("serialize"):
+            path = writer.write(aibom, modelID)
+        print(f"✅ AIBoM successfully created: {path}")
+    except Exception as e:
+        print(f"❌ Error in AIBoM creation: {e}")
+        return 1
+    # The manifest records the model only once its AIBOM is written.
+    if entry is not None:
+        manifest.update(modelID, entry)
+        manifest.save()
+    return 0
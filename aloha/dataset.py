@@ -0,0 +1,253 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import copy
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from . import limits
+from .exceptions import FetchError, OfflineError
+from .limits import dataset_decode_caps, decode_json, dropped_length, total_length
+from .mapping import Field, Mapping, as_property
+from .metrics import timed
+from .transport import http_get_cached, hub_url
+from .utils import atomic_write, generate_bom_ref, generate_properties, list_to_string
+
+
+#Function to list the data files of a dataset subset as JSON, up to MAX_CONFIG_DATA_FILES paths: datasets can have tens of thousands of shards.
+#Only the first MAX_CONFIG_DATA_FILES entries are read, as many as the decoder keeps (see dataset_decode_caps): the files of the others are counted.
+def _data_files_info(data_files_d):
+    if isinstance(data_files_d, (str, dict)):
+        data_files_d = [data_files_d] # A single pattern or split, not a list of them.
+    budget = limits.MAX_CONFIG_DATA_FILES
+    listed = []
+    omitted = dropped_length(data_files_d, 'path', missing=1) # Files of the entries dropped while decoding.
+    for n, d in enumerate(data_files_d):
+        paths = d.get('path') if isinstance(d, dict) else None
+        count = total_length(paths) if isinstance(paths, list) else 1
+        kept = min(count, budget if n < limits.MAX_CONFIG_DATA_FILES else 0)
+        omitted += count - kept
+        budget -= kept
+        if not kept:
+            continue
+        if kept < count:
+            d = dict(d, path=paths[:kept])
+        listed.append(json.dumps(d))
+    info = ", ".join(listed)
+    if omitted:
+        info += f" (and {omitted} more data files)"
+    return info
+
+#Function to describe each subset of the dataset: "Name of the dataset subset: {config_name} {data_files as JSON}".
+def _config_properties(configs_d):
+    properties = []
+    for config_d in itertools.islice(configs_d, limits.MAX_CONFIGS):
+        config_name_d = config_d['config_name']  #Name of the dataset subset, if applicable. Example: default
+        data_files_d = config_d['data_files']
+        strConfigInfo = "Name of the dataset subset: {} ".format(config_name_d)
+        strConfigInfo += _data_files_info(data_files_d)
+        properties.append(generate_properties('configs',strConfigInfo)) #configs  "Name of the dataset subset: {...configs->config_name}, split: {...configs->data_files->split}, path: {...configs->data_files->path}"
+    omitted = total_length(configs_d) - limits.MAX_CONFIGS
+    if omitted > 0:
+        properties.append(generate_properties('configs_omitted', str(omitted)))
+    return properties
+
+#The license_* fields are only meaningful when the license is 'other'.
+def _license_is_other(datasetData):
+    return 'license' in datasetData['cardData'] and list_to_string(datasetData['cardData']['license']) == 'other'
+
+# Mapping of the dataset metadata (as returned by the datasets API) to the dataset, applied in order.
+#components->modelCard->modelParameters->datasets->contents->properties
+DATASET_FIELDS = [
+    Field("cardData.task_categories", "contents.properties[]", as_property('task_categories', list_to_string)),
+    Field("cardData.task_ids", "contents.properties[]", as_property('task_ids', list_to_string)),
+    Field("cardData.language", "contents.properties[]", as_property('language', list_to_string)),
+    Field("cardData.language_details", "contents.properties[]", as_property('language_details', list_to_string)),
+    Field("cardData.size_categories", "contents.properties[]", as_property('size_categories', list_to_string)), #number_of_elements_in_dataset
+    Field("cardData.annotations_creators", "contents.properties[]", as_property('annotations_creators', list_to_string)),
+    Field("cardData.language_creators", "contents.properties[]", as_property('language_creators', list_to_string)),
+    Field("cardData.pretty_name", "contents.properties[]", as_property('pretty_name', list_to_string)),
+    Field("cardData.source_datasets", "contents.properties[]", as_property('source_datasets', list_to_string)),
+    Field("cardData.paperswithcode_id", "contents.properties[]", as_property('paperswithcode_id', list_to_string)),
+    Field("cardData.configs", "contents.properties[*]", _config_properties),
+    Field("cardData.license", "contents.properties[]", as_property('license', list_to_string)),
+    Field("cardData.license_name", "contents.properties[]", as_property('license_name'), condition=_license_is_other),
+    Field("cardData.license_link", "contents.properties[]", as_property('license_link'), condition=_license_is_other),
+    Field("cardData.license_details", "contents.properties[]", as_property('license_details'), condition=_license_is_other),
+    #components->modelCard->modelParameters->datasets->governance->owners->organization->name, url
+    Field("author", "governance", lambda author_name: {"owners": [{"organization": {"name": author_name, "url": 'https://huggingface.co/{}'.format(author_name)}}]}, default=''),
+    Field("description", "description", default=''), #components->modelCard->modelParameters->datasets->description
+]
+DATASET_MAPPING = Mapping(DATASET_FIELDS)
+
+
+@timed("dataset")
+def generate_dataset_component(dataset_ID, revision=None, transport=None):
+#components->modelCard->modelParameters->datasets
+    API_dataset_URL = hub_url("api/datasets/{}")
+    if revision:
+        API_dataset_URL += f"/revision/{revision}"
+    Dataset_URL = "https://huggingface.co/datasets/{}"
+
+    response = http_get_cached(API_dataset_URL.format(dataset_ID), revision or "main", transport)
+    if response.status_code == 200:
+        try:
+            datasetData = decode_json(response.content, dataset_decode_caps())
+        except ValueError as e:
+            raise FetchError(f"Invalid response for dataset {dataset_ID}: {e}") from e
+        url_dataset = Dataset_URL.format(dataset_ID) #components->modelCard->modelParameters->datasets->contents->url
+        dataset = {
+            "type": "dataset",
+            "bom-ref": generate_bom_ref(dataset_ID),
+            "name": dataset_ID,
+            "contents": {
+                "url": url_dataset,
+            }
+        }
+        if datasetData.get('cardData') is None:
+            # No dataset card: the dataset is only named, as if it was not on Hugging Face.
+            return _bare_dataset_component(dataset_ID)
+        DATASET_MAPPING.convert(datasetData, dataset)
+
+    else:
+        # Error, the dataset is not present on Hugging Face
+        print(f"Error in the request. Status code: {response.status_code}, dataset: {dataset_ID}")
+        return _bare_dataset_component(dataset_ID)
+
+    return _dataset_component(dataset_ID, dataset)
+
+#Function to wrap the description of a dataset into its component.
+def _dataset_component(dataset_ID, dataset):
+    dataset_compoent = {
+        "type": "data",
+        "bom-ref": generate_bom_ref(dataset_ID),
+        "name": dataset_ID,
+        "data": []
+    }
+    dataset_compoent['data'].append(dataset)
+
+    return dataset_compoent
+
+#Function to build the component of a dataset whose card is not available: only its name and bom-ref.
+def _bare_dataset_component(dataset_ID):
+    dataset = {
+        "type": "dataset",
+        "bom-ref": generate_bom_ref(dataset_ID),
+        "name": dataset_ID
+    }
+    return _dataset_component(dataset_ID, dataset)
+
+
+DATASET_STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "aloha", "datasets")
+DATASET_STORE_TTL = 24 * 60 * 60 # Seconds a stored dataset component is reused across runs.
+
+
+class DatasetRegistry:
+    """
+    Memoized dataset components, keyed by dataset ID and optional revision.
+
+    Each dataset is fetched and converted once per run, even when several models (or threads)
+    ask for it at the same time. With a store_dir the components are also shared across runs,
+    for ttl seconds (at any age in offline mode). A component held in memory for more than ttl
+    seconds is loaded again, so a long-running service (see aloha.service) does not serve stale datasets.
+    """
+
+    def __init__(self, store_dir=None, ttl=DATASET_STORE_TTL, offline=False):
+        self.store_dir = store_dir
+        self.ttl = ttl
+        self.offline = offline
+        self._futures = {} # (dataset_ID, revision) -> Future of the dataset component
+        self._loaded_at = {} # (dataset_ID, revision) -> time.monotonic() when the component was loaded
+        self._lock = threading.Lock()
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+
+    def _store_path(self, dataset_ID, revision):
+        # The caps are part of the key: a component stored with other caps lists other configs and data files.
+        caps = json.dumps(limits.get_limits(), sort_keys=True)
+        key = hashlib.sha256(f"{dataset_ID}@{revision or ''}@{caps}".encode("utf-8")).hexdigest()
+        return os.path.join(self.store_dir, f"{key}.json")
+
+    def _load(self, dataset_ID, revision, transport):
+        if self.store_dir:
+            try:
+                with open(self._store_path(dataset_ID, revision), "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                # Stores written by older versions may hold no component (a dataset without card): it is generated again.
+                if stored["component"] is not None and (self.offline or time.time() - stored["storedAt"] < self.ttl):
+                    return stored["component"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+        try:
+            component = generate_dataset_component(dataset_ID, revision, transport)
+        except OfflineError as e:
+            # Offline (e.g. --local), a dataset missing from the HTTP cache does not fail the model: it is only named,
+            # as a dataset that is not on Hugging Face, and not stored, so an online run fetches it.
+            print(f"❌ Dataset {dataset_ID} is not available offline, only its name is recorded: {e}")
+            return _bare_dataset_component(dataset_ID)
+
+        if self.store_dir and component is not None:
+            stored = {"dataset": dataset_ID, "revision": revision, "storedAt": time.time(), "component": component}
+            try:
+                atomic_write(self._store_path(dataset_ID, revision), json.dumps(stored).encode("utf-8"))
+            except OSError as e:
+                print(f"❌ Failed to store dataset {dataset_ID}: {e}")
+        return component
+
+    def get(self, dataset_ID, revision=None, transport=None):
+        """
+        Returns the dataset component of dataset_ID, generating it only the first time.
+
+        :param dataset_ID: Dataset ID (e.g., 'wikipedia')
+        :param revision: Optional revision of the dataset (branch, tag or commit)
+        :param transport: HTTPTransport used if the dataset has to be fetched (the shared one if None)
+        :return: A copy of the dataset component, the caller is free to modify it
+        """
+        key = (dataset_ID, revision)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and future.done() and time.monotonic() - self._loaded_at[key] >= self.ttl and not self.offline:
+                future = None
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+        if owner:
+            try:
+                component = self._load(dataset_ID, revision, transport)
+                with self._lock:
+                    self._loaded_at[key] = time.monotonic()
+                future.set_result(component)
+            except Exception as e:
+                # Failures are not memoized, the next model referencing the dataset tries again.
+                with self._lock:
+                    del self._futures[key]
+                future.set_exception(e)
+        return copy.deepcopy(future.result())
+
+
+_dataset_registry = None
+_dataset_registry_lock = threading.Lock()
+
+def get_dataset_registry():
+    global _dataset_registry
+    with _dataset_registry_lock:
+        if _dataset_registry is None:
+            _dataset_registry = DatasetRegistry()
+        return _dataset_registry
+
+def configure_dataset_registry(**kwargs):
+    """
+    Replaces the shared dataset registry with one built with the given DatasetRegistry arguments.
+    """
+    global _dataset_registry
+    with _dataset_registry_lock:
+        _dataset_registry = DatasetRegistry(**kwargs)
+        return _dataset_registry
@@ -0,0 +1,324 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Diff of AIBOMs: what changed between two generations of the AIBOM of a model (aloha diff).
+
+diff_aiboms() compares two AIBOMs as CycloneDX documents rather than as text. Components are
+matched by bom-ref, and the items of the lists by their identity: properties by name, performance
+metrics by (slice, type), licenses by SPDX id or name, datasets and dependencies by ref. The order
+of the lists, the serialNumber, version, timestamp and bomHash (see aloha.canonical) are ignored.
+Every item is indexed once, so the comparison is linear in the size of the AIBOMs.
+
+diff_aibom_sources() compares two whole outputs (directories of JSON files, NDJSON files or
+directories of NDJSON shards) model by model, streaming: only the fingerprints of the old AIBOMs
+and the new versions of the changed models are held in memory, and a model whose fingerprint did
+not change is not compared at all. The fingerprint is the hash of the encoded AIBOM without the
+fields set anew at every generation, so the AIBOMs are decoded but never encoded again.
+"""
+
+import collections
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+
+from .canonical import BOM_HASH_PROPERTY
+from .exceptions import ALOHAError
+
+# Identity of the items of the lists compared by key, by name of the list; the other lists are compared as multisets.
+_LIST_KEYS = {
+    "authors": lambda author: (author["name"],),
+    "data": lambda data: (data["name"],),
+    "datasets": lambda dataset: (dataset["ref"],),
+    "dependencies": lambda dependency: (dependency["ref"],),
+    "externalReferences": lambda reference: (reference["type"], reference["url"]),
+    "licenses": lambda entry: (entry["license"].get("id") or entry["license"]["name"],),
+    "performanceMetrics": lambda metric: (metric["slice"], metric["type"]),
+    "properties": lambda prop: (prop["name"],),
+}
+
+_NDJSON_SUFFIXES = (".ndjson", ".ndjson.gz", ".ndjson.zst")
+_VOLATILE_FIELDS = re.compile(rb'"(?:serialNumber|timestamp)": ?"[^"]*"') # Fields set anew at every generation, as encoded by ALOHA.
+
+
+#Function to encode a value in a form where equal values are equal strings (keys of the multisets).
+def _canonical_json(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def _change(op, component, path, old=None, new=None):
+    change = {"op": op, "path": path}
+    if component is not None:
+        change["component"] = component
+    if op != "added":
+        change["old"] = old
+    if op != "removed":
+        change["new"] = new
+    return change
+
+
+def _diff_value(path, old, new, component, changes):
+    if old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in old.items():
+            key_path = f"{path}.{key}" if path else key
+            if key in new:
+                _diff_value(key_path, value, new[key], component, changes)
+            else:
+                changes.append(_change("removed", component, key_path, old=value))
+        for key, value in new.items():
+            if key not in old:
+                changes.append(_change("added", component, f"{path}.{key}" if path else key, new=value))
+    elif isinstance(old, list) and isinstance(new, list):
+        _diff_list(path, old, new, component, changes)
+    else:
+        changes.append(_change("changed", component, path, old, new))
+
+def _index(items, key):
+    index = collections.defaultdict(list)
+    for item in items:
+        index[key(item)].append(item)
+    return index
+
+def _diff_list(path, old, new, component, changes):
+    key = _LIST_KEYS.get(path.rsplit(".", 1)[-1])
+    if key is not None:
+        try:
+            old_index, new_index = _index(old, key), _index(new, key)
+        except (KeyError, TypeError, AttributeError):
+            pass # Items without their identity (e.g. not dicts): compared as a multiset.
+        else:
+            for item_key, old_items in old_index.items():
+                item_path = path + "".join(f"[{part}]" for part in item_key)
+                new_items = new_index.get(item_key, [])
+                if len(old_items) == 1 and len(new_items) == 1:
+                    _diff_value(item_path, old_items[0], new_items[0], component, changes)
+                else:
+                    _diff_multiset(item_path, old_items, new_items, component, changes)
+            for item_key, new_items in new_index.items():
+                if item_key not in old_index:
+                    _diff_multiset(path + "".join(f"[{part}]" for part in item_key), [], new_items, component, changes)
+            return
+    _diff_multiset(path, old, new, component, changes)
+
+def _diff_multiset(path, old, new, component, changes):
+    old_encoded = [_canonical_json(item) for item in old]
+    new_encoded = [_canonical_json(item) for item in new]
+    old_counts, new_counts = collections.Counter(old_encoded), collections.Counter(new_encoded)
+    for item, encoded in zip(old, old_encoded):
+        if old_counts[encoded] > new_counts[encoded]:
+            old_counts[encoded] -= 1
+            changes.append(_change("removed", component, path, old=item))
+    for item, encoded in zip(new, new_encoded):
+        if new_counts[encoded] > old_counts[encoded]:
+            new_counts[encoded] -= 1
+            changes.append(_change("added", component, path, new=item))
+
+
+#Function to split an AIBOM into its components, by bom-ref, and the rest of the document without the fields that change at every generation.
+def _split_aibom(aibom):
+    metadata = dict(aibom.get("metadata", {}))
+    model = metadata.pop("component", None)
+    metadata.pop("timestamp", None)
+    if "properties" in metadata:
+        metadata["properties"] = [prop for prop in metadata["properties"] if prop.get("name") != BOM_HASH_PROPERTY]
+        if not metadata["properties"]:
+            del metadata["properties"]
+    document = {key: value for key, value in aibom.items() if key not in ("serialNumber", "version", "metadata", "components")}
+    document["metadata"] = metadata
+    components = {}
+    for component in ([model] if model else []) + (aibom.get("components") or []):
+        if not isinstance(component, dict):
+            continue # AIBOMs written by older versions may list a null dataset component.
+        components[component.get("bom-ref") or component.get("name")] = component
+    return components, document
+
+
+def diff_aiboms(old, new):
+    """
+    Compares two AIBOMs (e.g. two generations of the AIBOM of a model).
+
+    Each change is a dict {"op": "added" | "removed" | "changed", "path", "component", "old", "new"}:
+    path is the changed field, relative to the component (e.g. 'modelCard.properties[library_name].value',
+    'licenses[mit]'), component the bom-ref of the component, absent for the fields of the document
+    (e.g. 'dependencies[<ref>].dependsOn'). A component added or removed is one change with an empty
+    path, holding the whole component.
+
+    :param old: The previous AIBOM, as a dict
+    :param new: The new AIBOM, as a dict
+    :return: List of changes, empty if the AIBOMs are equivalent
+    """
+    changes = []
+    old_components, old_document = _split_aibom(old)
+    new_components, new_document = _split_aibom(new)
+    for ref, component in old_components.items():
+        if ref in new_components:
+            _diff_value("", component, new_components[ref], ref, changes)
+        else:
+            changes.append(_change("removed", ref, "", old=component))
+    for ref, component in new_components.items():
+        if ref not in old_components:
+            changes.append(_change("added", ref, "", new=component))
+    _diff_value("", old_document, new_document, None, changes)
+    return changes
+
+
+#Function to get the model ID of an AIBOM, the name of its main component.
+def get_aibom_model_id(aibom):
+    return aibom.get("metadata", {}).get("component", {}).get("name")
+
+#Function to get the fingerprint of an encoded AIBOM: the hash of its bytes without serialNumber and timestamp. Equal fingerprints are
+#equivalent AIBOMs; different ones may still be (e.g. lists in another order), they are compared with diff_aiboms.
+def _fingerprint(data):
+    return hashlib.sha256(_VOLATILE_FIELDS.sub(b"", data)).digest()
+
+#Function to decode an encoded AIBOM (bytes or str), with orjson when it is installed.
+def decode_aibom(data):
+    try:
+        import orjson
+    except ImportError:
+        return json.loads(data) # orjson only makes the diff of large outputs faster (pip install .[fast]).
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data) # Documents orjson rejects (e.g. integers over 64 bits), or a ValueError for invalid JSON.
+
+
+def _open_ndjson(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise ALOHAError(f"Reading {path} requires the zstandard package (pip install zstandard)")
+        # A stream appended to by several runs holds several frames.
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True))
+    return open(path, "rb")
+
+def _aibom_files(path):
+    if os.path.isdir(path):
+        names = sorted(name for name in os.listdir(path) if name.endswith(".json") or name.endswith(_NDJSON_SUFFIXES))
+        return [os.path.join(path, name) for name in names]
+    if os.path.isfile(path):
+        return [path]
+    raise ALOHAError(f"No AIBOMs found at {path}")
+
+def _iter_encoded_aiboms(path, positions=None):
+    """
+    :param positions: Positions (in reading order) of the AIBOMs to decode, all of them if None
+    :return: Iterator of (position, AIBOM, encoded AIBOM) tuples
+    """
+    position = 0
+    for file_path in _aibom_files(path):
+        try:
+            if file_path.endswith(_NDJSON_SUFFIXES):
+                with _open_ndjson(file_path) as f:
+                    for line in f:
+                        line = line.rstrip(b"\r\n")
+                        if not line.strip():
+                            continue
+                        if positions is None or position in positions:
+                            yield position, decode_aibom(line), line
+                        position += 1
+            else:
+                if positions is None or position in positions:
+                    with open(file_path, "rb") as f:
+                        data = f.read()
+                    yield position, decode_aibom(data), data
+                position += 1
+        except ValueError as e:
+            raise ALOHAError(f"Invalid AIBOM in {file_path}: {e}") from e
+
+def iter_aiboms(path):
+    """
+    Reads the AIBOMs written by ALOHA, one at a time.
+
+    :param path: A JSON file, an NDJSON file (possibly gzip or zstd compressed), or a directory of them (shards are read in order)
+    :return: Iterator of (model ID, AIBOM) tuples
+    :raises ALOHAError: The path does not exist, or a file is not valid JSON
+    """
+    for _, aibom, _ in _iter_encoded_aiboms(path):
+        yield get_aibom_model_id(aibom), aibom
+
+
+def _diff_entry(model_id, old, new):
+    changes = diff_aiboms(old, new)
+    if not changes:
+        return {"model": model_id, "status": "unchanged"}
+    return {"model": model_id, "status": "changed", "changes": changes}
+
+def _is_json_directory(path):
+    return os.path.isdir(path) and not any(name.endswith(_NDJSON_SUFFIXES) for name in os.listdir(path))
+
+def _diff_directories(old_dir, new_dir):
+    # Two directories of JSON files: the AIBOMs of a model have the same file name, compared one pair at a time.
+    old_names = {name for name in os.listdir(old_dir) if name.endswith(".json")}
+    for name in sorted(name for name in os.listdir(new_dir) if name.endswith(".json")):
+        (_, new, new_data), = _iter_encoded_aiboms(os.path.join(new_dir, name))
+        if name not in old_names:
+            yield {"model": get_aibom_model_id(new), "status": "added"}
+            continue
+        old_names.discard(name)
+        (_, old, old_data), = _iter_encoded_aiboms(os.path.join(old_dir, name))
+        if _fingerprint(old_data) == _fingerprint(new_data):
+            yield {"model": get_aibom_model_id(new), "status": "unchanged"}
+        else:
+            yield _diff_entry(get_aibom_model_id(new), old, new)
+    for name in sorted(old_names):
+        (_, old, _), = _iter_encoded_aiboms(os.path.join(old_dir, name))
+        yield {"model": get_aibom_model_id(old), "status": "removed"}
+
+def _diff_streams(old_path, new_path):
+    # NDJSON outputs: the AIBOMs of a model can be anywhere in the shards, so they are joined by model ID.
+    fingerprints = {} # model ID -> (fingerprint, position in the old output)
+    for position, aibom, data in _iter_encoded_aiboms(old_path):
+        fingerprints[get_aibom_model_id(aibom)] = (_fingerprint(data), position)
+    changed = {} # position in the old output -> (model ID, new AIBOM), compared in a second pass over the old output.
+    seen = set()
+    for _, aibom, data in _iter_encoded_aiboms(new_path):
+        model_id = get_aibom_model_id(aibom)
+        seen.add(model_id)
+        if model_id not in fingerprints:
+            yield {"model": model_id, "status": "added"}
+        elif fingerprints[model_id][0] == _fingerprint(data):
+            yield {"model": model_id, "status": "unchanged"}
+        else:
+            changed[fingerprints[model_id][1]] = (model_id, aibom)
+    if changed:
+        for position, old, _ in _iter_encoded_aiboms(old_path, changed):
+            model_id, new = changed[position]
+            yield _diff_entry(model_id, old, new)
+    for model_id in fingerprints:
+        if model_id not in seen:
+            yield {"model": model_id, "status": "removed"}
+
+def diff_aibom_sources(old_path, new_path):
+    """
+    Compares two outputs of ALOHA model by model (see iter_aiboms for the paths accepted).
+
+    :return: Iterator of {"model", "status": "added" | "removed" | "changed" | "unchanged", "changes"} dicts,
+             changes (see diff_aiboms) only for the changed models
+    :raises ALOHAError: An output cannot be read
+    """
+    if _is_json_directory(old_path) and _is_json_directory(new_path):
+        return _diff_directories(old_path, new_path)
+    return _diff_streams(old_path, new_path)
+
+
+#Function to describe a change in one line, for the text report of aloha diff.
+def format_change(change):
+    symbol = {"added": "+", "removed": "-", "changed": "~"}[change["op"]]
+    location = change.get("component", "")
+    if change["path"]:
+        location = f"{location} {change['path']}" if location else change["path"]
+    if change["op"] == "changed":
+        return f"  {symbol} {location}: {json.dumps(change['old'], ensure_ascii=False)} -> {json.dumps(change['new'], ensure_ascii=False)}"
+    value = change["new"] if change["op"] == "added" else change["old"]
+    if not change["path"]:
+        return f"  {symbol} {location} (component {change['op']})"
+    return f"  {symbol} {location}: {json.dumps(value, ensure_ascii=False)}"
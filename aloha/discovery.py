@@ -0,0 +1,71 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Discovery: lists the models of an author, a search or a filter from the paginated Hub listing."""
+
+from .bom import MODEL_FIELDS
+from .exceptions import FetchError
+from .limits import decode_json, model_decode_caps
+from .metrics import timed
+from .transport import http_get, hub_url
+
+LISTING_PAGE_SIZE = 1000 # Models per page of the listing, the maximum allowed by the Hub.
+
+
+@timed("listing")
+def _get_listing_page(url, params, transport):
+    response = http_get(url, transport, params=params)
+    if response.status_code == 400 and params and any(key == "expand[]" for key, value in params):
+        return None # A field cannot be expanded by this endpoint.
+    if response.status_code != 200:
+        raise FetchError(f"Failed to list the models ({url}): status code {response.status_code}")
+    try:
+        return decode_json(response.content, model_decode_caps("item.")), response.links.get("next", {}).get("url")
+    except ValueError as e:
+        raise FetchError(f"Invalid model listing ({url}): {e}") from e
+
+
+def iter_hub_models(author=None, search=None, filters=None, limit=None, page_size=LISTING_PAGE_SIZE, transport=None):
+    """
+    Iterates over the models of the Hub matching the given criteria, with their metadata.
+
+    The listing is walked page by page following the cursor of the 'Link: <...>; rel="next"' header,
+    and every record already holds the fields read by build_aibom (MODEL_FIELDS, requested with
+    expand[]), so no per-model call to the model API is needed.
+
+    :param author: User or organization owning the models (e.g., 'bigcode')
+    :param search: Text contained in the model IDs
+    :param filters: Tags the models must have (e.g., ['text-generation', 'license:mit'])
+    :param limit: Maximum number of models returned (all the matching models if None)
+    :param page_size: Models requested per page
+    :param transport: HTTPTransport to use (the shared one if None)
+    :return: Generator of model metadata dicts, in the format returned by get_model_data
+    :raises FetchError: A page of the listing could not be retrieved
+    """
+    params = [("limit", min(page_size, limit) if limit else page_size)]
+    if author:
+        params.append(("author", author))
+    if search:
+        params.append(("search", search))
+    for tag in filters or ():
+        params.append(("filter", tag))
+
+    url = hub_url("api/models")
+    page = _get_listing_page(url, params + [("expand[]", field) for field in MODEL_FIELDS], transport)
+    if page is None:
+        # The endpoint (e.g. an older mirror) rejected expand[]: the full records are requested instead.
+        page = _get_listing_page(url, params + [("full", "true"), ("cardData", "true"), ("config", "true")], transport)
+    records, next_url = page
+
+    returned = 0
+    while True:
+        for record in records:
+            yield record
+            returned += 1
+            if limit and returned >= limit:
+                return
+        if not next_url:
+            return
+        # The next page URL already carries the query and the cursor.
+        records, next_url = _get_listing_page(next_url, None, transport)
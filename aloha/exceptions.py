@@ -0,0 +1,25 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Exceptions raised by ALOHA. All of them derive from ALOHAError."""
+
+
+class ALOHAError(Exception):
+    """Base class of the errors raised by ALOHA."""
+
+
+class FetchError(ALOHAError):
+    """A resource could not be retrieved (network error, timeout or unexpected HTTP status)."""
+
+
+class ModelNotFoundError(FetchError):
+    """The model does not exist on Hugging Face, or it is not accessible."""
+
+
+class OfflineError(FetchError):
+    """The resource is not available locally and network access is disabled."""
+
+
+class LicenseListError(ALOHAError):
+    """The SPDX license list could not be loaded."""
@@ -0,0 +1,111 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Incremental generation: AIBOMs are rebuilt only for the models whose Hub commit changed."""
+
+import json
+import os
+import threading
+
+from .bom import build_aibom, get_model_data
+from .canonical import bom_content_hash
+from .metrics import span
+from .transport import resolve_transport
+from .utils import atomic_write
+
+
+class Manifest:
+    """
+    Manifest of the AIBOMs already generated: model ID -> {"sha", "lastModified", "bomHash", "serialNumber", "version"}.
+
+    Stored as a JSON file; save() writes it atomically.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+                if not isinstance(entries, dict):
+                    raise ValueError("not a JSON object")
+                self._entries = entries
+            except (OSError, ValueError) as e:
+                # e.g. truncated by a full disk: every model is generated again, and the next save() replaces it.
+                print(f"❌ Cannot read the manifest {path}, starting from an empty manifest: {e}")
+
+    def get(self, model_id):
+        with self._lock:
+            return self._entries.get(model_id)
+
+    def update(self, model_id, entry):
+        with self._lock:
+            self._entries[model_id] = entry
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._entries, indent=1, sort_keys=True).encode("utf-8")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        atomic_write(self.path, data)
+
+
+def generate_aibom_incremental(model_id, manifest, *, session=None, cache=None, data=None, readme=None):
+    """
+    Generates the AIBOM of a model only if it changed since the version recorded in the manifest.
+
+    The model metadata is always fetched (with an HTTP cache it is a revalidation) to read the
+    commit sha. If the sha is the one in the manifest the model is skipped. Otherwise the AIBOM is
+    rebuilt: it keeps the previous serialNumber, and its version is increased only if its content
+    actually changed (a new commit that does not touch the mapped fields produces no new AIBOM).
+
+    The manifest is not updated: the caller records the new entry once the AIBOM is written, so a
+    model whose AIBOM could not be written is generated again by the next run.
+
+    :param model_id: Model ID (e.g., 'google-bert/bert-base-uncased')
+    :param manifest: Manifest of the previous generations
+    :param data: Metadata of the model already retrieved (e.g., by aloha.discovery): an unchanged model costs no request at all
+    :param readme: ModelReadme of the model already retrieved (e.g., by aloha.local)
+    :return: Tuple (new AIBOM or None if the model did not change, new manifest entry or None if the commit did not change)
+    """
+    transport = resolve_transport(session, cache)
+    with span("generate_aibom", model_id):
+        if data is None:
+            data = get_model_data(model_id, transport)
+        previous = manifest.get(model_id)
+        if previous and data.get('sha') and previous.get('sha') == data['sha']:
+            return None, None
+        bom = build_aibom(data, transport, readme)
+
+    entry, changed = version_aibom(bom, data, previous)
+    return bom if changed else None, entry
+
+
+def version_aibom(bom, data, previous):
+    """
+    Gives a rebuilt AIBOM the serialNumber of its previous version, and a new version number only if its content changed.
+
+    :param bom: The rebuilt AIBOM, modified in place
+    :param data: Model metadata the AIBOM was built from
+    :param previous: Manifest entry of the previous version, None for a new model
+    :return: Tuple (new manifest entry, True if the content of the AIBOM changed)
+    """
+    bom_hash = bom_content_hash(bom)
+    changed = True
+    if previous:
+        bom['serialNumber'] = previous['serialNumber']
+        changed = previous['bomHash'] != bom_hash
+        bom['version'] = previous['version'] + 1 if changed else previous['version']
+
+    entry = {
+        "sha": data.get('sha'),
+        "lastModified": data.get('lastModified'),
+        "bomHash": bom_hash,
+        "serialNumber": bom['serialNumber'],
+        "version": bom['version']
+    }
+    return entry, changed
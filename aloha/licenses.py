@@ -0,0 +1,135 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import json
+import os
+import threading
+import time
+
+from .exceptions import FetchError, LicenseListError
+from .metrics import timed
+from .transport import http_get
+from .utils import atomic_write
+
+SPDX_LICENSES_URL = os.environ.get("ALOHA_SPDX_URL", "https://spdx.org/licenses/licenses.json")
+SPDX_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "aloha", "spdx_licenses.json")
+SPDX_CACHE_TTL = 7 * 24 * 60 * 60 # Seconds before the on-disk SPDX license list is refreshed.
+SPDX_OFFLINE = False # When True the license list is never downloaded, only read from the cache or a snapshot.
+SPDX_SNAPSHOT_PATH = None # Optional local copy of licenses.json (or of the ALOHA cache file).
+
+# SPDX license index, built once per process: lowercased licenseId -> {'licenseId', 'reference'}
+_spdx_license_index = None
+_spdx_license_list_version = None
+_spdx_license_lock = threading.Lock()
+
+def _build_spdx_license_index(licenses_data):
+    index = {}
+    for license in licenses_data.get("licenses", []):
+        index[license["licenseId"].lower()] = {
+            "licenseId": license["licenseId"],
+            "reference": license["reference"]
+        }
+    return index
+
+def _read_spdx_file(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_spdx_cache(licenses_data, path):
+    # Only the fields ALOHA needs are persisted, together with the list version and the download time.
+    cache_data = {
+        "licenseListVersion": licenses_data.get("licenseListVersion"),
+        "fetchedAt": time.time(),
+        "licenses": [
+            {"licenseId": license["licenseId"], "reference": license["reference"]}
+            for license in licenses_data.get("licenses", [])
+        ]
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, json.dumps(cache_data).encode("utf-8"))
+    except OSError as e:
+        print(f"❌ Failed to write the SPDX license cache {path}: {e}")
+
+@timed("spdx")
+def load_spdx_license_index(offline=None, snapshot=None, cache_path=None, ttl=None):
+    """
+    Loads the SPDX license index and keeps it for the rest of the process.
+
+    Sources, in order: the local snapshot (if given), the on-disk cache (if younger than the TTL,
+    or at any age in offline mode), the SPDX website. A stale cache is still used when the download fails.
+
+    :param offline: Never download the license list (defaults to SPDX_OFFLINE)
+    :param snapshot: Path to a local licenses.json (defaults to SPDX_SNAPSHOT_PATH)
+    :param cache_path: Path of the on-disk cache (defaults to SPDX_CACHE_PATH)
+    :param ttl: Maximum age of the on-disk cache in seconds (defaults to SPDX_CACHE_TTL)
+    :return: Dict mapping the lowercased SPDX licenseId to {'licenseId', 'reference'}
+    """
+    global _spdx_license_index, _spdx_license_list_version
+
+    offline = SPDX_OFFLINE if offline is None else offline
+    snapshot = SPDX_SNAPSHOT_PATH if snapshot is None else snapshot
+    cache_path = SPDX_CACHE_PATH if cache_path is None else cache_path
+    ttl = SPDX_CACHE_TTL if ttl is None else ttl
+
+    licenses_data = None
+    if snapshot:
+        licenses_data = _read_spdx_file(snapshot)
+        if licenses_data is None:
+            raise LicenseListError(f"Unable to read the SPDX license snapshot {snapshot}.")
+    else:
+        cached = _read_spdx_file(cache_path)
+        cache_age = time.time() - cached.get("fetchedAt", 0) if cached else None
+        if cached and (offline or cache_age < ttl):
+            licenses_data = cached
+        elif offline:
+            raise LicenseListError(f"No SPDX license list available offline: {cache_path} does not exist, use --spdx-snapshot.")
+        else:
+            try:
+                response = http_get(SPDX_LICENSES_URL)
+                if response.status_code != 200:
+                    raise FetchError(f"status code {response.status_code}")
+                licenses_data = response.json()
+                _write_spdx_cache(licenses_data, cache_path)
+            except (FetchError, ValueError) as e:
+                if not cached:
+                    raise LicenseListError(f"Unable to retrieve the SPDX license list: {e}") from e
+                print(f"❌ Failed to refresh the SPDX license list, using the cached version: {e}")
+                licenses_data = cached
+
+    _spdx_license_index = _build_spdx_license_index(licenses_data)
+    _spdx_license_list_version = licenses_data.get("licenseListVersion")
+    return _spdx_license_index
+
+def configure_spdx_license_index(offline=False, snapshot=None, index=None):
+    """
+    Sets where the SPDX license index is loaded from; the index is reloaded on the next lookup.
+
+    :param offline: Never download the license list
+    :param snapshot: Path to a local licenses.json
+    :param index: Index already loaded by another process (see aloha.pipeline), used as is
+    """
+    global SPDX_OFFLINE, SPDX_SNAPSHOT_PATH, _spdx_license_index
+    with _spdx_license_lock:
+        SPDX_OFFLINE = offline
+        SPDX_SNAPSHOT_PATH = snapshot
+        _spdx_license_index = index
+
+def get_spdx_license_index():
+    if _spdx_license_index is None:
+        with _spdx_license_lock: # Batch workers must not download the list concurrently.
+            if _spdx_license_index is None:
+                return load_spdx_license_index()
+    return _spdx_license_index
+
+# Function to get the list of SPDX licenses.
+def get_spdx_licenses():
+    return list(get_spdx_license_index().values())
+
+#Function to check if a license is recognized by SPDX, if not recognized, returns None.
+def is_license_recognized(license_name):
+    return get_spdx_license_index().get(str(license_name).lower())
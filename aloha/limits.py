@@ -0,0 +1,194 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Memory bounds: caps on the lists copied from the Hub metadata into an AIBOM, and a streaming JSON decoder.
+
+Some repositories have model cards with thousands of evaluation results (leaderboard models),
+thousands of tags, or dataset configs listing tens of thousands of shards. Only the first items
+of these lists are copied into the AIBOM, followed by a summary of what was left out (see
+aloha.bom and aloha.dataset).
+
+Responses of at least STREAM_DECODE_MIN_BYTES are decoded incrementally with ijson, when it is
+installed (pip install .[stream]). While decoding, the lists at the capped paths stop growing at
+their cap: the items beyond it are parsed but never built, so a multi-MB response never becomes
+a tree of millions of Python objects. Those lists are CappedList instances, which remember the
+length of the original list and how many items the capped lists of the dropped items held, so the
+summaries are the same as without ijson.
+"""
+
+import io
+import json
+
+MAX_PERFORMANCE_METRICS = 1000 # Entries of modelCard.quantitativeAnalysis.performanceMetrics.
+MAX_TAGS = 1000 # Tags of a model component.
+MAX_CONFIGS = 100 # Subsets (configs) of a dataset described in its properties.
+MAX_CONFIG_DATA_FILES = 100 # Data files listed for each subset of a dataset.
+STREAM_DECODE_MIN_BYTES = 1024 * 1024 # Smaller responses are decoded with json.loads, which is faster.
+
+
+class CappedList(list):
+    """
+    List whose items beyond limit were dropped while decoding; total is the length of the original list.
+
+    For each key in keys, dropped[key] counts the items of the lists (a single value counting as one)
+    found at that key in the dropped items, and dropped_without[key] the dropped items without it.
+    """
+
+    def __init__(self, iterable=(), limit=None, keys=()):
+        super().__init__(iterable)
+        self.limit = limit
+        self.total = len(self)
+        self.dropped = dict.fromkeys(keys, 0)
+        self.dropped_without = dict.fromkeys(keys, 0)
+
+
+#Function to get the length of a list before it was capped by the decoder.
+def total_length(values):
+    return getattr(values, "total", len(values))
+
+#Function to count the items of the key lists in the items dropped from values by the decoder; items without key count as missing.
+def dropped_length(values, key, missing=0):
+    if not isinstance(values, CappedList):
+        return 0
+    return values.dropped.get(key, 0) + missing * values.dropped_without.get(key, 0)
+
+
+def configure_limits(performance_metrics=None, tags=None, configs=None, data_files=None):
+    """
+    Sets the caps of the lists copied into the AIBOMs; None keeps the current value.
+    """
+    global MAX_PERFORMANCE_METRICS, MAX_TAGS, MAX_CONFIGS, MAX_CONFIG_DATA_FILES
+    if performance_metrics is not None:
+        MAX_PERFORMANCE_METRICS = performance_metrics
+    if tags is not None:
+        MAX_TAGS = tags
+    if configs is not None:
+        MAX_CONFIGS = configs
+    if data_files is not None:
+        MAX_CONFIG_DATA_FILES = data_files
+
+def get_limits():
+    """
+    :return: The current caps, as keyword arguments of configure_limits (e.g. for worker processes)
+    """
+    return {"performance_metrics": MAX_PERFORMANCE_METRICS, "tags": MAX_TAGS, "configs": MAX_CONFIGS, "data_files": MAX_CONFIG_DATA_FILES}
+
+
+#Caps applied while decoding a model record (the API response, or an item of the listing with prefix 'item.').
+def model_decode_caps(prefix=""):
+    return {
+        f"{prefix}tags": MAX_TAGS,
+        f"{prefix}siblings": 0, # Files of the repository, never read: only sent by endpoints ignoring expand[].
+        f"{prefix}cardData.model-index.item.results": MAX_PERFORMANCE_METRICS,
+        f"{prefix}cardData.model-index.item.results.item.metrics": MAX_PERFORMANCE_METRICS,
+    }
+
+#Caps applied while decoding a dataset record.
+def dataset_decode_caps():
+    return {
+        "tags": 0,
+        "siblings": 0,
+        "cardData.configs": MAX_CONFIGS,
+        "cardData.configs.item.data_files": MAX_CONFIG_DATA_FILES,
+        "cardData.configs.item.data_files.item.path": MAX_CONFIG_DATA_FILES,
+        "cardData.configs.item.data_files.path": MAX_CONFIG_DATA_FILES, # A single split, not a list of them.
+    }
+
+
+def decode_json(body, caps=None):
+    """
+    Decodes a JSON response body.
+
+    :param body: Response body, as bytes
+    :param caps: Dict ijson prefix (e.g. 'cardData.configs') -> maximum number of items kept in the list at that path
+    :return: The decoded document; the capped lists are CappedList instances when ijson was used
+    :raises ValueError: The body is not valid JSON
+    """
+    if caps and len(body) >= STREAM_DECODE_MIN_BYTES:
+        try:
+            import ijson
+        except ImportError:
+            pass # Streaming decode is an optimization: without ijson the lists are capped after decoding.
+        else:
+            try:
+                return _decode_capped(ijson.parse(io.BytesIO(body), use_float=True), caps)
+            except ijson.JSONError as e:
+                raise ValueError(str(e)) from e
+    return json.loads(body)
+
+
+def _decode_capped(events, caps):
+    result = None
+    stack = [] # Containers being built, innermost last.
+    keys = [] # Key of the next value of each map of the stack.
+    skipping = 0 # Depth inside an item that is dropped.
+    dropped_from, found = None, {} # CappedList of the dropped item, and the count of each key found in it.
+    key_paths, item_paths = {}, {} # Prefixes of the counted keys of the dropped item, and of their list items.
+    for prefix, event, value in events:
+        if skipping:
+            if event in ("end_map", "end_array"):
+                skipping -= 1
+                if not skipping:
+                    for key in dropped_from.dropped:
+                        if key in found:
+                            dropped_from.dropped[key] += found[key]
+                        else:
+                            dropped_from.dropped_without[key] += 1
+                continue
+            if event == "map_key":
+                continue
+            if prefix in key_paths: # The value at a counted key of the dropped item: a list, or a single value.
+                found.setdefault(key_paths[prefix], 0)
+                if event not in ("start_map", "start_array"):
+                    found[key_paths[prefix]] += 1
+            elif prefix in item_paths: # An item of the list at a counted key.
+                found[item_paths[prefix]] += 1
+            if event in ("start_map", "start_array"):
+                skipping += 1
+            continue
+        if event == "map_key":
+            keys[-1] = value
+            continue
+        if event in ("end_map", "end_array"):
+            stack.pop()
+            keys.pop()
+            continue
+
+        parent = stack[-1] if stack else None
+        if isinstance(parent, CappedList):
+            parent.total += 1
+            if len(parent) >= parent.limit:
+                if event in ("start_map", "start_array"):
+                    skipping = 1
+                    dropped_from = parent
+                    found = {}
+                    key_paths = {f"{prefix}.{key}": key for key in parent.dropped}
+                    item_paths = {f"{prefix}.{key}.item": key for key in parent.dropped}
+                else:
+                    for key in parent.dropped:
+                        parent.dropped_without[key] += 1
+                continue
+
+        if event == "start_map":
+            node = {}
+        elif event == "start_array":
+            if prefix in caps:
+                # The lists capped inside the items of this one are counted in its dropped items.
+                counted = [path[len(prefix) + 6:] for path in caps if path.startswith(f"{prefix}.item.")]
+                node = CappedList(limit=caps[prefix], keys=[key for key in counted if "." not in key])
+            else:
+                node = []
+        else:
+            node = value
+        if parent is None:
+            result = node
+        elif isinstance(parent, list):
+            parent.append(node)
+        else:
+            parent[keys[-1]] = node
+        if event in ("start_map", "start_array"):
+            stack.append(node)
+            keys.append(None)
+    return result
@@ -0,0 +1,151 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Lineage: the base models a model derives from (cardData.base_model), resolved recursively."""
+
+import contextvars
+import copy
+import threading
+import time
+from concurrent.futures import Future
+
+from .bom import generate_cyclonedx_component, get_model_data
+from .exceptions import ALOHAError, ModelNotFoundError
+from .metrics import timed
+from .transport import get_fetch_executor
+from .utils import generate_bom_ref
+
+LINEAGE_DEPTH = 0 # Levels of base models added to the AIBOM, 0 to only record them as a property.
+LINEAGE_TTL = 24 * 60 * 60 # Seconds a base model component is memoized before being loaded again.
+
+
+#Function to read the base models of a model from its API metadata, as a list of model IDs.
+def get_base_models(data):
+    base_model = (data.get('cardData') or {}).get('base_model')
+    if not base_model:
+        return []
+    if isinstance(base_model, str):
+        base_model = [base_model]
+    return list(dict.fromkeys(str(model_id).strip() for model_id in base_model if model_id and str(model_id).strip()))
+
+
+class LineageRegistry:
+    """
+    Memoized base model components, keyed by model ID.
+
+    A base model shared by many models of a batch (e.g. a popular Llama or Mistral checkpoint) is
+    fetched and converted once per run, even when several threads ask for it at the same time.
+    Models that do not exist or are gated are memoized too, other failures are retried by the
+    next model that references them. A base model held in memory for more than ttl seconds is
+    loaded again, so a long-running service (see aloha.service) sees new versions of the base
+    models, and models that became accessible.
+    """
+
+    def __init__(self, max_depth=LINEAGE_DEPTH, ttl=LINEAGE_TTL):
+        self.max_depth = max_depth
+        self.ttl = ttl
+        self._futures = {} # model ID -> Future of {"component", "parents"}, or of None if the model is not accessible
+        self._loaded_at = {} # model ID -> time.monotonic() when the model was loaded
+        self._lock = threading.Lock()
+
+    @timed("lineage")
+    def _load(self, model_id, transport):
+        try:
+            data = get_model_data(model_id, transport)
+        except ModelNotFoundError as e:
+            print(f"❌ Base model {model_id} is not accessible: {e}")
+            return None
+        return {"component": generate_cyclonedx_component(data, None, transport), "parents": get_base_models(data)}
+
+    def get(self, model_id, transport=None):
+        """
+        Returns the component of the base model model_id and the IDs of its own base models.
+
+        :param model_id: Model ID (e.g., 'meta-llama/Llama-2-7b-hf')
+        :param transport: HTTPTransport used if the model has to be fetched (the shared one if None)
+        :return: Dict {"component", "parents"} (a copy, free to modify), None if the model is not accessible
+        """
+        with self._lock:
+            future = self._futures.get(model_id)
+            if future is not None and future.done() and time.monotonic() - self._loaded_at[model_id] >= self.ttl:
+                future = None
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[model_id] = future
+        if owner:
+            try:
+                node = self._load(model_id, transport)
+                with self._lock:
+                    self._loaded_at[model_id] = time.monotonic()
+                future.set_result(node)
+            except Exception as e:
+                with self._lock:
+                    del self._futures[model_id]
+                future.set_exception(e)
+        return copy.deepcopy(future.result())
+
+    def resolve(self, data, transport=None, max_depth=None):
+        """
+        Walks the base model graph of a model breadth first, up to max_depth levels.
+
+        The base models of a level are fetched concurrently on the fetch pool. A model reached
+        through several paths (a merge of two fine-tunes of the same base) is added once.
+
+        :param data: Model metadata as returned by get_model_data
+        :param transport: HTTPTransport used for the base models (the shared one if None)
+        :param max_depth: Levels to resolve, 1 for the direct base models only (defaults to self.max_depth)
+        :return: Tuple (base model components, CycloneDX dependencies linking each model to its base models)
+        """
+        max_depth = self.max_depth if max_depth is None else max_depth
+        root_id = data.get('id')
+        parents = {root_id: get_base_models(data)} # model ID -> IDs of its base models
+        nodes = {} # model ID -> {"component", "parents"}, None if it could not be resolved
+        frontier = [root_id]
+        executor = get_fetch_executor()
+
+        for _ in range(max_depth):
+            level = list(dict.fromkeys(parent for child in frontier for parent in parents[child]
+                                       if parent not in nodes and parent != root_id))
+            if not level:
+                break
+            # Each task runs in a copy of the current context, so its requests are attributed to this model in the metrics.
+            futures = [(model_id, executor.submit(contextvars.copy_context().run, self.get, model_id, transport)) for model_id in level]
+            for model_id, future in futures:
+                try:
+                    nodes[model_id] = future.result()
+                except ALOHAError as e:
+                    print(f"❌ Failed to resolve base model {model_id}: {e}")
+                    nodes[model_id] = None
+            frontier = [model_id for model_id in level if nodes[model_id] is not None]
+            for model_id in frontier:
+                parents[model_id] = nodes[model_id]["parents"]
+
+        components = [node["component"] for node in nodes.values() if node is not None]
+        dependencies = []
+        for model_id, base_models in parents.items():
+            depends_on = [generate_bom_ref(parent) for parent in base_models if nodes.get(parent) is not None]
+            if depends_on:
+                dependencies.append({"ref": generate_bom_ref(model_id), "dependsOn": depends_on})
+        return components, dependencies
+
+
+_lineage_registry = None
+_lineage_registry_lock = threading.Lock()
+
+def get_lineage_registry():
+    global _lineage_registry
+    with _lineage_registry_lock:
+        if _lineage_registry is None:
+            _lineage_registry = LineageRegistry()
+        return _lineage_registry
+
+def configure_lineage_registry(**kwargs):
+    """
+    Replaces the shared lineage registry with one built with the given LineageRegistry arguments.
+    """
+    global _lineage_registry
+    with _lineage_registry_lock:
+        _lineage_registry = LineageRegistry(**kwargs)
+        return _lineage_registry
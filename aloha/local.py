@@ -0,0 +1,142 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Local mode: the model metadata is read from a model directory on disk instead of the Hub API."""
+
+import json
+import os
+from datetime import datetime, timezone
+
+from .exceptions import ALOHAError
+from .metrics import timed
+from .readme import ModelReadme, get_front_matter
+
+HF_CACHE_PREFIX = "models--" # Repositories in the Hugging Face cache: models--<org>--<name>/snapshots/<sha>/
+
+
+#Function to convert the name of a repository in the Hugging Face cache to its model ID (models--org--name -> org/name).
+def _cache_repo_id(directory):
+    name = os.path.basename(directory)
+    if not name.startswith(HF_CACHE_PREFIX):
+        return None
+    return name[len(HF_CACHE_PREFIX):].replace("--", "/", 1)
+
+
+def resolve_snapshot(path):
+    """
+    Finds the model files of a local model.
+
+    path can be a plain model directory (e.g. written by save_pretrained or a git clone), a
+    repository of the Hugging Face cache (models--org--name, whose snapshot is the one of
+    refs/main, or else the most recent one) or one of its snapshots (models--org--name/snapshots/<sha>).
+
+    :return: Tuple (directory of the model files, model ID or None, commit sha or None)
+    """
+    path = os.path.abspath(path)
+    if not os.path.isdir(path):
+        raise ALOHAError(f"{path} is not a directory")
+
+    parent = os.path.dirname(path)
+    if os.path.basename(parent) == "snapshots":
+        return path, _cache_repo_id(os.path.dirname(parent)), os.path.basename(path)
+
+    snapshots = os.path.join(path, "snapshots")
+    if os.path.isdir(snapshots):
+        sha = None
+        try:
+            with open(os.path.join(path, "refs", "main"), "r", encoding="utf-8") as f:
+                sha = f.read().strip()
+        except OSError:
+            pass
+        if not sha or not os.path.isdir(os.path.join(snapshots, sha)):
+            candidates = [entry.path for entry in os.scandir(snapshots) if entry.is_dir()]
+            if not candidates:
+                raise ALOHAError(f"No snapshot in {snapshots}")
+            sha = os.path.basename(max(candidates, key=os.path.getmtime))
+        return os.path.join(snapshots, sha), _cache_repo_id(path), sha
+
+    return path, None, None
+
+
+def parse_card_data(readme_text):
+    """
+    Parses the YAML front matter of a README, the card data returned as 'cardData' by the Hub API.
+
+    PyYAML is imported only when a README has a front matter.
+
+    :return: The card data as a dict (empty if the README has no front matter)
+    """
+    front_matter = get_front_matter(readme_text)
+    if not front_matter:
+        return {}
+    try:
+        import yaml
+    except ImportError:
+        raise ALOHAError("Reading the card data of a local model requires the PyYAML package (pip install pyyaml)")
+    try:
+        card_data = yaml.safe_load(front_matter)
+    except yaml.YAMLError as e:
+        raise ALOHAError(f"Invalid YAML front matter in the README: {e}") from e
+    if not isinstance(card_data, dict):
+        return {}
+    # YAML dates and timestamps become strings, as in the JSON returned by the Hub.
+    return json.loads(json.dumps(card_data, default=str))
+
+
+def _read_text(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+@timed("local")
+def load_local_model(path, model_id=None):
+    """
+    Reads a local model directory and builds the same metadata get_model_data retrieves from the Hub.
+
+    cardData comes from the front matter of README.md, config.model_type and config.architectures from
+    config.json; pipeline_tag, library_name and tags are taken from the card data, as the Hub does
+    when the author declares them. No HTTP request is sent.
+
+    :param path: Model directory or Hugging Face cache repository (see resolve_snapshot)
+    :param model_id: Model ID (e.g., 'google-bert/bert-base-uncased'), by default the ID of the cache repository or the directory name
+    :return: Tuple (model metadata as a dict, ModelReadme of README.md, empty if there is none)
+    """
+    directory, cache_model_id, sha = resolve_snapshot(path)
+    model_id = model_id or cache_model_id or os.path.basename(directory)
+
+    readme_path = os.path.join(directory, "README.md")
+    config_path = os.path.join(directory, "config.json")
+    readme_text = _read_text(readme_path)
+    config_text = _read_text(config_path)
+    if readme_text is None and config_text is None:
+        raise ALOHAError(f"Neither README.md nor config.json found in {directory}")
+
+    card_data = parse_card_data(readme_text)
+    data = {"id": model_id, "modelId": model_id, "cardData": card_data}
+    if "/" in model_id:
+        data["author"] = model_id.split("/")[0]
+    if sha:
+        data["sha"] = sha
+
+    if config_text is not None:
+        try:
+            config = json.loads(config_text)
+        except ValueError as e:
+            raise ALOHAError(f"Invalid {config_path}: {e}") from e
+        data["config"] = {key: config[key] for key in ("model_type", "architectures") if key in config}
+
+    for field in ("pipeline_tag", "library_name"):
+        if card_data.get(field):
+            data[field] = card_data[field]
+    tags = card_data.get("tags")
+    if tags:
+        data["tags"] = [tags] if isinstance(tags, str) else list(tags)
+
+    modified = max(os.path.getmtime(p) for p in (readme_path, config_path) if os.path.exists(p))
+    data["lastModified"] = datetime.fromtimestamp(modified, timezone.utc).isoformat()
+
+    return data, ModelReadme(readme_text)
@@ -0,0 +1,180 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Field mapping: tables of Field rules, compiled once, convert Hub metadata into CycloneDX structures.
+
+A rule reads a value at a source path of the record, optionally transforms it and writes it at a
+target path of the component, e.g.:
+
+    Field("cardData.pretty_name", "contents.properties[]", as_property("pretty_name"))
+
+Target paths create the intermediate dicts as needed. A plain last segment is assigned, 'name[]'
+appends the value to a list and 'name[*]' extends a list with the values (nothing is created for
+an empty sequence). The rules are applied in table order, so the keys of the output keep the order
+of the table. Supporting a new card field is one more rule in the table.
+"""
+
+from .utils import generate_properties
+
+MISSING = object()
+
+
+class Field:
+    """
+    One mapping rule.
+
+    :param source: Dotted path of the value in the record (e.g., 'cardData.license')
+    :param target: Dotted path in the component, ending with '[]' (append) or '[*]' (extend) for lists
+    :param transform: Function converting the value; when it returns None nothing is written
+    :param truthy: Apply the rule only if the value is truthy, not just present
+    :param default: Value used when the source path is missing (by default the rule is skipped)
+    :param condition: Extra predicate on the whole record, e.g. present('cardData.base_model')
+    """
+
+    __slots__ = ("source", "target", "transform", "truthy", "default", "condition")
+
+    def __init__(self, source, target, transform=None, truthy=False, default=MISSING, condition=None):
+        self.source = source
+        self.target = target
+        self.transform = transform
+        self.truthy = truthy
+        self.default = default
+        self.condition = condition
+
+
+def compile_getter(path):
+    """
+    :return: Function returning the value at the dotted path of a record, MISSING if a key is missing
+    """
+    keys = tuple(path.split("."))
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda record: record.get(key, MISSING)
+
+    # Paths of two and three keys (e.g. 'cardData.license', 'model.cardData.license') are unrolled.
+    if len(keys) == 2:
+        first, second = keys
+        def get(record):
+            value = record.get(first)
+            return value.get(second, MISSING) if isinstance(value, dict) else MISSING
+        return get
+
+    if len(keys) == 3:
+        first, second, third = keys
+        def get(record):
+            value = record.get(first)
+            if not isinstance(value, dict):
+                return MISSING
+            value = value.get(second)
+            return value.get(third, MISSING) if isinstance(value, dict) else MISSING
+        return get
+
+    def get(record):
+        value = record
+        for key in keys:
+            if not isinstance(value, dict):
+                return MISSING
+            value = value.get(key, MISSING)
+            if value is MISSING:
+                return MISSING
+        return value
+    return get
+
+
+def compile_setter(path):
+    """
+    :return: Function writing a value at the dotted path of a component
+    """
+    *parents, last = path.split(".")
+    if last.endswith("[*]"):
+        key = last[:-3]
+        def write(node, value):
+            if value:
+                node.setdefault(key, []).extend(value)
+    elif last.endswith("[]"):
+        key = last[:-2]
+        def write(node, value):
+            node.setdefault(key, []).append(value)
+    else:
+        key = last
+        def write(node, value):
+            node[key] = value
+
+    if not parents:
+        return write
+
+    def set_value(component, value):
+        node = component
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        write(node, value)
+    return set_value
+
+
+#Function to build a predicate checking that a path exists in the record, for Field(condition=...).
+def present(path):
+    get = compile_getter(path)
+    return lambda record: get(record) is not MISSING
+
+
+def _compile_field(field):
+    get = compile_getter(field.source)
+    set_value = compile_setter(field.target)
+    transform, truthy, default, condition = field.transform, field.truthy, field.default, field.condition
+
+    def apply(record, component):
+        value = get(record)
+        if value is MISSING:
+            if default is MISSING:
+                return
+            value = default
+        if truthy and not value:
+            return
+        if condition is not None and not condition(record):
+            return
+        if transform is not None:
+            value = transform(value)
+            if value is None:
+                return
+        set_value(component, value)
+    return apply
+
+
+class Mapping:
+    """
+    A table of Field rules compiled into a flat list of closures: converting a record runs each
+    closure once, without parsing paths or looking rules up again.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self._rules = [_compile_field(field) for field in self.fields]
+
+    def convert(self, record, component=None):
+        """
+        Applies the rules to record.
+
+        :param record: Source dict (e.g., the API metadata of a dataset)
+        :param component: Dict the values are written to, modified in place (a new dict if None)
+        :return: The component
+        """
+        if component is None:
+            component = {}
+        for rule in self._rules:
+            rule(record, component)
+        return component
+
+    def extend(self, fields):
+        """
+        :return: A new Mapping with the rules of this one followed by fields
+        """
+        return Mapping(self.fields + list(fields))
+
+
+#Function to build a transform wrapping a value into a CycloneDX property, e.g. as_property('license', list_to_string).
+def as_property(name, convert=None):
+    if convert is None:
+        return lambda value: generate_properties(name, value)
+    return lambda value: generate_properties(name, convert(value))
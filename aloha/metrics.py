@@ -0,0 +1,283 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Instrumentation: time spent in each stage, HTTP and cache counters, per model and per run."""
+
+import collections
+import contextlib
+import contextvars
+import functools
+import json
+import threading
+import time
+
+from .utils import atomic_write
+
+# Model whose AIBOM is being generated by the current thread (or fetch task), used to attribute requests and bytes.
+_current_model = contextvars.ContextVar("aloha_current_model", default=None)
+
+MAX_MODEL_STATS = 10000 # Models whose totals are kept in memory, the most recently active ones.
+
+_PROMETHEUS_COUNTERS = {
+    "http_requests": "HTTP requests sent, retries included",
+    "http_errors": "HTTP requests that failed without a response",
+    "http_bytes": "Bytes of the HTTP response bodies",
+    "cache_hits": "Responses served by the HTTP cache without a request",
+    "cache_revalidated": "Cached responses revalidated with a 304 Not Modified",
+    "cache_misses": "Responses downloaded because they were not cached or had changed",
+    "coalesced_requests": "Service requests answered by a generation already in flight for the same model",
+    "unchanged_outputs": "Canonical AIBOMs identical to the file already written, not written again",
+}
+
+
+class Metrics:
+    """
+    Collects the duration of every stage of the generation (spans) and the HTTP and cache counters.
+
+    Totals are kept per stage and per model. With jsonl_path, every span is also appended to a
+    JSON lines file as soon as it ends ({"type": "span", "stage", "model", "start", "duration", "error"}),
+    followed by one {"type": "model", ...} line per model when the metrics are closed. The depth of
+    the queues between the stages of a pipeline (see aloha.pipeline) is sampled at every put.
+
+    Only the totals of the max_models most recently active models are kept, so a long-running
+    service does not grow with every model it is asked for. The least recently active model is
+    evicted: its line is written to the JSON lines file at once, and it still counts in the
+    number of models and in the averages of the profile.
+    """
+
+    def __init__(self, jsonl_path=None, max_models=MAX_MODEL_STATS):
+        self.jsonl_path = jsonl_path
+        self.max_models = max_models
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stages = {} # stage -> {"calls", "errors", "seconds", "max"}
+        self._counters = dict.fromkeys(_PROMETHEUS_COUNTERS, 0)
+        self._models = collections.OrderedDict() # model ID -> {"seconds", "http_requests", ...}, least recently active first
+        self._evicted_models = 0
+        self._evicted_seconds = 0.0
+        self._queues = {} # queue -> {"capacity", "samples", "total", "max", "full"}
+        self._jsonl = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+
+    @contextlib.contextmanager
+    def span(self, stage, model_id=None):
+        """
+        Times the enclosed block as one call of stage. With model_id, the block and the requests it
+        sends (also from fetch tasks started with copy_context) are attributed to that model.
+        """
+        token = _current_model.set(model_id) if model_id is not None else None
+        model_id = _current_model.get()
+        start = time.time()
+        counter = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            duration = time.perf_counter() - counter
+            if token is not None:
+                _current_model.reset(token)
+            self._record_span(stage, model_id, start, duration, error, token is not None)
+
+    def _record_span(self, stage, model_id, start, duration, error, model_total):
+        with self._lock:
+            stats = self._stages.setdefault(stage, {"calls": 0, "errors": 0, "seconds": 0.0, "max": 0.0})
+            stats["calls"] += 1
+            stats["errors"] += error
+            stats["seconds"] += duration
+            stats["max"] = max(stats["max"], duration)
+            if model_total:
+                self._model(model_id)["seconds"] += duration
+            if self._jsonl is not None:
+                event = {"type": "span", "stage": stage, "model": model_id, "start": round(start, 6), "duration": round(duration, 6), "error": error}
+                self._jsonl.write(json.dumps(event) + "\n")
+
+    def record(self, stage, duration, model_id=None, error=False):
+        """
+        Records a call of stage timed elsewhere (e.g. in a worker process), without adding it to the model total.
+        """
+        self._record_span(stage, model_id, time.time() - duration, duration, error, False)
+
+    def observe_queue(self, name, depth, capacity):
+        """
+        Samples the depth of a bounded queue before an item is put; a full queue blocks the producer.
+        """
+        with self._lock:
+            stats = self._queues.setdefault(name, {"capacity": capacity, "samples": 0, "total": 0, "max": 0, "full": 0})
+            stats["samples"] += 1
+            stats["total"] += depth
+            stats["max"] = max(stats["max"], depth)
+            stats["full"] += depth >= capacity
+
+    def _model(self, model_id):
+        stats = self._models.get(model_id)
+        if stats is None:
+            stats = self._models[model_id] = dict.fromkeys(["seconds"] + list(_PROMETHEUS_COUNTERS), 0)
+            if len(self._models) > self.max_models:
+                self._evict_model()
+        else:
+            self._models.move_to_end(model_id)
+        return stats
+
+    def _evict_model(self):
+        model_id, stats = self._models.popitem(last=False)
+        self._evicted_models += 1
+        self._evicted_seconds += stats["seconds"]
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(dict(stats, type="model", model=model_id)) + "\n")
+
+    def count(self, name, value=1):
+        """
+        Increments a counter (see _PROMETHEUS_COUNTERS), for the run and for the current model.
+        """
+        model_id = _current_model.get()
+        with self._lock:
+            self._counters[name] += value
+            if model_id is not None:
+                self._model(model_id)[name] += value
+
+    def get_stages(self):
+        with self._lock:
+            return {stage: dict(stats) for stage, stats in self._stages.items()}
+
+    def get_counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def get_queues(self):
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._queues.items()}
+
+    def get_model_stats(self):
+        """
+        :return: Totals of the models kept in memory (see max_models), by model ID
+        """
+        with self._lock:
+            return {model_id: dict(stats) for model_id, stats in self._models.items() if model_id is not None}
+
+    def get_model_count(self):
+        """
+        :return: Tuple (number of models, seconds spent on them), evicted models included
+        """
+        with self._lock:
+            return (len(self._models) + self._evicted_models,
+                    sum(stats["seconds"] for stats in self._models.values()) + self._evicted_seconds)
+
+    def format_profile(self):
+        """
+        :return: Per-stage breakdown of the run, as printed by --profile
+        """
+        stages = self.get_stages()
+        counters = self.get_counters()
+        models, seconds = self.get_model_count()
+        elapsed = time.time() - self.started
+        lines = [f"{'stage':<22}{'calls':>8}{'errors':>8}{'total s':>10}{'mean ms':>10}{'max ms':>10}"]
+        for stage, stats in sorted(stages.items(), key=lambda item: -item[1]["seconds"]):
+            mean = stats["seconds"] / stats["calls"] * 1000 if stats["calls"] else 0.0
+            lines.append(f"{stage:<22}{stats['calls']:>8}{stats['errors']:>8}{stats['seconds']:>10.2f}{mean:>10.1f}{stats['max'] * 1000:>10.1f}")
+        lines.append("Stages overlap: generate_aibom includes the other stages, READMEs and datasets are fetched concurrently.")
+        cached = counters["cache_hits"] + counters["cache_revalidated"] + counters["cache_misses"]
+        hit_rate = (counters["cache_hits"] + counters["cache_revalidated"]) / cached if cached else 0.0
+        lines.append(f"Wall time {elapsed:.2f}s, {counters['http_requests']} HTTP requests ({counters['http_errors']} failed), "
+                     f"{counters['http_bytes'] / 1e6:.2f} MB, cache hit rate {hit_rate:.0%}")
+        if models:
+            lines.append(f"Per model: {counters['http_requests'] / models:.1f} requests, "
+                         f"{counters['http_bytes'] / models / 1e3:.1f} KB, "
+                         f"{seconds / models * 1000:.0f} ms on average over {models} models")
+        queues = self.get_queues()
+        if queues:
+            lines.append(f"{'queue':<22}{'capacity':>10}{'puts':>8}{'mean':>8}{'max':>8}{'full':>8}")
+            for name, stats in queues.items():
+                mean = stats["total"] / stats["samples"] if stats["samples"] else 0.0
+                lines.append(f"{name:<22}{stats['capacity']:>10}{stats['samples']:>8}{mean:>8.1f}{stats['max']:>8}{stats['full']:>8}")
+        return "\n".join(lines)
+
+    def format_prometheus(self):
+        """
+        :return: The metrics in the Prometheus text exposition format
+        """
+        stages = self.get_stages()
+        counters = self.get_counters()
+        lines = []
+        for name, help_text, key in (("aloha_stage_calls_total", "Calls of each stage", "calls"),
+                                     ("aloha_stage_errors_total", "Calls of each stage that raised an error", "errors"),
+                                     ("aloha_stage_seconds_total", "Seconds spent in each stage", "seconds"),
+                                     ("aloha_stage_seconds_max", "Longest call of each stage, in seconds", "max")):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {'gauge' if key == 'max' else 'counter'}")
+            for stage, stats in sorted(stages.items()):
+                lines.append(f'{name}{{stage="{stage}"}} {stats[key]}')
+        for counter, help_text in _PROMETHEUS_COUNTERS.items():
+            name = f"aloha_{counter}_total"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {counters[counter]}")
+        queues = self.get_queues()
+        if queues:
+            for name, help_text, kind, value in (("aloha_queue_capacity", "Capacity of each pipeline queue", "gauge", lambda stats: stats["capacity"]),
+                                                 ("aloha_queue_depth_max", "Largest depth of each pipeline queue", "gauge", lambda stats: stats["max"]),
+                                                 ("aloha_queue_depth_mean", "Mean depth of each pipeline queue, sampled at every put", "gauge",
+                                                  lambda stats: stats["total"] / stats["samples"] if stats["samples"] else 0.0),
+                                                 ("aloha_queue_full_total", "Puts that found the queue full and blocked the producer", "counter", lambda stats: stats["full"])):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for queue, stats in sorted(queues.items()):
+                    lines.append(f'{name}{{queue="{queue}"}} {value(stats)}')
+        lines.append("# HELP aloha_models_total Models whose AIBOM generation was started")
+        lines.append("# TYPE aloha_models_total counter")
+        lines.append(f"aloha_models_total {self.get_model_count()[0]}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        atomic_write(path, self.format_prometheus().encode("utf-8"))
+
+    def close(self):
+        """
+        Writes the per-model totals to the JSON lines file and closes it.
+        """
+        with self._lock:
+            if self._jsonl is None:
+                return
+            for model_id, stats in self._models.items():
+                if model_id is not None:
+                    self._jsonl.write(json.dumps(dict(stats, type="model", model=model_id)) + "\n")
+            self._jsonl.close()
+            self._jsonl = None
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
+
+def configure_metrics(**kwargs):
+    """
+    Replaces the shared metrics with new ones built with the given Metrics arguments.
+    """
+    global _metrics
+    with _metrics_lock:
+        _metrics = Metrics(**kwargs)
+        return _metrics
+
+#Function to time a stage with the shared metrics, e.g. "with span('readme'): ...".
+def span(stage, model_id=None):
+    return get_metrics().span(stage, model_id)
+
+def timed(stage):
+    """
+    Decorator timing every call of the decorated function as one call of stage.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
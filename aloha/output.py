@@ -0,0 +1,233 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Output stage: writes the generated AIBOMs as JSON files or as (sharded) NDJSON streams."""
+
+import functools
+import gzip
+import json
+import os
+import threading
+
+from . import canonical as canonical_module
+from .exceptions import ALOHAError
+from .metrics import get_metrics
+from .utils import atomic_write
+
+COMPRESSION_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+CANONICAL_INDENT = 2 # Indentation of the canonical files.
+
+
+def get_aibom_path(model_id, output_dir=None):
+    file_name = f"{model_id}.json".replace("/", "_")
+    if output_dir is None:
+        return file_name
+    return os.path.join(output_dir, file_name)
+
+
+#Function to encode with orjson, when it is installed and supports the layout (compact or indented by 2); None otherwise.
+def _encode_orjson(aibom, indent):
+    if indent not in (None, 2):
+        return None
+    try:
+        import orjson
+    except ImportError:
+        return None # orjson is an optimization (pip install .[fast]) of the default output.
+    option = orjson.OPT_INDENT_2 if indent else 0
+    try:
+        return orjson.dumps(aibom, option=option)
+    except orjson.JSONEncodeError:
+        return None # Values orjson rejects (e.g. integers over 64 bits) are left to the standard encoder.
+
+#Functions to encode an AIBOM; they are plain functions, so the encoding can also run in worker processes (see aloha.pipeline).
+def encode_json(aibom, indent=4, sort_keys=False):
+    # Canonical encodings (sorted keys) always use the standard encoder: orjson writes some floats differently
+    # (0.00001 vs 1e-05, 1e16 vs 1e+16), and canonical bytes must not depend on the libraries installed.
+    encoded = None if sort_keys else _encode_orjson(aibom, indent)
+    if encoded is not None:
+        return encoded
+    if indent is None:
+        return json.dumps(aibom, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    # The layouts orjson supports are encoded as orjson does (UTF-8, not escaped); the files indented by 4 are unchanged.
+    return json.dumps(aibom, indent=indent, sort_keys=sort_keys, ensure_ascii=indent != 2).encode("utf-8")
+
+def encode_ndjson(aibom, sort_keys=False):
+    return encode_json(aibom, indent=None, sort_keys=sort_keys) + b"\n"
+
+
+#Function to check whether the file at path already holds data: a canonical AIBOM that did not change is not written again.
+def _same_content(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+class DirectoryWriter:
+    """
+    Writes each AIBOM to its own indented JSON file (<author>_<model>.json).
+
+    Files are written to a temporary name and renamed, so a crash never leaves a truncated AIBOM behind.
+    With canonical output (see aloha.canonical), keys are sorted, files are indented by 2 and a file
+    already holding the same AIBOM is left untouched.
+    """
+
+    def __init__(self, output_dir=None, indent=4, canonical=None):
+        self.output_dir = output_dir
+        self.canonical = canonical_module.CANONICAL_OUTPUT if canonical is None else canonical
+        self.indent = CANONICAL_INDENT if self.canonical else indent
+        self.encode = functools.partial(encode_json, indent=self.indent, sort_keys=self.canonical)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, aibom, model_id):
+        """
+        :return: Path of the written file
+        """
+        return self.write_encoded(self.encode(aibom), model_id)
+
+    def write_encoded(self, data, model_id):
+        """
+        Writes an AIBOM already encoded with self.encode.
+
+        :return: Path of the written file
+        """
+        path = get_aibom_path(model_id, self.output_dir)
+        if self.canonical and _same_content(path, data):
+            get_metrics().count("unchanged_outputs")
+            return path
+        atomic_write(path, data)
+        return path
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class NDJSONWriter:
+    """
+    Appends the AIBOMs to NDJSON files, one compact AIBOM per line, as soon as they are written.
+
+    Output can be gzip or zstd (requires the zstandard package) compressed. With max_records or
+    max_bytes (uncompressed), the stream is rotated into numbered shards (<prefix>-00000.ndjson.gz, ...):
+    a shard is written under a '.partial' name and renamed when it is complete, so consumers only
+    ever see complete shards, and numbering continues after the existing shards. Without sharding
+    the AIBOMs are appended to <prefix>.ndjson. With canonical output the keys are sorted.
+    """
+
+    def __init__(self, output_dir=None, prefix="aiboms", compression=None, max_records=None, max_bytes=None, canonical=None):
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ALOHAError(f"Unsupported compression: {compression}")
+        self.output_dir = output_dir or "."
+        self.prefix = prefix
+        self.compression = compression
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.sharded = bool(max_records or max_bytes)
+        self.canonical = canonical_module.CANONICAL_OUTPUT if canonical is None else canonical
+        self.encode = functools.partial(encode_ndjson, sort_keys=self.canonical)
+        self._lock = threading.Lock()
+        self._shard = 0
+        self._file = None
+        self._raw_file = None
+        self._path = None
+        self._records = 0
+        self._bytes = 0
+        self.completed = [] # Paths of the complete files.
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def _shard_path(self, shard):
+        extension = ".ndjson" + COMPRESSION_EXTENSIONS[self.compression]
+        if self.sharded:
+            return os.path.join(self.output_dir, f"{self.prefix}-{shard:05d}{extension}")
+        return os.path.join(self.output_dir, f"{self.prefix}{extension}")
+
+    def _open(self):
+        if self.sharded:
+            while os.path.exists(self._shard_path(self._shard)):
+                self._shard += 1
+        self._path = self._shard_path(self._shard)
+        # Concatenated gzip members and zstd frames are still valid streams, so appending is safe.
+        partial_path = f"{self._path}.partial" if self.sharded else self._path
+        mode = "wb" if self.sharded else "ab"
+        if self.compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise ALOHAError("zstd compression requires the zstandard package (pip install zstandard)")
+            self._raw_file = open(partial_path, mode)
+            self._file = zstandard.ZstdCompressor().stream_writer(self._raw_file)
+        elif self.compression == "gzip":
+            self._file = gzip.open(partial_path, mode)
+        else:
+            self._file = open(partial_path, mode)
+        self._records = 0
+        self._bytes = 0
+
+    def _close_shard(self):
+        if self._file is None:
+            return
+        self._file.close()
+        if self._raw_file is not None:
+            self._raw_file.close()
+            self._raw_file = None
+        self._file = None
+        if self.sharded:
+            os.replace(f"{self._path}.partial", self._path)
+        self.completed.append(self._path)
+        self._shard += 1
+
+    def write(self, aibom, model_id=None):
+        """
+        :return: Path of the file the AIBOM is written to
+        """
+        return self.write_encoded(self.encode(aibom), model_id)
+
+    def write_encoded(self, line, model_id=None):
+        """
+        Appends an AIBOM already encoded with self.encode (one line, newline included).
+
+        :return: Path of the file the AIBOM is written to
+        """
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(line)
+            self._records += 1
+            self._bytes += len(line)
+            path = self._path
+            if (self.max_records and self._records >= self.max_records) or (self.max_bytes and self._bytes >= self.max_bytes):
+                self._close_shard()
+        return path
+
+    def close(self):
+        with self._lock:
+            self._close_shard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_writer(output_dir=None, format="json", compression=None, max_records=None, max_bytes=None, canonical=None):
+    """
+    Returns the writer for the requested output format ('json': one file per AIBOM, 'ndjson': streamed lines).
+
+    :param canonical: Encode the AIBOMs canonically (see aloha.canonical); the configured output mode if None
+    """
+    if format == "ndjson":
+        return NDJSONWriter(output_dir, compression=compression, max_records=max_records, max_bytes=max_bytes, canonical=canonical)
+    if compression or max_records or max_bytes:
+        raise ALOHAError("Compression and sharding are only available with the ndjson format")
+    return DirectoryWriter(output_dir, canonical=canonical)
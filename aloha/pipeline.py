@@ -0,0 +1,338 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Staged pipeline for large batches: fetch -> parse -> assemble -> serialize -> write.
+
+generate_aibom_batch runs each model from start to end in one thread, so network waits and CPU
+work alternate in every worker. Here each stage has its own workers, and a bounded queue links
+it to the next stage. The fetch threads only wait for the Hub (model API, README, datasets,
+base models). The CPU stages split the READMEs into sections, build the components and encode
+the AIBOMs, and the calling thread writes them. A slow stage fills its queue, which blocks the
+stage before it, back to the models read from the input, so memory stays bounded whatever the
+size of the inventory.
+
+With processes > 0 the CPU stages run on a process pool, so they are not limited to one core by
+the GIL. They are then fused into one task per model: sending the parsed README and the AIBOM
+from one process to another would cost more than the stages themselves.
+"""
+
+import contextvars
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import canonical
+from .batch import print_batch_summary
+from .bom import assemble_aibom, generate_cyclonedx_component, get_dataset_ids, get_model_data
+from .canonical import configure_canonical_output
+from .dataset import get_dataset_registry
+from .incremental import version_aibom
+from .licenses import configure_spdx_license_index, get_spdx_license_index
+from .limits import configure_limits, get_limits
+from .lineage import get_lineage_registry
+from .metrics import get_metrics
+from .output import DirectoryWriter
+from .readme import ModelReadme, get_hf_readme
+from .transport import get_fetch_executor, resolve_transport
+
+PIPELINE_QUEUE_SIZE = 64 # Models waiting between two stages; a full queue blocks the stage before it.
+PIPELINE_CPU_WORKERS = 2 # Threads of each CPU stage (parse, assemble, serialize) when no process pool is used.
+
+_DONE = object() # End of the input, forwarded from stage to stage.
+
+
+class _Job:
+    """
+    A model going through the pipeline; each stage replaces value with its own output.
+    """
+
+    __slots__ = ("model_id", "data", "previous", "value", "entry", "skipped", "error")
+
+    def __init__(self, model_id, data):
+        self.model_id = model_id
+        self.data = data
+        self.previous = None # Manifest entry of the previous version, in an incremental run.
+        self.value = None
+        self.entry = None # New manifest entry, in an incremental run.
+        self.skipped = False
+        self.error = None
+
+
+class _StageQueue(queue.Queue):
+    """
+    Bounded queue between two stages, whose depth is sampled in the metrics at every put.
+    """
+
+    def __init__(self, name, maxsize, metrics):
+        super().__init__(maxsize)
+        self.name = name
+        self.metrics = metrics
+
+    def put(self, item, block=True, timeout=None):
+        if item is not _DONE:
+            self.metrics.observe_queue(self.name, self.qsize(), self.maxsize)
+        super().put(item, block, timeout)
+
+
+class _Stage:
+    """
+    Workers applying function to the jobs of inbox and putting them in outbox.
+
+    A job that failed or was skipped by an earlier stage is forwarded as is. _DONE is passed
+    from worker to worker, and the last worker to stop forwards it to the next stage.
+    """
+
+    def __init__(self, name, function, workers, inbox, outbox, metrics):
+        self.name = name
+        self.function = function
+        self.inbox = inbox
+        self.outbox = outbox
+        self.metrics = metrics
+        self._running = workers
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, name=f"aloha-{name}-{n}", daemon=True) for n in range(workers)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self):
+        while True:
+            job = self.inbox.get()
+            if job is _DONE:
+                break
+            if job.error is None and not job.skipped:
+                try:
+                    with self.metrics.span(self.name, job.model_id):
+                        self.function(job)
+                except Exception as e:
+                    job.error = e
+            self.outbox.put(job)
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        (self.outbox if last else self.inbox).put(_DONE)
+
+
+def _parse(readme_text):
+    return ModelReadme(readme_text)
+
+def _assemble(data, readme, resources, previous, versioned):
+    datasets, ancestors, dependencies = resources
+    component = generate_cyclonedx_component(data, readme)
+    bom = assemble_aibom(component, datasets, ancestors, dependencies, data.get('lastModified'))
+    if not versioned:
+        return bom, None, True
+    entry, changed = version_aibom(bom, data, previous)
+    return bom, entry, changed
+
+
+#Process pool initializer: the workers reuse the SPDX license index of the parent instead of loading it again, its caps and output mode.
+def _init_process(spdx_license_index, caps, canonical_output):
+    configure_spdx_license_index(index=spdx_license_index)
+    configure_limits(**caps)
+    configure_canonical_output(canonical_output)
+
+def _process(data, readme_text, resources, previous, versioned, encode):
+    """
+    Runs the CPU stages of one model in a worker process.
+
+    :return: Tuple (encoded AIBOM or None if unchanged, manifest entry, seconds spent in each stage)
+    """
+    timings = {}
+    start = time.perf_counter()
+    readme = _parse(readme_text)
+    timings["parse"] = time.perf_counter() - start
+    start = time.perf_counter()
+    bom, entry, changed = _assemble(data, readme, resources, previous, versioned)
+    timings["assemble"] = time.perf_counter() - start
+    if not changed:
+        return None, entry, timings
+    start = time.perf_counter()
+    encoded = encode(bom)
+    timings["serialize"] = time.perf_counter() - start
+    return encoded, entry, timings
+
+
+class Pipeline:
+    """
+    Generates the AIBOMs of many models through the staged pipeline described in the module docstring.
+
+    :param writer: Output writer (see aloha.output)
+    :param manifest: Manifest of an incremental run (see aloha.incremental): unchanged models are skipped
+    :param session: HTTPTransport or requests.Session to use (the shared transport if None)
+    :param fetch_workers: Threads of the fetch stage, i.e. models waiting for the network at the same time
+    :param cpu_workers: Threads of each CPU stage, when processes is 0
+    :param processes: Worker processes of the CPU stages, 0 to run them on threads
+    :param queue_size: Capacity of each queue between two stages
+    :param lineage_depth: Levels of base models added as components (the configured depth if None)
+    """
+
+    def __init__(self, writer, manifest=None, session=None, fetch_workers=8, cpu_workers=PIPELINE_CPU_WORKERS,
+                 processes=0, queue_size=PIPELINE_QUEUE_SIZE, lineage_depth=None):
+        self.writer = writer
+        self.manifest = manifest
+        self.transport = resolve_transport(session)
+        self.fetch_workers = fetch_workers
+        self.cpu_workers = cpu_workers
+        self.processes = processes
+        self.queue_size = queue_size
+        self.lineage_depth = lineage_depth
+        self.metrics = get_metrics()
+        self._input_error = None
+
+    def _feed(self, models, inbox):
+        try:
+            for model in models:
+                model_id, data = (model, None) if isinstance(model, str) else (model['id'], model)
+                inbox.put(_Job(model_id, data))
+        except Exception as e:
+            # e.g. a page of a discovery listing could not be retrieved: raised by run() once the pipeline is drained.
+            self._input_error = e
+        finally:
+            inbox.put(_DONE)
+
+    def _fetch(self, job):
+        transport = self.transport
+        if job.data is None:
+            job.data = get_model_data(job.model_id, transport)
+        if self.manifest is not None:
+            job.previous = self.manifest.get(job.model_id)
+            if job.previous and job.data.get('sha') and job.previous.get('sha') == job.data['sha']:
+                job.skipped = True
+                return
+
+        # The dataset cards are fetched in the background while this thread downloads the README.
+        executor = get_fetch_executor()
+        registry = get_dataset_registry()
+        datasets = get_dataset_ids(job.data)
+        dataset_futures = [executor.submit(contextvars.copy_context().run, registry.get, name_dataset, None, transport) for name_dataset in datasets]
+        readme_text = get_hf_readme(job.data.get('id'), transport)
+
+        ancestors, dependencies = [], []
+        lineage = get_lineage_registry()
+        if (lineage.max_depth if self.lineage_depth is None else self.lineage_depth) > 0:
+            ancestors, dependencies = lineage.resolve(job.data, transport, self.lineage_depth)
+
+        resources = ([(name_dataset, future.result()) for name_dataset, future in zip(datasets, dataset_futures)], ancestors, dependencies)
+        job.value = (readme_text, resources)
+
+    def _parse(self, job):
+        readme_text, resources = job.value
+        job.value = (_parse(readme_text), resources)
+
+    def _assemble(self, job):
+        readme, resources = job.value
+        job.value, job.entry, changed = _assemble(job.data, readme, resources, job.previous, self.manifest is not None)
+        job.skipped = not changed
+        job.data = None
+
+    def _serialize(self, job):
+        job.value = self.writer.encode(job.value)
+
+    def _process_in_pool(self, pool):
+        def process(job):
+            readme_text, resources = job.value
+            future = pool.submit(_process, job.data, readme_text, resources, job.previous, self.manifest is not None, self.writer.encode)
+            job.value, job.entry, timings = future.result()
+            job.skipped = job.value is None
+            job.data = None
+            for stage, seconds in timings.items():
+                self.metrics.record(stage, seconds, job.model_id)
+        return process
+
+    def run(self, models):
+        """
+        Generates and writes the AIBOM of each model, reporting and skipping the models that fail.
+
+        :param models: Iterable of model IDs, or of model metadata dicts already retrieved (see aloha.discovery)
+        :return: Tuple (number of AIBOMs created, number of unchanged models skipped, list of model IDs that failed)
+        """
+        pool = None
+        if self.processes > 0:
+            # Worker processes are spawned, not forked: forking a process running threads can deadlock.
+            pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_process, initargs=(get_spdx_license_index(), get_limits(), canonical.CANONICAL_OUTPUT))
+            cpu_stages = [("process", self._process_in_pool(pool), self.processes)]
+        else:
+            cpu_stages = [("parse", self._parse, self.cpu_workers),
+                          ("assemble", self._assemble, self.cpu_workers),
+                          ("serialize", self._serialize, self.cpu_workers)]
+
+        inbox = _StageQueue("input", self.queue_size, self.metrics)
+        queues = [inbox]
+        stages = []
+        for name, function, workers in [("fetch", self._fetch, self.fetch_workers)] + cpu_stages:
+            outbox = _StageQueue(name, self.queue_size, self.metrics)
+            stages.append(_Stage(name, function, workers, queues[-1], outbox, self.metrics))
+            queues.append(outbox)
+
+        created = 0
+        skipped = 0
+        failed = []
+        try:
+            for stage in stages:
+                stage.start()
+            threading.Thread(target=self._feed, args=(models, inbox), name="aloha-input", daemon=True).start()
+
+            results = queues[-1]
+            while True:
+                job = results.get()
+                if job is _DONE:
+                    break
+                if job.error is not None:
+                    failed.append(job.model_id)
+                    print(f"❌ Error in AIBoM creation for {job.model_id}: {job.error}")
+                    continue
+                if job.skipped:
+                    if job.entry is not None:
+                        self.manifest.update(job.model_id, job.entry)
+                    skipped += 1
+                    continue
+                try:
+                    with self.metrics.span("write", job.model_id):
+                        path = self.writer.write_encoded(job.value, job.model_id)
+                    # The manifest records the model only once its AIBOM is written.
+                    if job.entry is not None:
+                        self.manifest.update(job.model_id, job.entry)
+                    created += 1
+                    print(f"✅ AIBoM successfully created: {path}")
+                except Exception as e:
+                    failed.append(job.model_id)
+                    print(f"❌ Error in AIBoM creation for {job.model_id}: {e}")
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            if self.manifest is not None:
+                self.manifest.save()
+
+        if self._input_error is not None:
+            raise self._input_error
+        return created, skipped, failed
+
+
+def generate_aibom_pipeline(models, output_dir=None, writer=None, manifest=None, session=None, fetch_workers=8,
+                            cpu_workers=PIPELINE_CPU_WORKERS, processes=0, queue_size=PIPELINE_QUEUE_SIZE):
+    """
+    Generates the AIBOM of many models with the staged pipeline; same results as generate_aibom_batch.
+
+    :param models: Iterable of model IDs, or of model metadata dicts already retrieved (see aloha.discovery)
+    :param output_dir: Directory where the AIBOMs are saved (current directory if None), when no writer is given
+    :param writer: Output writer (see aloha.output), one JSON file per model in output_dir if None
+    :param manifest: Manifest of an incremental run (see aloha.incremental): unchanged models are skipped
+    :param session: HTTPTransport or requests.Session to use (the shared transport if None)
+    :param fetch_workers: Models waiting for the network at the same time
+    :param cpu_workers: Threads of each CPU stage, when processes is 0
+    :param processes: Worker processes of the CPU stages, 0 to run them on threads
+    :param queue_size: Capacity of each queue between two stages
+    :return: Tuple (number of AIBOMs created, list of model IDs that failed)
+    """
+    start = time.perf_counter()
+    pipeline = Pipeline(writer or DirectoryWriter(output_dir), manifest, session, fetch_workers, cpu_workers, processes, queue_size)
+    created, skipped, failed = pipeline.run(models)
+    print_batch_summary(created, skipped, failed, time.perf_counter() - start, pipeline.transport)
+    return created, failed
@@ -0,0 +1,200 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import re
+
+from .exceptions import FetchError
+from .metrics import timed
+from .transport import http_get_cached, hub_url
+
+
+_EMOJI_PATTERN = re.compile(
+    "[\U0001F600-\U0001F64F"  # Emoticon
+    "\U0001F300-\U0001F5FF"  # Various symbols and pictograms.
+    "\U0001F680-\U0001F6FF"  # Transport and various symbols.
+    "\U0001F700-\U0001F77F"  # Alchemical symbols.
+    "\U0001F780-\U0001F7FF"  # Additional geometric symbols.
+    "\U0001F800-\U0001F8FF"  # Additional arrow symbols.
+    "\U0001F900-\U0001F9FF"  # Hand and person symbols.
+    "\U0001FA00-\U0001FA6F"  # Various objects and tools.
+    "\U0001FA70-\U0001FAFF"  # Various emojis
+    "\U00002700-\U000027BF"  # Dingbats
+    "\U0001F1E0-\U0001F1FF"  # Flags.
+    "]+", flags=re.UNICODE
+)
+_FENCE_PATTERN = re.compile(r"(`{3,}|~{3,})") # Opening of a fenced code block.
+_SETEXT_UNDERLINE_PATTERN = re.compile(r"=+|-+") # Underline of a setext heading (Title\n=====).
+_FRONT_MATTER_DELIMITER = "---"
+
+#Function to remove emojis from a string using regular expressions.
+def rimuovi_emoji(testo):
+    return _EMOJI_PATTERN.sub(r'', testo)
+
+    
+@timed("readme")
+def get_hf_readme(model_id, transport=None): 
+
+    url = hub_url(f"{model_id}/raw/main/README.md")
+    
+    try:
+        response = http_get_cached(url, transport=transport)  
+        if response.status_code != 200:
+            raise FetchError(f"status code {response.status_code}")
+        return response.text  
+    except FetchError as e:
+        print(f"❌ Failed to retrieve README.md for model {model_id}: {e}")
+        return None
+
+#Function to normalize a README heading: '#' markers, emojis and extra whitespace are removed.
+def normalize_heading(riga):
+    titolo_senza_asterischi = riga.strip('# ')
+    titolo_minuscolo = titolo_senza_asterischi.lower()
+    titolo_senza_emoji = rimuovi_emoji(titolo_minuscolo)
+    return " ".join(titolo_senza_emoji.split())
+
+
+#Function to iterate over the lines of a text without splitting it into a list first.
+def _iter_lines(text):
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find('\n', start)
+        if end == -1:
+            end = length
+        yield text[start:end]
+        start = end + 1
+
+
+#Function to extract the YAML front matter (the card data) at the top of a README, as text.
+def get_front_matter(text):
+    lines = _iter_lines(text or '')
+    if next(lines, '').strip() != _FRONT_MATTER_DELIMITER:
+        return None
+    front_matter = []
+    for riga in lines:
+        if riga.strip() in (_FRONT_MATTER_DELIMITER, "..."):
+            return "\n".join(front_matter)
+        front_matter.append(riga)
+    return None
+
+
+def iter_sections(text):
+    """
+    Scans a README once and yields its sections in order.
+
+    Headings are ATX lines starting with '#' or setext headings (a text line underlined with
+    '===' or '---'). Lines inside fenced code blocks (``` or ~~~) are never headings, and the
+    YAML front matter at the top of the README (between '---' lines) is skipped. Text before
+    the first heading does not belong to any section.
+
+    :param text: Content of the README
+    :return: Generator of (normalized heading, list of the stripped lines of the section)
+    """
+    title = None
+    content = []
+    fence = None # Marker of the open fenced code block, e.g. '```'
+    previous = '' # Last line, if it was paragraph text: it could be the text of a setext heading
+    lines = _iter_lines(text)
+
+    for number, riga in enumerate(lines):
+        riga = riga.strip()
+
+        if number == 0 and riga == _FRONT_MATTER_DELIMITER:
+            for riga in lines:
+                if riga.strip() in (_FRONT_MATTER_DELIMITER, "..."):
+                    break
+            continue
+
+        if fence is not None:
+            if riga.startswith(fence) and not riga.strip(fence[0]):
+                fence = None
+            content.append(riga)
+            continue
+
+        fence_match = _FENCE_PATTERN.match(riga) if riga[:1] in ('`', '~') else None
+        if fence_match:
+            fence = fence_match.group(1)
+            content.append(riga)
+            previous = ''
+            continue
+
+        if riga.startswith('#'):
+            if title is not None:
+                yield title, content
+            title = normalize_heading(riga)
+            content = []
+            previous = ''
+            continue
+
+        if previous and _SETEXT_UNDERLINE_PATTERN.fullmatch(riga):
+            # The previous line was the heading, not the last line of the current section.
+            if title is not None:
+                content.pop()
+                yield title, content
+            title = normalize_heading(previous)
+            content = []
+            previous = ''
+            continue
+
+        if title is not None:
+            content.append(riga)
+        previous = riga
+
+    if title is not None:
+        yield title, content
+
+
+class ModelReadme:
+    """
+    README.md of a model, split once into its sections.
+
+    Each section is indexed by its normalized heading and holds the text between
+    that heading and the next one, so looking up a section is a dict access.
+    """
+
+    def __init__(self, text):
+        self.text = text or ''
+        self.sections = {} # normalized heading -> (position in the README, section text)
+        self._parse()
+
+    def _parse(self):
+        for title, content in iter_sections(self.text):
+            self._add_section(title, content)
+
+    def _add_section(self, title, content):
+        # Only the first section with a given heading is kept, as get_model_info always did.
+        if title is not None and title not in self.sections:
+            self.sections[title] = (len(self.sections), "".join(content))
+
+    def get_section(self, valid_titles):
+        """
+        Returns the text of the first section of the README whose heading is in valid_titles.
+
+        :param valid_titles: Accepted headings (lowercase, without emojis)
+        :return: Section text as a string, None if no heading matches
+        """
+        matches = [self.sections[title] for title in valid_titles if title in self.sections]
+        if not matches:
+            return None
+        return min(matches)[1]
+
+
+def get_model_readme(model_id, transport=None):
+    readme_content = get_hf_readme(model_id, transport)
+    if readme_content is None:
+        return None
+    return ModelReadme(readme_content)
+
+#Function to extract the model description from the README.md.
+def get_model_info(model_id, valid_titles):
+    """
+    Extracts the model description from its README.md.
+
+    :param model_id: Model ID (e.g., 'google-bert/bert-base-uncased')
+    :return: Model description as a string
+    """
+    readme = get_model_readme(model_id)
+    if readme is None:
+        return None
+    return readme.get_section(valid_titles)
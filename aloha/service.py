@@ -0,0 +1,190 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Service mode: a local HTTP server generating AIBOMs on demand (aloha serve).
+
+The process stays up between requests, so the SPDX license index, the HTTP connection pools,
+the HTTP cache and the dataset and base model registries stay warm: a model uploaded again is
+mostly revalidated (304) instead of downloaded. Routes:
+
+    GET /aibom/<org>/<model>   AIBOM of the model, as JSON
+    GET /metrics               metrics of the process, in the Prometheus text format
+    GET /healthz               {"status": "ok", ...}
+
+Concurrent requests for the same model share one generation (see SingleFlight), and concurrent
+generations share each dataset fetch through the dataset registry.
+"""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from . import canonical
+from .bom import generate_aibom
+from .exceptions import ALOHAError, ModelNotFoundError, OfflineError
+from .licenses import get_spdx_license_index
+from .metrics import get_metrics
+from .output import encode_json
+from .transport import resolve_transport
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8000
+
+_MODEL_ID_PATTERN = re.compile(r"[\w.-]+(/[\w.-]+)?") # [<org>/]<name>, as accepted by the Hub.
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: a caller arriving while a call for its key is in
+    flight waits for that call and gets the same result (or exception) instead of starting its own.
+
+    Unlike the registries, results are not memoized: the next call after completion runs again.
+    """
+
+    def __init__(self):
+        self._futures = {} # key -> Future of the call in flight
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args):
+        """
+        :return: Tuple (result of function(*args), True if the result came from a call already in flight)
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+        if owner:
+            try:
+                future.set_result(function(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._futures[key]
+        return future.result(), not owner
+
+
+class AIBOMService:
+    """
+    Generates the AIBOMs served by the HTTP server, with the shared transport, caches and registries.
+
+    :param session: HTTPTransport or requests.Session to use (the shared transport if None)
+    """
+
+    def __init__(self, session=None):
+        self.transport = resolve_transport(session)
+        self.metrics = get_metrics()
+        self.started = time.time()
+        self._flight = SingleFlight()
+
+    def warm_up(self):
+        """
+        Loads the SPDX license index before the first request, instead of during it.
+        """
+        get_spdx_license_index()
+
+    def _generate(self, model_id):
+        aibom = generate_aibom(model_id, session=self.transport)
+        return encode_json(aibom, indent=None, sort_keys=canonical.CANONICAL_OUTPUT)
+
+    def get_aibom(self, model_id):
+        """
+        :return: The AIBOM of model_id encoded as JSON (bytes), shared with the concurrent requests for the same model
+        :raises ModelNotFoundError: The model does not exist or is not accessible
+        :raises FetchError: A resource could not be retrieved
+        """
+        encoded, coalesced = self._flight.do(model_id, self._generate, model_id)
+        if coalesced:
+            self.metrics.count("coalesced_requests")
+        return encoded
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ALOHA"
+    protocol_version = "HTTP/1.1" # Keep-alive: a registry calling the service repeatedly reuses its connection.
+
+    def do_GET(self):
+        start = time.perf_counter()
+        service = self.server.service
+        path = urlsplit(self.path).path
+        if path.startswith("/aibom/"):
+            model_id = unquote(path[len("/aibom/"):]).strip("/")
+            status, body, content_type = self._aibom(service, model_id)
+        elif path == "/metrics":
+            status, body, content_type = 200, service.metrics.format_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+        elif path == "/healthz":
+            health = {"status": "ok", "uptime": round(time.time() - service.started, 1)}
+            status, body, content_type = 200, json.dumps(health).encode("utf-8"), "application/json"
+        else:
+            status, body, content_type = self._error(404, f"Unknown path {path}")
+        elapsed = time.perf_counter() - start
+        self._send(status, body, content_type, elapsed)
+        print(f"{'✅' if status == 200 else '❌'} {self.command} {self.path} {status} {elapsed * 1000:.1f} ms", flush=True)
+
+    def _aibom(self, service, model_id):
+        if not _MODEL_ID_PATTERN.fullmatch(model_id) or ".." in model_id:
+            return self._error(400, f"Invalid model ID: {model_id}")
+        try:
+            with service.metrics.span("request", model_id):
+                return 200, service.get_aibom(model_id), "application/json"
+        except ModelNotFoundError as e:
+            return self._error(404, str(e))
+        except OfflineError as e:
+            return self._error(503, str(e))
+        except ALOHAError as e:
+            return self._error(502, str(e))
+        except Exception as e:
+            return self._error(500, f"Error in AIBoM creation: {e}")
+
+    def _error(self, status, message):
+        return status, json.dumps({"error": message}).encode("utf-8"), "application/json"
+
+    def _send(self, status, body, content_type, elapsed):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Server-Timing", f"total;dur={elapsed * 1000:.1f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Every request is already reported by do_GET, with its latency.
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128 # Listen backlog: the default (5) drops the connections of a burst of clients.
+
+
+def make_server(host=SERVICE_HOST, port=SERVICE_PORT, service=None):
+    """
+    Builds the HTTP server of the service; each request is handled in its own thread.
+
+    :param service: AIBOMService answering the requests (one on the shared transport if None)
+    :return: A ThreadingHTTPServer, started with serve_forever()
+    """
+    server = _Server((host, port), _Handler)
+    server.service = service or AIBOMService()
+    return server
+
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT):
+    """
+    Runs the service until interrupted (Ctrl+C).
+    """
+    server = make_server(host, port)
+    server.service.warm_up()
+    print(f"✅ ALOHA service listening on http://{server.server_address[0]}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,240 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import copy
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from .cache import cached_response
+from .exceptions import FetchError, OfflineError
+from .metrics import get_metrics
+
+HF_ENDPOINT = os.environ.get("HF_ENDPOINT", "https://huggingface.co").rstrip("/") # Hub API and raw files, can point to a mirror.
+MAX_REQUESTS_PER_HOST = 8 # Concurrent requests allowed towards the same host (huggingface.co, spdx.org).
+FETCH_WORKERS = 16 # Threads used to fetch READMEs and dataset cards in the background.
+REQUEST_TIMEOUT = 30 # Seconds, applied to every request.
+MAX_RETRIES = 3 # Retries after a connection error, a timeout or a retryable status code.
+BACKOFF_BASE = 0.5 # Seconds, doubled at every retry.
+BACKOFF_MAX = 60 # Seconds, upper bound for the backoff and for Retry-After.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class HTTPTransport:
+    """
+    HTTP client shared by every fetcher.
+
+    A single requests.Session keeps the connections alive between requests. Every request has
+    a timeout, at most max_per_host requests run concurrently towards the same host, and
+    connection errors, timeouts and 429/5xx responses are retried with exponential backoff and
+    jitter, honouring Retry-After. The counters are available through get_stats().
+
+    requests is imported when the first session is created, not when ALOHA is imported.
+    """
+
+    def __init__(self, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX, max_per_host=MAX_REQUESTS_PER_HOST, session=None, cache=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_per_host = max_per_host
+        self.session = session if session is not None else self._new_session()
+        self.cache = cache
+        self._semaphores = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "errors": 0, "bytes": 0, "latency": 0.0, "max_latency": 0.0}
+
+    def _new_session(self):
+        import requests
+
+        session = requests.Session()
+        # One pool per host, large enough for all the concurrent requests allowed towards it.
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(self.max_per_host, 10))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._semaphores[host]
+
+    def _record(self, latency, size, error=False):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["bytes"] += size
+            self._stats["latency"] += latency
+            self._stats["max_latency"] = max(self._stats["max_latency"], latency)
+            if error:
+                self._stats["errors"] += 1
+        metrics = get_metrics()
+        metrics.count("http_requests")
+        metrics.count("http_bytes", size)
+        if error:
+            metrics.count("http_errors")
+
+    def _backoff(self, attempt):
+        # Full jitter: a random delay between 0 and the exponential backoff.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response):
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            from email.utils import parsedate_to_datetime
+
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), self.backoff_max)
+
+    def with_cache(self, cache):
+        """
+        Returns a transport sharing this session, limits and counters, but using another response cache.
+        """
+        transport = copy.copy(self)
+        transport.cache = cache
+        return transport
+
+    def get(self, url, **kwargs):
+        """
+        GET with retries. Raises FetchError when the server cannot be reached after the last retry;
+        HTTP error statuses are returned to the caller as responses.
+        """
+        import requests
+
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                with self._host_semaphore(url):
+                    response = self.session.get(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record(time.perf_counter() - start, 0, error=True)
+                if attempt >= self.max_retries:
+                    raise FetchError(f"Request to {url} failed: {e}") from e
+                delay = self._backoff(attempt)
+            else:
+                self._record(time.perf_counter() - start, len(response.content))
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+            with self._lock:
+                self._stats["retries"] += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def _count_cache(self, name):
+        self.cache.count(name)
+        get_metrics().count(f"cache_{name}")
+
+    def get_cached(self, url, revision="main", **kwargs):
+        """
+        GET through the response cache: a cached response is revalidated with If-None-Match /
+        If-Modified-Since and reused when the server answers 304 Not Modified.
+        """
+        if self.cache is None:
+            return self.get(url, **kwargs)
+
+        entry = self.cache.lookup(url, revision)
+        body = self.cache.load_body(entry) if entry else None
+        if self.cache.offline:
+            if body is None:
+                self._count_cache("misses")
+                raise OfflineError(f"{url} is not in the HTTP cache (offline mode)")
+            self._count_cache("hits")
+            return cached_response(url, entry, body)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if body is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = self.get(url, headers=headers, **kwargs)
+        if response.status_code == 304 and body is not None:
+            self._count_cache("revalidated")
+            return cached_response(url, entry, body)
+        self._count_cache("misses")
+        if response.status_code == 200:
+            self.cache.store(url, revision, response)
+        return response
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_latency"] = stats["latency"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+
+_transport = None
+_transport_lock = threading.Lock()
+_fetch_executor = None
+_fetch_executor_lock = threading.Lock()
+
+def get_transport():
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HTTPTransport()
+        return _transport
+
+def configure_transport(**kwargs):
+    """
+    Replaces the shared transport with one built with the given HTTPTransport arguments.
+    """
+    global _transport
+    with _transport_lock:
+        _transport = HTTPTransport(**kwargs)
+        return _transport
+
+#Function to build the URL of a Hub API endpoint or raw file, e.g. hub_url("api/models/bigcode/starpii").
+def hub_url(path):
+    return f"{HF_ENDPOINT}/{path}"
+
+#Every HTTP request goes through a transport, the shared one unless another is given.
+def http_get(url, transport=None, **kwargs):
+    return (transport or get_transport()).get(url, **kwargs)
+
+#Requests to the Hugging Face Hub also go through the response cache, when one is configured.
+def http_get_cached(url, revision="main", transport=None, **kwargs):
+    return (transport or get_transport()).get_cached(url, revision, **kwargs)
+
+def resolve_transport(session=None, cache=None):
+    """
+    Returns the transport to use for the given session and cache.
+
+    :param session: An HTTPTransport, a requests.Session or None (shared transport)
+    :param cache: A ResponseCache or None (the cache of the transport, if any)
+    """
+    if session is None:
+        transport = get_transport()
+    elif isinstance(session, HTTPTransport):
+        transport = session
+    else:
+        return HTTPTransport(session=session, cache=cache)
+    if cache is None or cache is transport.cache:
+        return transport
+    return transport.with_cache(cache)
+
+def get_fetch_executor():
+    global _fetch_executor
+    with _fetch_executor_lock:
+        if _fetch_executor is None:
+            _fetch_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="aloha-fetch")
+        return _fetch_executor
@@ -0,0 +1,40 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import contextlib
+import os
+import threading
+import uuid
+
+
+def generate_bom_ref(component_name):
+    return f"{component_name}-{uuid.uuid5(uuid.NAMESPACE_OID, component_name)}"
+
+def generate_properties(name, value):
+    properties = {
+        "name": name,
+        "value": value
+    }
+    return properties
+
+def list_to_string(data):
+    # Check if 'license' is a list or a string.
+    if isinstance(data, list):
+        string_data = ", ".join(data) #license is sometimes returned as a list, so we convert it into a string.
+        return string_data
+    else:
+        return data
+
+#Function to write a file atomically: readers never see a partially written file.
+def atomic_write(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # The file at path is left untouched, and so is no partial temporary file.
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
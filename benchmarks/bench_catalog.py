@@ -0,0 +1,104 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Benchmark of the SQLite catalog (--catalog, aloha query) of many models.
+
+Builds the AIBOMs of the recorded fixtures (benchmarks/fixtures) without any network access,
+renamed into many synthetic models with varied licenses (SPDX or not), architectures, base models,
+datasets and metrics, and adds them to a new catalog in batches. The insert throughput, the size of
+the catalog and the time of each query of 'aloha query' (best of several runs) are printed.
+
+    python benchmarks/bench_catalog.py [--models 100000] [--batch-size 500] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aloha.catalog import Catalog  # noqa: E402
+from aloha.licenses import configure_spdx_license_index  # noqa: E402
+from bench_encode import FIXTURES_DIR, build_aiboms  # noqa: E402
+
+LICENSES = [{"license": {"id": "Apache-2.0"}}, {"license": {"id": "MIT"}}, {"license": {"name": "llama2"}}, {"license": {"name": "other"}}]
+ARCHITECTURES = ["llama", "bert", "mistral", "gpt2", "t5", "qwen2", "gemma", "phi"]
+
+
+#Function to derive a synthetic AIBOM from a template; only the parts changed are copied, the catalog does not modify the AIBOMs.
+def synthetic_aibom(templates, n):
+    aibom = dict(templates[n % len(templates)][0])
+    model_id = f"bench/model-{n}"
+    aibom["metadata"] = dict(aibom["metadata"])
+    component = aibom["metadata"]["component"] = dict(aibom["metadata"]["component"])
+    component["name"] = model_id
+    component["bom-ref"] = f"{model_id}-ref"
+    component["licenses"] = [LICENSES[n % len(LICENSES)]]
+    card = component["modelCard"] = dict(component.get("modelCard", {}))
+    card["modelParameters"] = dict(card.get("modelParameters", {}), architectureFamily=ARCHITECTURES[n % len(ARCHITECTURES)])
+    properties = [prop for prop in card.get("properties", []) if not prop["name"].startswith("base_model")]
+    card["properties"] = properties + [{"name": "base_model", "value": f"bench/base-{n % 1000}"}]
+    card["quantitativeAnalysis"] = {"performanceMetrics": [{"slice": "dataset: bench/eval, split: test", "type": "accuracy", "value": (n % 1000) / 1000}]}
+    aibom["components"] = aibom.get("components", []) + [{"type": "data", "bom-ref": f"bench/data-{n % 5000}-ref", "name": f"bench/data-{n % 5000}"}]
+    return aibom
+
+
+def best_time(function, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models", type=int, default=100000, help="Models added to the catalog")
+    parser.add_argument("--batch-size", type=int, default=500, help="AIBOMs inserted per transaction")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each query, the best one is reported")
+    args = parser.parse_args()
+
+    configure_spdx_license_index(snapshot=os.path.join(FIXTURES_DIR, "spdx_licenses.json"))
+    templates = build_aiboms()
+    start = time.perf_counter()
+    aiboms = [synthetic_aibom(templates, n) for n in range(args.models)]
+    print(f"{args.models} synthetic AIBOMs built in {time.perf_counter() - start:.1f} seconds")
+
+    with tempfile.TemporaryDirectory(prefix="aloha-bench-catalog-") as workdir:
+        path = os.path.join(workdir, "catalog.sqlite")
+        with Catalog(path, batch_size=args.batch_size) as catalog:
+            start = time.perf_counter()
+            catalog.add_all(aiboms)
+            seconds = time.perf_counter() - start
+            print(f"insert: {seconds:.2f} seconds, {args.models / seconds:.0f} models/s, "
+                  f"catalog of {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+            # The same AIBOMs again: every model is replaced.
+            start = time.perf_counter()
+            catalog.add_all(aiboms[:args.models // 10])
+            seconds = time.perf_counter() - start
+            print(f"replace: {seconds:.2f} seconds, {args.models // 10 / seconds:.0f} models/s")
+
+            queries = [
+                ("non-spdx", {}),
+                ("license", {"value": "apache-2.0"}),
+                ("dataset", {"value": "bench/data-42"}),
+                ("base-model", {"value": "bench/base-42"}),
+                ("architecture", {"value": "llama"}),
+                ("metric", {"value": "accuracy", "minimum": 0.999}),
+            ]
+            print(f"{'query':<16}{'rows':>8}{'ms':>10}")
+            for name, params in queries:
+                seconds, rows = best_time(lambda: catalog.run(name, **params), args.repeat)
+                print(f"{name:<16}{len(rows):>8}{seconds * 1000:>10.2f}")
+            sql = "SELECT architecture_family, COUNT(*) AS models FROM models GROUP BY architecture_family"
+            seconds, rows = best_time(lambda: catalog.query(sql), args.repeat)
+            print(f"{'sql (group by)':<16}{len(rows):>8}{seconds * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
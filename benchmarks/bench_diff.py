@@ -0,0 +1,106 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Benchmark of the batch diff (aloha diff) of two nightly outputs of many models.
+
+Builds the AIBOMs of the recorded fixtures (benchmarks/fixtures) without any network access,
+renamed into many synthetic models, and writes two generations of them: in the second one a
+fraction of the models changed (a metric, a property and a license), some were removed and
+others added. Both generations are then compared, as gzip NDJSON shards (default and canonical
+output) and as directories of JSON files, and the time and peak RSS of each diff are printed.
+
+    python benchmarks/bench_diff.py [--models 50000] [--changed 0.01] [--dir-models 5000]
+"""
+
+import argparse
+import copy
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aloha.canonical import canonicalize  # noqa: E402
+from aloha.diff import diff_aibom_sources  # noqa: E402
+from aloha.licenses import configure_spdx_license_index  # noqa: E402
+from aloha.output import DirectoryWriter, NDJSONWriter  # noqa: E402
+from bench_encode import FIXTURES_DIR, build_aiboms  # noqa: E402
+
+
+def synthetic_aibom(templates, n, changed):
+    aibom, last_modified = templates[n % len(templates)]
+    aibom = copy.deepcopy(aibom)
+    model_id = f"bench/model-{n}"
+    component = aibom["metadata"]["component"]
+    component["name"] = model_id
+    component["bom-ref"] = f"{model_id}-ref"
+    if changed:
+        card = component.setdefault("modelCard", {})
+        card.setdefault("properties", []).append({"name": "base_model", "value": "bench/new-base"})
+        for metric in card.get("quantitativeAnalysis", {}).get("performanceMetrics", [])[:1]:
+            metric["value"] = -1
+        component["licenses"] = [{"license": {"id": "MIT", "url": "https://opensource.org/license/mit/"}}]
+    return model_id, aibom, last_modified
+
+
+def write_generation(templates, models, changes, output_dir, fmt, canonical):
+    """
+    Writes one generation; changes maps a model number to True (changed), or None (not in this generation).
+    """
+    writer = NDJSONWriter(output_dir, compression="gzip", max_records=10000, canonical=canonical) if fmt == "ndjson" \
+        else DirectoryWriter(output_dir, canonical=canonical)
+    with writer:
+        for n in models:
+            if changes.get(n, False) is None:
+                continue
+            model_id, aibom, last_modified = synthetic_aibom(templates, n, changes.get(n, False))
+            if canonical:
+                canonicalize(aibom, last_modified)
+            writer.write(aibom, model_id)
+
+
+def run(templates, count, changed, workdir, fmt, canonical):
+    step = max(int(1 / changed), 1) if changed else count + 1
+    old_changes = {n: None for n in range(count - count // 100, count)} # Models added in the new generation.
+    new_changes = {n: True for n in range(0, count, step)}
+    new_changes.update({n: None for n in range(1, count // 100 * 2, 2)}) # Models removed in the new generation.
+    old_dir, new_dir = os.path.join(workdir, "old"), os.path.join(workdir, "new")
+    write_generation(templates, range(count), old_changes, old_dir, fmt, canonical)
+    write_generation(templates, range(count), new_changes, new_dir, fmt, canonical)
+
+    statuses = {}
+    start = time.perf_counter()
+    for entry in diff_aibom_sources(old_dir, new_dir):
+        statuses[entry["status"]] = statuses.get(entry["status"], 0) + 1
+    return time.perf_counter() - start, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models", type=int, default=50000, help="Models of the NDJSON outputs")
+    parser.add_argument("--changed", type=float, default=0.01, help="Fraction of the models changed in the new generation")
+    parser.add_argument("--dir-models", type=int, default=5000, help="Models of the directories of JSON files, 0 to skip them")
+    args = parser.parse_args()
+
+    configure_spdx_license_index(snapshot=os.path.join(FIXTURES_DIR, "spdx_licenses.json"))
+    templates = build_aiboms()
+    scenarios = [("ndjson", False, args.models), ("ndjson", True, args.models)]
+    if args.dir_models:
+        scenarios += [("json", False, args.dir_models), ("json", True, args.dir_models)]
+
+    print(f"{'scenario':<20}{'models':>8}{'seconds':>10}{'models/s':>12}  statuses")
+    for fmt, canonical, count in scenarios:
+        with tempfile.TemporaryDirectory(prefix="aloha-bench-diff-") as workdir:
+            seconds, statuses = run(templates, count, args.changed, workdir, fmt, canonical)
+        name = f"{fmt}{'-canonical' if canonical else ''}"
+        print(f"{name:<20}{count:>8}{seconds:>10.2f}{count / seconds:>12.0f}  "
+              + ", ".join(f"{count} {status}" for status, count in sorted(statuses.items())))
+    print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
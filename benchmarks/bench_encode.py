@@ -0,0 +1,106 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Microbenchmark of the serialization of the AIBOMs, default and canonical.
+
+Builds the AIBOMs of the recorded fixtures (benchmarks/fixtures) without any network access and
+encodes them many times in a tight loop, printing the cost per AIBOM of:
+
+- json-indent4: the default files (indented by 4, standard encoder)
+- ndjson: the default NDJSON lines, with orjson when it is installed and with the standard encoder
+- canonical-json / canonical-ndjson: canonicalize() (sorting, content hash) and the sorted encoding,
+  always with the standard encoder
+
+    python benchmarks/bench_encode.py [--records 2000] [--repeat 3]
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+from unittest import mock
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aloha.bom import assemble_aibom, generate_cyclonedx_component  # noqa: E402
+from aloha.canonical import canonicalize  # noqa: E402
+from aloha.dataset import DATASET_MAPPING  # noqa: E402
+from aloha.licenses import configure_spdx_license_index  # noqa: E402
+from aloha.output import CANONICAL_INDENT, encode_json, encode_ndjson  # noqa: E402
+from aloha.readme import ModelReadme  # noqa: E402
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_aiboms():
+    models = load_fixture("models.json")
+    readmes = load_fixture("readmes.json")
+    datasets = load_fixture("datasets.json")
+    aiboms = []
+    for model_id, data in models.items():
+        component = generate_cyclonedx_component(data, ModelReadme(readmes.get(model_id, "")))
+        dataset_components = [(dataset_id, DATASET_MAPPING.convert(record, {"type": "data", "name": dataset_id}))
+                              for dataset_id, record in datasets.items()]
+        aiboms.append((assemble_aibom(component, dataset_components), data.get("lastModified")))
+    return aiboms
+
+
+def bench(encode, aiboms, count, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for n in range(count):
+            encode(*aiboms[n % len(aiboms)])
+        best = min(best, time.perf_counter() - start)
+    return best / count
+
+
+def canonical_json(aibom, last_modified):
+    aibom = copy.deepcopy(aibom)
+    canonicalize(aibom, last_modified)
+    return encode_json(aibom, indent=CANONICAL_INDENT, sort_keys=True)
+
+
+def canonical_ndjson(aibom, last_modified):
+    aibom = copy.deepcopy(aibom)
+    canonicalize(aibom, last_modified)
+    return encode_ndjson(aibom, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000, help="AIBOMs encoded per measurement")
+    parser.add_argument("--repeat", type=int, default=3, help="Measurements, the best one is reported")
+    args = parser.parse_args()
+
+    configure_spdx_license_index(snapshot=os.path.join(FIXTURES_DIR, "spdx_licenses.json"))
+    aiboms = build_aiboms()
+    size = sum(len(encode_json(aibom)) for aibom, _ in aiboms) / len(aiboms)
+    print(f"{len(aiboms)} AIBOMs of {size / 1024:.1f} KB on average (indented by 4)")
+
+    scenarios = {
+        "json-indent4": lambda aibom, last_modified: encode_json(aibom),
+        "ndjson": lambda aibom, last_modified: encode_ndjson(aibom),
+        "copy": lambda aibom, last_modified: copy.deepcopy(aibom), # Cost of the copy made by the canonical scenarios.
+        "canonical-json": canonical_json,
+        "canonical-ndjson": canonical_ndjson,
+    }
+    results = {name: bench(encode, aiboms, args.records, args.repeat) for name, encode in scenarios.items()}
+    # The default NDJSON lines without orjson, as if it was not installed.
+    with mock.patch.dict(sys.modules, {"orjson": None}):
+        results["ndjson (no orjson)"] = bench(scenarios["ndjson"], aiboms, args.records, args.repeat)
+
+    for name, seconds in results.items():
+        print(f"{name:<30}{seconds * 1e6:>10.1f} us/AIBOM")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Microbenchmark of the field mapping engine converting model and dataset records.
+
+Converts the recorded fixtures (benchmarks/fixtures) many times in a tight loop, without any
+network access (the SPDX license list is read from the fixture), and prints the cost per record.
+
+    python benchmarks/bench_mapping.py [--records 20000] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aloha.bom import MODEL_COMPONENT_MAPPING  # noqa: E402
+from aloha.dataset import DATASET_MAPPING  # noqa: E402
+from aloha.licenses import configure_spdx_license_index, get_spdx_license_index  # noqa: E402
+from aloha.readme import ModelReadme  # noqa: E402
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def bench(mapping, records, count, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for n in range(count):
+            mapping.convert(records[n % len(records)], {})
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000, help="Records converted per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions, the best time is reported")
+    args = parser.parse_args()
+
+    configure_spdx_license_index(snapshot=os.path.join(FIXTURES_DIR, "spdx_licenses.json"))
+    get_spdx_license_index()
+    models = load_fixture("models.json")
+    readmes = load_fixture("readmes.json")
+    # README sections are parsed once per model by ModelReadme, outside of the mapping.
+    model_records = [{"model": data, "readme": ModelReadme(readmes.get(model_id))} for model_id, data in models.items()]
+    dataset_records = list(load_fixture("datasets.json").values())
+
+    print(f"{'mapping':>10} {'rules':>6} {'records':>9} {'time (s)':>10} {'us/record':>10} {'records/s':>12}")
+    for name, mapping, records in (("model", MODEL_COMPONENT_MAPPING, model_records), ("dataset", DATASET_MAPPING, dataset_records)):
+        elapsed = bench(mapping, records, args.records, args.repeat)
+        print(f"{name:>10} {len(mapping.fields):>6} {args.records:>9} {elapsed:>10.3f} {elapsed / args.records * 1e6:>10.1f} {args.records / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
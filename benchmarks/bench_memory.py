@@ -0,0 +1,155 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Stress test of the memory used to generate the AIBOM of a model with a very large model card.
+
+The mock Hub (benchmarks/mock_hub.py) serves a synthetic model whose card lists tens of thousands
+of evaluation results, tags and files, trained on a synthetic dataset with many subsets of many
+shards each. Its AIBOM is generated by a new process for each mode, and the peak RSS of that
+process, its duration and the size of the AIBOM are reported:
+
+- uncapped: no caps, every response decoded with json.loads (the behavior before the caps)
+- capped: the default caps applied after decoding with json.loads
+- streamed: the default caps applied while decoding with ijson (pip install .[stream])
+
+    python benchmarks/bench_memory.py [--results 20000] [--tags 20000] [--configs 500] [--shards 200]
+"""
+
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, ".."))
+
+from mock_hub import MockHub, MockHubServer  # noqa: E402
+
+HUGE_MODEL_ID = "bench/huge-model-card"
+HUGE_DATASET_ID = "bench/huge-dataset"
+UNCAPPED = "1000000000"
+
+
+def add_huge_records(hub, results, tags, configs, shards):
+    """
+    Adds the synthetic model and dataset to the records served by hub.
+    """
+    base_id = hub.recorded_ids[0]
+    model = json.loads(json.dumps(hub.models[base_id]))
+    model["tags"] = [f"tag-{n}" for n in range(tags)]
+    model["siblings"] = [{"rfilename": f"shards/model-{n:05d}.safetensors"} for n in range(tags)]
+    model["cardData"] = dict(model.get("cardData") or {}, datasets=[HUGE_DATASET_ID], **{"model-index": [{
+        "name": HUGE_MODEL_ID,
+        "results": [{
+            "task": {"type": "text-generation"},
+            "dataset": {"name": f"Benchmark {n}", "type": f"bench/benchmark-{n}", "split": "test"},
+            "metrics": [{"type": "accuracy", "value": 0.5}, {"type": "f1", "value": 0.25}],
+        } for n in range(results)],
+    }]})
+    hub.models[HUGE_MODEL_ID] = model
+    hub.readmes[HUGE_MODEL_ID] = hub.readmes.get(base_id, "")
+    hub.datasets[HUGE_DATASET_ID] = {
+        "id": HUGE_DATASET_ID,
+        "author": "bench",
+        "tags": [f"tag-{n}" for n in range(tags)],
+        "cardData": {"configs": [{
+            "config_name": f"subset-{n}",
+            "data_files": [{"split": "train", "path": [f"data/subset-{n}/train-{m:05d}.parquet" for m in range(shards)]}],
+        } for n in range(configs)]},
+    }
+
+
+def run_child(mode, output_dir):
+    """
+    Generates the AIBOM of the synthetic model in this process (started by run_mode).
+    """
+    import aloha.limits
+    from aloha.cli import main
+
+    argv = [HUGE_MODEL_ID, "-o", output_dir, "--no-cache"]
+    if mode == "uncapped":
+        argv += ["--max-metrics", UNCAPPED, "--max-tags", UNCAPPED, "--max-configs", UNCAPPED, "--max-data-files", UNCAPPED]
+    if mode != "streamed":
+        aloha.limits.STREAM_DECODE_MIN_BYTES = float("inf")
+    return main(argv)
+
+
+def serve_huge_hub(args, queue, stop):
+    """
+    Serves the recorded and synthetic records until stop is set (in the process started by main).
+    """
+    hub = MockHub()
+    add_huge_records(hub, args.results, args.tags, args.configs, args.shards)
+    with MockHubServer(hub) as server:
+        queue.put((server.url, server.spdx_url, len(hub.model(HUGE_MODEL_ID)[0]), len(hub.dataset(HUGE_DATASET_ID)[0])))
+        stop.wait()
+
+
+def run_mode(url, spdx_url, mode, workdir):
+    env = dict(os.environ, HF_ENDPOINT=url, ALOHA_SPDX_URL=spdx_url, HOME=os.path.join(workdir, "home"))
+    output_dir = os.path.join(workdir, mode)
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", mode, output_dir],
+                               env=env, stdout=subprocess.DEVNULL)
+    pid, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    seconds = time.perf_counter() - start
+    aibom_bytes = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir)) if os.path.isdir(output_dir) else 0
+    return {
+        "failed": process.returncode != 0,
+        "seconds": seconds,
+        "peak_rss_mb": usage.ru_maxrss / 1024, # KB on Linux.
+        "aibom_bytes": aibom_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=20000, help="Evaluation results in the model-index of the synthetic model")
+    parser.add_argument("--tags", type=int, default=20000, help="Tags (and files) of the synthetic model and dataset")
+    parser.add_argument("--configs", type=int, default=500, help="Subsets of the synthetic dataset")
+    parser.add_argument("--shards", type=int, default=200, help="Data files of each subset of the synthetic dataset")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "OUTPUT_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return run_child(*args.child)
+
+    modes = ["uncapped", "capped", "streamed"]
+    if importlib.util.find_spec("ijson") is None:
+        print("ijson is not installed: the streamed mode is skipped (pip install .[stream])")
+        modes.remove("streamed")
+
+    # The mock Hub runs in its own process: on Linux the peak RSS of a process includes the RSS of its
+    # parent at fork time, so the processes generating the AIBOMs are started by this small one.
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    stop = context.Event()
+    hub_process = context.Process(target=serve_huge_hub, args=(args, queue, stop), daemon=True)
+    hub_process.start()
+    url, spdx_url, model_bytes, dataset_bytes = queue.get()
+    print(f"Model record: {model_bytes / 1024 / 1024:.1f} MB, dataset record: {dataset_bytes / 1024 / 1024:.1f} MB")
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="aloha-bench-memory-") as workdir:
+            for mode in modes:
+                results[mode] = run_mode(url, spdx_url, mode, workdir)
+    finally:
+        stop.set()
+        hub_process.join()
+
+    print(f"{'mode':<10}{'failed':>8}{'seconds':>10}{'peak RSS MB':>14}{'AIBOM KB':>12}")
+    for mode, result in results.items():
+        print(f"{mode:<10}{result['failed']:>8}{result['seconds']:>10.2f}{result['peak_rss_mb']:>14.1f}{result['aibom_bytes'] / 1024:>12.1f}")
+    return 1 if any(result["failed"] for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
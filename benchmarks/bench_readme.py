@@ -0,0 +1,85 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Microbenchmark of the README section scanner on large synthetic READMEs.
+
+Scanning must be linear in the size of the README: the time per MB printed for each size
+should stay roughly constant from 1 MB to 10 MB.
+
+    python benchmarks/bench_readme.py [--sizes 1 2 5 10] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aloha.readme import ModelReadme  # noqa: E402
+
+VALID_TITLES = ['model description', 'model details', 'uses', 'intended uses & limitations']
+
+SECTION = """## 🚀 Section {n}
+Some text describing the model, with **markdown** and a [link](https://huggingface.co).
+More text on a second line of the paragraph.
+
+```python
+# A comment that must not be taken for a heading
+from transformers import AutoModel
+model = AutoModel.from_pretrained("org/model-{n}")
+```
+
+Setext heading {n}
+------------------
+- a list item
+- another list item
+
+"""
+
+
+def synthetic_readme(size_mb):
+    front_matter = "---\nlicense: mit\ntags:\n- text-generation\n---\n"
+    target = size_mb * 1024 * 1024
+    parts = [front_matter]
+    length = len(front_matter)
+    n = 0
+    while length < target:
+        if n == target // 4096:
+            section = "## Model description\nThe description of the model.\n\n"
+        else:
+            section = SECTION.format(n=n)
+        parts.append(section)
+        length += len(section)
+        n += 1
+    return "".join(parts)
+
+
+def bench(text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        readme = ModelReadme(text)
+        readme.get_section(VALID_TITLES)
+        best = min(best, time.perf_counter() - start)
+    return best, len(readme.sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 5, 10], help="README sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per size, the best time is reported")
+    args = parser.parse_args()
+
+    print(f"{'size (MB)':>10} {'sections':>10} {'time (s)':>10} {'s/MB':>10} {'MB/s':>10}")
+    for size in args.sizes:
+        text = synthetic_readme(size)
+        elapsed, sections = bench(text, args.repeat)
+        megabytes = len(text) / (1024 * 1024)
+        print(f"{megabytes:>10.1f} {sections:>10} {elapsed:>10.3f} {elapsed / megabytes:>10.4f} {megabytes / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Benchmark of the service mode (aloha serve) against the local mock Hub.
+
+The service runs in this process on a free port, pointed at benchmarks/mock_hub.py, and is
+called over HTTP by concurrent clients. For each scenario the latency per request (p50/p99,
+measured by the client), the throughput and the Hub requests per AIBOM are reported:
+
+- cold: every model requested once, from empty caches
+- warm: the same models again, the Hub responses are revalidated
+- burst: many concurrent requests for one model, coalesced into one generation
+- cli: the same model generated by a new 'python -m aloha' process each time, for comparison
+
+    python benchmarks/bench_service.py [--models 50] [--clients 16] [--burst 32] [--cli-runs 3]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, ".."))
+
+import aloha.licenses  # noqa: E402
+import aloha.transport  # noqa: E402
+from aloha.cache import ResponseCache  # noqa: E402
+from aloha.dataset import configure_dataset_registry  # noqa: E402
+from aloha.licenses import configure_spdx_license_index  # noqa: E402
+from aloha.metrics import configure_metrics  # noqa: E402
+from aloha.service import AIBOMService, make_server  # noqa: E402
+from aloha.transport import configure_transport  # noqa: E402
+from mock_hub import MockHub, MockHubServer  # noqa: E402
+from run_benchmarks import percentile  # noqa: E402
+
+
+def request(url):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def run_requests(hub, urls, clients):
+    """
+    Sends the requests with clients concurrent clients.
+
+    :return: Dict of the results of the scenario
+    """
+    requests_before = hub.stats["requests"]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(request, urls))
+    seconds = time.perf_counter() - start
+    latencies = [latency for latency, status in results]
+    return {
+        "requests": len(urls),
+        "failed": sum(status != 200 for latency, status in results),
+        "seconds": seconds,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "hub_requests": hub.stats["requests"] - requests_before,
+    }
+
+
+def run_cli(server, model_id, runs, workdir):
+    """
+    Generates the AIBOM of model_id with a new process each time, as a registry hook without the service would.
+    """
+    env = dict(os.environ, HF_ENDPOINT=server.url, ALOHA_SPDX_URL=server.spdx_url, HOME=os.path.join(workdir, "home"))
+    latencies = []
+    for n in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "aloha", model_id, "-o", os.path.join(workdir, "cli"),
+                        "--cache-dir", os.path.join(workdir, "cli-cache")],
+                       cwd=os.path.join(BENCHMARKS_DIR, ".."), env=env, stdout=subprocess.DEVNULL, check=True)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "requests": runs,
+        "failed": 0,
+        "seconds": sum(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "hub_requests": None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models", type=int, default=50, help="Distinct models requested in the cold and warm scenarios")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--burst", type=int, default=32, help="Concurrent requests for the same model in the burst scenario")
+    parser.add_argument("--cli-runs", type=int, default=3, help="Runs of the cli scenario, 0 to skip it")
+    parser.add_argument("--latency", type=float, default=5.0, help="Latency of every mock Hub response, in ms")
+    args = parser.parse_args()
+
+    hub = MockHub(latency=args.latency)
+    with MockHubServer(hub) as hub_server, tempfile.TemporaryDirectory(prefix="aloha-bench-service-") as workdir:
+        aloha.transport.HF_ENDPOINT = hub_server.url
+        aloha.licenses.SPDX_LICENSES_URL = hub_server.spdx_url
+        aloha.licenses.SPDX_CACHE_PATH = os.path.join(workdir, "spdx_licenses.json")
+        configure_spdx_license_index()
+        configure_transport(max_per_host=max(args.clients, aloha.transport.MAX_REQUESTS_PER_HOST), cache=ResponseCache(os.path.join(workdir, "http")))
+        configure_dataset_registry(store_dir=None)
+        metrics = configure_metrics()
+
+        service = AIBOMService()
+        server = make_server("127.0.0.1", 0, service)
+        threading.Thread(target=server.serve_forever, name="aloha-service", daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        results = {}
+        model_urls = [f"{url}/aibom/{model_id}" for model_id in hub.synthetic_ids(args.models)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.warm_up()
+            results["cold"] = run_requests(hub, model_urls, args.clients)
+            results["warm"] = run_requests(hub, model_urls, args.clients)
+            # A model that is not cached yet: the concurrent requests wait for the same generation.
+            results["burst"] = run_requests(hub, [f"{url}/aibom/{hub.recorded_ids[0]}"] * args.burst, args.burst)
+        coalesced = metrics.get_counters()["coalesced_requests"]
+        server.shutdown()
+        server.server_close()
+        if args.cli_runs:
+            results["cli"] = run_cli(hub_server, hub.recorded_ids[0], args.cli_runs, workdir)
+
+    print(f"{'scenario':<10}{'requests':>10}{'failed':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'hub req/AIBOM':>15}")
+    for name, result in results.items():
+        per_bom = "-" if result["hub_requests"] is None else f"{result['hub_requests'] / result['requests']:.2f}"
+        print(f"{name:<10}{result['requests']:>10}{result['failed']:>8}{result['requests'] / result['seconds']:>10.1f}"
+              f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{per_bom:>15}")
+    print(f"{coalesced} requests served by a generation already in flight")
+    return 1 if any(result["failed"] for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Local stand-in for the Hugging Face Hub and the SPDX license list, serving the recorded fixtures.
+
+Routes:
+    /api/models/<id>?expand[]=     model metadata (fixtures/models.json), projected on the expand[] fields
+    /api/models?author=&search=&filter=&limit=&expand[]=
+                                   paginated listing, with a 'Link: <...>; rel="next"' cursor
+    /<id>/raw/main/README.md       model README (fixtures/readmes.json)
+    /api/datasets/<id>             dataset metadata (fixtures/datasets.json)
+    /spdx/licenses.json            SPDX license list (fixtures/spdx_licenses.json)
+
+Any number of synthetic models can be served: 'bench/model-<n>' is a copy of the n-th recorded
+model (modulo their number) with its own ID, so batches of 10k models need no extra fixtures;
+the listing of the author 'bench' returns the first listing_size of them.
+Responses carry an ETag and honour If-None-Match. With reject_expand, expand[] is answered with
+a 400 like an endpoint that does not support it. Latency and errors (503 with Retry-After or
+dropped connections) can be injected.
+
+    python benchmarks/mock_hub.py --port 8080 --latency 20
+    HF_ENDPOINT=http://127.0.0.1:8080 ALOHA_SPDX_URL=http://127.0.0.1:8080/spdx/licenses.json python ALOHA.py bench/model-1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlencode, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SYNTHETIC_PREFIX = "bench/model-"
+
+
+def _load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class MockHub:
+    """
+    Fixtures and counters of the stand-in Hub, shared by the request handlers.
+
+    :param latency: Delay added to every response, in milliseconds
+    :param jitter: Random extra delay, up to this many milliseconds
+    :param error_rate: Fraction of the requests answered with an error
+    :param error_mode: 'status' (503 with Retry-After: 0) or 'drop' (connection closed without a response)
+    :param listing_size: Synthetic models returned by the listing of the author 'bench'
+    :param reject_expand: Answer 400 to the requests with expand[] parameters
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_mode="status", seed=0, listing_size=1000, reject_expand=False):
+        self.models = _load_fixture("models.json")
+        self.readmes = _load_fixture("readmes.json")
+        self.datasets = _load_fixture("datasets.json")
+        self.spdx = _load_fixture("spdx_licenses.json")
+        self.recorded_ids = list(self.models)
+        self.listing_size = listing_size
+        self.reject_expand = reject_expand
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.error_mode = error_mode
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "bytes": 0, "not_modified": 0, "errors": 0, "not_found": 0}
+
+    def synthetic_ids(self, count):
+        return [f"{SYNTHETIC_PREFIX}{n}" for n in range(count)]
+
+    def _recorded_id(self, model_id):
+        if model_id.startswith(SYNTHETIC_PREFIX):
+            number = model_id[len(SYNTHETIC_PREFIX):]
+            if number.isdigit():
+                return self.recorded_ids[int(number) % len(self.recorded_ids)]
+        return model_id
+
+    def model(self, model_id, expand=None):
+        recorded = self.models.get(self._recorded_id(model_id))
+        if recorded is None:
+            return None
+        data = dict(recorded, id=model_id, modelId=model_id, author=model_id.split("/")[0])
+        if expand:
+            data = {key: value for key, value in data.items() if key in expand or key in ("_id", "id")}
+        return json.dumps(data).encode("utf-8"), "application/json; charset=utf-8"
+
+    def listing(self, query, base_url):
+        """
+        Page of the model listing, filtered as the Hub does; expand[] projects the returned fields.
+
+        :return: Tuple (body, content type, headers)
+        """
+        params = parse_qs(query)
+        author = params.get("author", [None])[0]
+        search = params.get("search", [None])[0]
+        tags = params.get("filter", [])
+        limit = int(params.get("limit", ["1000"])[0])
+        offset = int(params.get("cursor", ["0"])[0])
+        expand = params.get("expand[]")
+
+        model_ids = self.recorded_ids + self.synthetic_ids(self.listing_size)
+        matching = []
+        for model_id in model_ids:
+            if author and model_id.split("/")[0] != author:
+                continue
+            if search and search.lower() not in model_id.lower():
+                continue
+            record = json.loads(self.model(model_id)[0])
+            if any(tag not in record.get("tags", []) and tag != record.get("pipeline_tag") for tag in tags):
+                continue
+            matching.append(record)
+
+        page = matching[offset:offset + limit]
+        if expand:
+            page = [{key: value for key, value in record.items() if key in expand or key in ("_id", "id")} for record in page]
+        elif params.get("full") != ["true"]:
+            page = [{key: value for key, value in record.items() if key not in ("cardData", "config", "siblings")} for record in page]
+        headers = {}
+        if offset + limit < len(matching):
+            next_query = {key: values for key, values in params.items() if key != "cursor"}
+            next_query["cursor"] = [str(offset + limit)]
+            headers["Link"] = f'<{base_url}/api/models?{urlencode(next_query, doseq=True)}>; rel="next"'
+        return json.dumps(page).encode("utf-8"), "application/json; charset=utf-8", headers
+
+    def readme(self, model_id):
+        text = self.readmes.get(self._recorded_id(model_id))
+        if text is None:
+            return None
+        return text.encode("utf-8"), "text/plain; charset=utf-8"
+
+    def dataset(self, dataset_id):
+        data = self.datasets.get(dataset_id)
+        if data is None:
+            return None
+        return json.dumps(data).encode("utf-8"), "application/json; charset=utf-8"
+
+    def route(self, path):
+        url = urlparse(path)
+        path = unquote(url.path).strip("/")
+        if path.startswith("api/models/"):
+            return self.model(path[len("api/models/"):], parse_qs(url.query).get("expand[]"))
+        if path.startswith("api/datasets/"):
+            return self.dataset(path[len("api/datasets/"):])
+        if path.endswith("/raw/main/README.md"):
+            return self.readme(path[:-len("/raw/main/README.md")])
+        if path == "spdx/licenses.json":
+            return json.dumps(self.spdx).encode("utf-8"), "application/json"
+        return None
+
+    def inject_error(self):
+        with self.lock:
+            return self.error_rate > 0 and self.random.random() < self.error_rate
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.stats[name] += value
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, as the real Hub.
+
+    def do_GET(self):
+        hub = self.server.hub
+        hub.count("requests")
+        if hub.latency or hub.jitter:
+            time.sleep(hub.latency + hub.random.random() * hub.jitter)
+
+        if hub.inject_error():
+            hub.count("errors")
+            if hub.error_mode == "drop":
+                self.close_connection = True
+                self.connection.close()
+                return
+            self._send(503, b'{"error":"Service Unavailable"}', "application/json", {"Retry-After": "0"})
+            return
+
+        url = urlparse(self.path)
+        if hub.reject_expand and "expand[]" in parse_qs(url.query):
+            self._send(400, b'{"error":"Invalid expand parameter"}', "application/json")
+            return
+        if url.path.rstrip("/") == "/api/models":
+            body, content_type, headers = hub.listing(url.query, f"http://{self.headers['Host']}")
+            hub.count("bytes", len(body))
+            self._send(200, body, content_type, headers)
+            return
+
+        routed = hub.route(self.path)
+        if routed is None:
+            hub.count("not_found")
+            self._send(404, b'{"error":"Repository not found"}', "application/json")
+            return
+
+        body, content_type = routed
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            hub.count("not_modified")
+            self._send(304, b"", content_type, {"ETag": etag})
+            return
+        hub.count("bytes", len(body))
+        self._send(200, body, content_type, {"ETag": etag})
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockHubServer:
+    """
+    Runs a MockHub on a local port in a background thread; usable as a context manager.
+    """
+
+    def __init__(self, hub=None, host="127.0.0.1", port=0):
+        self.hub = hub or MockHub()
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.hub = self.hub
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def spdx_url(self):
+        return f"{self.url}/spdx/licenses.json"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-hub", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Hugging Face Hub serving recorded fixtures.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay added to every response, in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra delay, up to this many ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of the requests answered with an error")
+    parser.add_argument("--error-mode", choices=["status", "drop"], default="status", help="status: 503 with Retry-After; drop: close the connection")
+    args = parser.parse_args()
+
+    hub = MockHub(args.latency, args.jitter, args.error_rate, args.error_mode)
+    server = MockHubServer(hub, args.host, args.port)
+    print(f"Mock Hub listening on {server.url} (SPDX list at {server.spdx_url})")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+End-to-end benchmarks of AIBOM generation against the local mock Hub (benchmarks/mock_hub.py).
+
+No network access is needed: the Hub and the SPDX license list are served from the recorded
+fixtures, and every scenario starts from empty caches in a temporary directory. For each scenario
+the wall time, throughput, p50/p99 latency per model, HTTP requests and bytes per AIBOM and peak
+RSS are reported, and compared with benchmarks/baseline.json: the run fails (exit code 1) if a
+metric regressed beyond its tolerance.
+
+    python benchmarks/run_benchmarks.py                    # single model, batch of 100 (cold cache, warm cache, discovery, with lineage, pipeline)
+    python benchmarks/run_benchmarks.py --full             # also a batch of 10000 models
+    python benchmarks/run_benchmarks.py --update-baseline  # record the current results as the baseline
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import aloha.batch  # noqa: E402
+import aloha.licenses  # noqa: E402
+import aloha.transport  # noqa: E402
+from aloha.bom import generate_aibom  # noqa: E402
+from aloha.cache import ResponseCache  # noqa: E402
+from aloha.dataset import configure_dataset_registry  # noqa: E402
+from aloha.discovery import iter_hub_models  # noqa: E402
+from aloha.licenses import configure_spdx_license_index  # noqa: E402
+from aloha.lineage import configure_lineage_registry  # noqa: E402
+from aloha.metrics import configure_metrics  # noqa: E402
+from aloha.output import NDJSONWriter  # noqa: E402
+from aloha.pipeline import generate_aibom_pipeline  # noqa: E402
+from aloha.transport import configure_transport  # noqa: E402
+from mock_hub import MockHub, MockHubServer  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Allowed relative increase of each metric over the baseline. Timings are noisy across machines,
+# the number of requests per AIBOM is not.
+TOLERANCES = {
+    "p50_ms": 0.5,
+    "p99_ms": 1.0,
+    "seconds": 0.5,
+    "requests_per_bom": 0.05,
+    "bytes_per_bom": 0.05,
+    "peak_rss_mb": 0.25,
+}
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux, in bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+class Environment:
+    """
+    Points ALOHA to the mock Hub and gives it fresh caches under a temporary directory.
+    """
+
+    def __init__(self, server, workdir, workers):
+        self.server = server
+        self.workdir = workdir
+        self.workers = workers
+
+    def reset(self, name, lineage_depth=0):
+        cache_dir = os.path.join(self.workdir, name)
+        aloha.transport.HF_ENDPOINT = self.server.url
+        aloha.licenses.SPDX_LICENSES_URL = self.server.spdx_url
+        aloha.licenses.SPDX_CACHE_PATH = os.path.join(cache_dir, "spdx_licenses.json")
+        configure_spdx_license_index()
+        cache = ResponseCache(os.path.join(cache_dir, "http"))
+        configure_transport(max_per_host=max(self.workers, aloha.transport.MAX_REQUESTS_PER_HOST), cache=cache)
+        configure_dataset_registry(store_dir=None)
+        configure_lineage_registry(max_depth=lineage_depth)
+        return cache_dir
+
+
+def run_batch(env, hub, model_ids, cache_name, lineage_depth=0, pipeline=False):
+    """
+    Generates the AIBOMs of model_ids with generate_aibom_batch, timing every model.
+
+    :param model_ids: List of model IDs, or a function returning the models to process once ALOHA points to the mock Hub
+    :param pipeline: Use generate_aibom_pipeline; the latency of a model is then the time spent in its stages, queue waits excluded
+    """
+    latencies = []
+
+    def timed_generate(model_id, **kwargs):
+        start = time.perf_counter()
+        try:
+            return generate_aibom(model_id, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    cache_dir = env.reset(cache_name, lineage_depth)
+    metrics = configure_metrics()
+    requests_before = hub.stats["requests"]
+    bytes_before = hub.stats["bytes"]
+    start = time.perf_counter()
+    if callable(model_ids):
+        model_ids = list(model_ids())
+    original = aloha.batch.generate_aibom
+    aloha.batch.generate_aibom = timed_generate
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            with NDJSONWriter(os.path.join(cache_dir, "out")) as writer:
+                if pipeline:
+                    created, failed = generate_aibom_pipeline(model_ids, writer=writer, fetch_workers=env.workers)
+                else:
+                    created, failed = aloha.batch.generate_aibom_batch(model_ids, workers=env.workers, writer=writer)
+    finally:
+        aloha.batch.generate_aibom = original
+    seconds = time.perf_counter() - start
+    if pipeline:
+        latencies = [stats["seconds"] for stats in metrics.get_model_stats().values()]
+
+    boms = max(created, 1)
+    return {
+        "models": len(model_ids),
+        "failed": len(failed),
+        "seconds": round(seconds, 3),
+        "throughput": round(len(model_ids) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "requests_per_bom": round((hub.stats["requests"] - requests_before) / boms, 2),
+        "bytes_per_bom": round((hub.stats["bytes"] - bytes_before) / boms),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_single(env, hub, repeat):
+    """
+    Generates the AIBOM of a single model from cold caches, repeat times.
+    """
+    latencies = []
+    requests = 0
+    received = 0
+    for n in range(repeat):
+        env.reset(f"single-{n}")
+        requests_before = hub.stats["requests"]
+        bytes_before = hub.stats["bytes"]
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            generate_aibom(hub.recorded_ids[n % len(hub.recorded_ids)])
+        latencies.append(time.perf_counter() - start)
+        requests += hub.stats["requests"] - requests_before
+        received += hub.stats["bytes"] - bytes_before
+    return {
+        "models": repeat,
+        "failed": 0,
+        "seconds": round(sum(latencies), 3),
+        "throughput": round(repeat / sum(latencies), 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "requests_per_bom": round(requests / repeat, 2),
+        "bytes_per_bom": round(received / repeat),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_scenarios(args):
+    hub = MockHub(latency=args.latency, jitter=args.jitter)
+    results = {}
+    with MockHubServer(hub) as server, tempfile.TemporaryDirectory(prefix="aloha-bench-") as workdir:
+        env = Environment(server, workdir, args.workers)
+        results["single"] = run_single(env, hub, args.repeat)
+        batch = hub.synthetic_ids(100)
+        results["batch-100-cold"] = run_batch(env, hub, batch, "batch-100")
+        # Same cache directory: every Hub response is revalidated instead of downloaded again.
+        results["batch-100-warm"] = run_batch(env, hub, batch, "batch-100")
+        # The metadata comes from the paginated listing instead of one model API call per model.
+        results["discovery-100"] = run_batch(env, hub, lambda: iter_hub_models(author="bench", limit=100), "discovery-100")
+        # Base models shared by the whole batch are fetched once.
+        results["batch-100-lineage"] = run_batch(env, hub, batch, "batch-100-lineage", lineage_depth=3)
+        # Fetch, parse, assemble and serialize stages linked by bounded queues.
+        results["batch-100-pipeline"] = run_batch(env, hub, batch, "batch-100-pipeline", pipeline=True)
+        if args.full:
+            results["batch-10000"] = run_batch(env, hub, hub.synthetic_ids(10000), "batch-10000")
+    return results
+
+
+def compare(results, baseline):
+    """
+    :return: List of the regressions, as human readable strings
+    """
+    regressions = []
+    for scenario, metrics in results.items():
+        expected = baseline.get(scenario)
+        if expected is None:
+            continue
+        if metrics["failed"] > expected.get("failed", 0):
+            regressions.append(f"{scenario}: {metrics['failed']} models failed")
+        for metric, tolerance in TOLERANCES.items():
+            if metric not in expected or not expected[metric]:
+                continue
+            limit = expected[metric] * (1 + tolerance)
+            if metrics[metric] > limit:
+                regressions.append(f"{scenario}: {metric} {metrics[metric]} > {limit:.2f} (baseline {expected[metric]})")
+    return regressions
+
+
+def print_results(results):
+    columns = ["models", "failed", "seconds", "throughput", "p50_ms", "p99_ms", "requests_per_bom", "bytes_per_bom", "peak_rss_mb"]
+    print(f"{'scenario':<16}" + "".join(f"{column:>18}" for column in columns))
+    for scenario, metrics in results.items():
+        print(f"{scenario:<16}" + "".join(f"{metrics[column]:>18}" for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks of ALOHA against a local mock Hub.")
+    parser.add_argument("--full", action="store_true", help="Also run the batch of 10000 models")
+    parser.add_argument("--workers", type=int, default=8, help="Models processed concurrently in the batch scenarios")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold runs of the single model scenario")
+    parser.add_argument("--latency", type=float, default=5.0, help="Latency of every mock Hub response, in ms")
+    parser.add_argument("--jitter", type=float, default=2.0, help="Random extra latency, up to this many ms")
+    parser.add_argument("--output", type=str, default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH, help="Baseline to compare the results with")
+    parser.add_argument("--update-baseline", action="store_true", help="Record the results as the new baseline")
+    args = parser.parse_args()
+
+    results = run_scenarios(args)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+            f.write("\n")
+        print(f"✅ Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline to record one.")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline)
+    for regression in regressions:
+        print(f"❌ Regression: {regression}")
+    if not regressions:
+        print("✅ No regression against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
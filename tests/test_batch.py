@@ -0,0 +1,60 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from aloha.batch import generate_aibom_batch
+from aloha.exceptions import FetchError
+
+
+class ListWriter:
+    def __init__(self):
+        self.written = []
+
+    def write(self, aibom, model_id):
+        self.written.append(model_id)
+        return model_id
+
+
+def fake_generate_aibom(model_id, session=None, data=None):
+    return {"metadata": {"component": {"name": model_id}}}
+
+
+class BatchTest(unittest.TestCase):
+
+    def run_batch(self, models, writer, workers=2):
+        with mock.patch("aloha.batch.generate_aibom", fake_generate_aibom), contextlib.redirect_stdout(io.StringIO()):
+            return generate_aibom_batch(models, workers=workers, writer=writer)
+
+    def test_input_failure_writes_the_models_already_read(self):
+        def models():
+            for n in range(20):
+                yield f"acme/model-{n}"
+            raise FetchError("page 3 of the listing failed")
+
+        writer = ListWriter()
+        with self.assertRaises(FetchError):
+            self.run_batch(models(), writer)
+        self.assertEqual(sorted(writer.written), sorted(f"acme/model-{n}" for n in range(20)))
+
+    def test_aiboms_are_written_while_the_input_is_read(self):
+        writer = ListWriter()
+        written_while_reading = []
+
+        def models():
+            for n in range(100):
+                written_while_reading.append(len(writer.written))
+                yield f"acme/model-{n}"
+
+        created, failed = self.run_batch(models(), writer, workers=2)
+        self.assertEqual((created, failed), (100, []))
+        # At most 2 * workers models are in flight: the last models are read after most AIBOMs were written.
+        self.assertGreaterEqual(written_while_reading[-1], 100 - 2 * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from aloha.catalog import Catalog
+from aloha.exceptions import ALOHAError
+
+
+def make_aibom(model_id, license_entry):
+    return {
+        "bomFormat": "CycloneDX",
+        "metadata": {"component": {"type": "machine-learning-model", "bom-ref": f"{model_id}-ref", "name": model_id,
+                                   "licenses": [{"license": license_entry}]}},
+        "components": [{"type": "data", "bom-ref": "wikipedia-ref", "name": "wikipedia"}],
+    }
+
+
+class FailingConnection:
+    """SQLite connection whose inserts of data references fail, as if the database was locked."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def __enter__(self):
+        return self.connection.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self.connection.__exit__(*exc_info)
+
+    def executemany(self, sql, rows):
+        raise sqlite3.OperationalError("database is locked")
+
+
+class CatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "catalog.sqlite")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def licenses(self, catalog):
+        return catalog.query("SELECT m.model_id, l.spdx_id, l.name FROM licenses l JOIN models m ON m.id = l.model ORDER BY m.model_id")
+
+    def test_model_repeated_in_a_batch(self):
+        # The same model twice in one batch, with another model in between: the last AIBOM wins.
+        with Catalog(self.path) as catalog:
+            catalog.add_all([make_aibom("a/b", {"id": "MIT"}), make_aibom("c/d", {"id": "MIT"}), make_aibom("a/b", {"name": "llama2"})])
+            self.assertEqual(catalog.count_models(), 2)
+            self.assertEqual(self.licenses(catalog), [
+                {"model_id": "a/b", "spdx_id": None, "name": "llama2"},
+                {"model_id": "c/d", "spdx_id": "MIT", "name": None},
+            ])
+            self.assertEqual(len(catalog.run("dataset", "wikipedia")), 2)
+
+    def test_model_repeated_adjacently_in_a_batch(self):
+        with Catalog(self.path) as catalog:
+            catalog.add_all([make_aibom("a/b", {"id": "MIT"}), make_aibom("a/b", {"name": "llama2"})])
+            self.assertEqual(self.licenses(catalog), [{"model_id": "a/b", "spdx_id": None, "name": "llama2"}])
+            self.assertEqual(len(catalog.run("dataset", "wikipedia")), 1)
+
+    def test_model_replaced_across_batches(self):
+        with Catalog(self.path, batch_size=1) as catalog:
+            catalog.add_all([make_aibom("a/b", {"id": "MIT"}), make_aibom("a/b", {"name": "llama2"})])
+            self.assertEqual(self.licenses(catalog), [{"model_id": "a/b", "spdx_id": None, "name": "llama2"}])
+            self.assertEqual(len(catalog.run("dataset", "wikipedia")), 1)
+
+    def test_failed_batch_stays_queued(self):
+        with Catalog(self.path) as catalog:
+            catalog.add(make_aibom("a/b", {"id": "MIT"}))
+            catalog.add(make_aibom("c/d", {"id": "MIT"}))
+            connection = catalog._connection
+            catalog._connection = FailingConnection(connection)
+            with self.assertRaises(ALOHAError):
+                catalog.flush()
+            catalog._connection = connection
+            self.assertEqual(catalog.count_models(), 0) # The transaction was rolled back.
+            catalog.flush()
+            self.assertEqual(catalog.count_models(), 2)
+            self.assertEqual(len(catalog.run("dataset", "wikipedia")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import tempfile
+import unittest
+from unittest import mock
+
+from aloha.dataset import DatasetRegistry
+from aloha.limits import configure_limits, get_limits
+
+
+class DatasetStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.limits = get_limits()
+        self.workdir = tempfile.TemporaryDirectory()
+        self.generated = []
+
+    def tearDown(self):
+        configure_limits(**self.limits)
+        self.workdir.cleanup()
+
+    def get(self, dataset_ID):
+        def generate_dataset_component(dataset_ID, revision=None, transport=None):
+            self.generated.append(dataset_ID)
+            return {"type": "data", "name": dataset_ID}
+        # A new registry for each run, sharing the store.
+        with mock.patch("aloha.dataset.generate_dataset_component", generate_dataset_component):
+            return DatasetRegistry(store_dir=self.workdir.name).get(dataset_ID)
+
+    def test_stored_component_is_reused_with_the_same_caps(self):
+        self.get("a/b")
+        self.get("a/b")
+        self.assertEqual(self.generated, ["a/b"])
+
+    def test_stored_component_is_not_reused_with_other_caps(self):
+        self.get("a/b")
+        configure_limits(data_files=self.limits["data_files"] + 1)
+        self.get("a/b")
+        configure_limits(**self.limits)
+        self.get("a/b")
+        self.assertEqual(self.generated, ["a/b", "a/b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import json
+import os
+import tempfile
+import unittest
+
+from aloha.diff import diff_aibom_sources, diff_aiboms
+
+
+def make_aibom(model_id="a/b"):
+    return {
+        "bomFormat": "CycloneDX",
+        "specVersion": "1.6",
+        "serialNumber": "urn:uuid:00000000-0000-0000-0000-000000000001",
+        "version": 1,
+        "metadata": {
+            "timestamp": "2024-01-01T00:00:00+00:00",
+            "component": {
+                "type": "machine-learning-model", "bom-ref": f"{model_id}-ref", "name": model_id,
+                "licenses": [{"license": {"id": "MIT"}}, {"license": {"name": "llama2"}}],
+                "tags": ["text-generation", "llama", "en"],
+                "modelCard": {
+                    "modelParameters": {"task": "text-generation", "datasets": [{"ref": "wikipedia-ref"}, {"ref": "c4-ref"}]},
+                    "properties": [{"name": "library_name", "value": "transformers"}, {"name": "base_model", "value": "org/base"}],
+                    "quantitativeAnalysis": {"performanceMetrics": [
+                        {"slice": "dataset: mmlu", "type": "accuracy", "value": 0.5},
+                        {"slice": "dataset: gsm8k", "type": "accuracy", "value": 0.25},
+                    ]},
+                },
+            },
+        },
+        "components": [
+            {"type": "data", "bom-ref": "wikipedia-ref", "name": "wikipedia"},
+            {"type": "data", "bom-ref": "c4-ref", "name": "c4"},
+        ],
+        "dependencies": [{"ref": f"{model_id}-ref", "dependsOn": ["org/base-ref", "org/other-ref"]}],
+    }
+
+
+def reorder(aibom):
+    # Every list in reverse order, and the volatile fields set anew: an equivalent AIBOM.
+    def reverse(node):
+        if isinstance(node, dict):
+            return {key: reverse(value) for key, value in reversed(list(node.items()))}
+        if isinstance(node, list):
+            return [reverse(item) for item in reversed(node)]
+        return node
+    aibom = reverse(aibom)
+    aibom["serialNumber"] = "urn:uuid:00000000-0000-0000-0000-000000000002"
+    aibom["version"] = 2
+    aibom["metadata"]["timestamp"] = "2024-06-01T00:00:00+00:00"
+    return aibom
+
+
+class DiffAibomsTest(unittest.TestCase):
+
+    def test_identical(self):
+        self.assertEqual(diff_aiboms(make_aibom(), make_aibom()), [])
+
+    def test_reordered_arrays_are_unchanged(self):
+        self.assertEqual(diff_aiboms(make_aibom(), reorder(make_aibom())), [])
+
+    def test_bom_hash_is_ignored(self):
+        old, new = make_aibom(), make_aibom()
+        old["metadata"]["properties"] = [{"name": "bomHash", "value": "1"}]
+        new["metadata"]["properties"] = [{"name": "bomHash", "value": "2"}]
+        self.assertEqual(diff_aiboms(old, new), [])
+
+    def test_component_added_and_removed(self):
+        old, new = make_aibom(), make_aibom()
+        new["components"][1] = {"type": "data", "bom-ref": "pile-ref", "name": "pile"}
+        self.assertEqual(diff_aiboms(old, new), [
+            {"op": "removed", "path": "", "component": "c4-ref", "old": {"type": "data", "bom-ref": "c4-ref", "name": "c4"}},
+            {"op": "added", "path": "", "component": "pile-ref", "new": {"type": "data", "bom-ref": "pile-ref", "name": "pile"}},
+        ])
+
+    def test_changed_fields(self):
+        old, new = make_aibom(), reorder(make_aibom())
+        component = new["metadata"]["component"]
+        component["modelCard"]["modelParameters"]["task"] = "text2text-generation"
+        next(prop for prop in component["modelCard"]["properties"] if prop["name"] == "library_name")["value"] = "gguf"
+        next(metric for metric in component["modelCard"]["quantitativeAnalysis"]["performanceMetrics"] if metric["slice"] == "dataset: mmlu")["value"] = 0.75
+        component["tags"].remove("en")
+        component["licenses"].append({"license": {"id": "Apache-2.0"}})
+        new["dependencies"][0]["dependsOn"].remove("org/other-ref")
+        changes = diff_aiboms(old, new)
+        self.assertCountEqual(changes, [
+            {"op": "changed", "path": "modelCard.modelParameters.task", "component": "a/b-ref", "old": "text-generation", "new": "text2text-generation"},
+            {"op": "changed", "path": "modelCard.properties[library_name].value", "component": "a/b-ref", "old": "transformers", "new": "gguf"},
+            {"op": "changed", "path": "modelCard.quantitativeAnalysis.performanceMetrics[dataset: mmlu][accuracy].value", "component": "a/b-ref",
+             "old": 0.5, "new": 0.75},
+            {"op": "removed", "path": "tags", "component": "a/b-ref", "old": "en"},
+            {"op": "added", "path": "licenses[Apache-2.0]", "component": "a/b-ref", "new": {"license": {"id": "Apache-2.0"}}},
+            {"op": "removed", "path": "dependencies[a/b-ref].dependsOn", "old": "org/other-ref"},
+        ])
+
+    def test_field_added_and_removed(self):
+        old, new = make_aibom(), make_aibom()
+        del new["metadata"]["component"]["tags"]
+        new["metadata"]["component"]["description"] = "A model"
+        self.assertEqual(diff_aiboms(old, new), [
+            {"op": "removed", "path": "tags", "component": "a/b-ref", "old": ["text-generation", "llama", "en"]},
+            {"op": "added", "path": "description", "component": "a/b-ref", "new": "A model"},
+        ])
+
+    def test_null_components_are_ignored(self):
+        old, new = make_aibom(), make_aibom()
+        old["components"].append(None)
+        self.assertEqual(diff_aiboms(old, new), [])
+
+
+class DiffSourcesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def outputs(self):
+        changed = make_aibom("org/changed")
+        changed["metadata"]["component"]["tags"].append("new-tag")
+        old = {"org/same": make_aibom("org/same"), "org/reordered": make_aibom("org/reordered"),
+               "org/changed": make_aibom("org/changed"), "org/removed": make_aibom("org/removed")}
+        new = {"org/same": make_aibom("org/same"), "org/reordered": reorder(make_aibom("org/reordered")),
+               "org/changed": changed, "org/added": make_aibom("org/added")}
+        return old, new
+
+    def statuses(self, old_path, new_path):
+        entries = {entry["model"]: entry for entry in diff_aibom_sources(old_path, new_path)}
+        self.assertEqual(entries["org/changed"]["changes"], [{"op": "added", "path": "tags", "component": "org/changed-ref", "new": "new-tag"}])
+        return {model_id: entry["status"] for model_id, entry in entries.items()}
+
+    def expected(self):
+        return {"org/same": "unchanged", "org/reordered": "unchanged", "org/changed": "changed", "org/removed": "removed", "org/added": "added"}
+
+    def test_directories(self):
+        paths = []
+        for name, aiboms in zip(("old", "new"), self.outputs()):
+            path = os.path.join(self.workdir.name, name)
+            os.makedirs(path)
+            for model_id, aibom in aiboms.items():
+                with open(os.path.join(path, model_id.replace("/", "_") + ".json"), "w", encoding="utf-8") as f:
+                    json.dump(aibom, f, indent=2)
+            paths.append(path)
+        self.assertEqual(self.statuses(*paths), self.expected())
+
+    def test_ndjson(self):
+        paths = []
+        for name, aiboms in zip(("old", "new"), self.outputs()):
+            path = os.path.join(self.workdir.name, f"{name}.ndjson")
+            with open(path, "w", encoding="utf-8") as f:
+                # The new output lists the models in another order.
+                for aibom in (aiboms.values() if name == "old" else reversed(list(aiboms.values()))):
+                    f.write(json.dumps(aibom) + "\n")
+            paths.append(path)
+        self.assertEqual(self.statuses(*paths), self.expected())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from aloha.batch import generate_aibom_batch
+from aloha.discovery import iter_hub_models
+from aloha.exceptions import FetchError
+from aloha.pipeline import Pipeline, generate_aibom_pipeline
+
+PAGE_SIZE = 10
+
+
+class ListWriter:
+    def __init__(self):
+        self.written = []
+
+    def encode(self, aibom):
+        return aibom
+
+    def write(self, aibom, model_id):
+        self.written.append(model_id)
+        return model_id
+
+    write_encoded = write
+
+
+def fake_generate_aibom(model_id, session=None, data=None):
+    return {"metadata": {"component": {"name": model_id}}}
+
+
+def failing_listing():
+    """Listing whose first two pages are returned, and whose third page fails."""
+    def get_listing_page(url, params, transport):
+        page = 0 if params is not None else int(url.rsplit("=", 1)[1])
+        if page == 2:
+            raise FetchError(f"Failed to list the models ({url}): status code 502")
+        records = [{"id": f"acme/model-{page * PAGE_SIZE + n}"} for n in range(PAGE_SIZE)]
+        return records, f"https://huggingface.co/api/models?cursor={page + 1}"
+    return mock.patch("aloha.discovery._get_listing_page", get_listing_page)
+
+
+def fake_fetch(self, job):
+    job.value = ("", ([], [], []))
+
+
+class DiscoveryTest(unittest.TestCase):
+
+    expected = sorted(f"acme/model-{n}" for n in range(2 * PAGE_SIZE))
+
+    def test_listing_failure_is_raised_after_the_pages_read(self):
+        with failing_listing():
+            models = iter_hub_models(author="acme", page_size=PAGE_SIZE)
+            self.assertEqual(len([next(models) for _ in range(2 * PAGE_SIZE)]), 2 * PAGE_SIZE)
+            with self.assertRaises(FetchError):
+                next(models)
+
+    def test_listing_failure_in_batch_mode(self):
+        writer = ListWriter()
+        with failing_listing(), mock.patch("aloha.batch.generate_aibom", fake_generate_aibom), contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(FetchError):
+                generate_aibom_batch(iter_hub_models(author="acme", page_size=PAGE_SIZE), workers=2, writer=writer)
+        self.assertEqual(sorted(writer.written), self.expected)
+
+    def test_listing_failure_in_pipeline_mode(self):
+        writer = ListWriter()
+        with failing_listing(), mock.patch.object(Pipeline, "_fetch", fake_fetch), contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(FetchError):
+                generate_aibom_pipeline(iter_hub_models(author="acme", page_size=PAGE_SIZE), writer=writer, fetch_workers=2, queue_size=4)
+        self.assertEqual(sorted(writer.written), self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
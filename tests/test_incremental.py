@@ -0,0 +1,64 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from aloha.incremental import Manifest
+
+
+class ManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "manifest.json")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def load(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            manifest = Manifest(self.path)
+        return manifest, output.getvalue()
+
+    def test_round_trip(self):
+        manifest, _ = self.load()
+        manifest.update("a/b", {"sha": "1", "version": 1})
+        manifest.save()
+        manifest, output = self.load()
+        self.assertEqual(manifest.get("a/b"), {"sha": "1", "version": 1})
+        self.assertEqual(output, "")
+
+    def test_invalid_manifest_starts_empty(self):
+        for content in ('{"a/b": {"sha": ', '["a/b"]', "\udcff"):
+            with self.subTest(content):
+                with open(self.path, "w", encoding="utf-8", errors="surrogateescape") as f:
+                    f.write(content)
+                manifest, output = self.load()
+                self.assertIsNone(manifest.get("a/b"))
+                self.assertIn("❌", output)
+                # The next save replaces the invalid manifest.
+                manifest.update("c/d", {"sha": "2"})
+                manifest.save()
+                self.assertEqual(json.load(open(self.path, encoding="utf-8")), {"c/d": {"sha": "2"}})
+
+    def test_failed_save_keeps_the_previous_manifest(self):
+        manifest, _ = self.load()
+        manifest.update("a/b", {"sha": "1"})
+        manifest.save()
+        manifest.update("c/d", {"sha": "2"})
+        with mock.patch("aloha.utils.os.replace", side_effect=OSError("disk full")), self.assertRaises(OSError):
+            manifest.save()
+        self.assertEqual(os.listdir(self.workdir.name), ["manifest.json"])
+        self.assertEqual(self.load()[0].get("c/d"), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
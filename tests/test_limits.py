@@ -0,0 +1,81 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import importlib.util
+import io
+import json
+import unittest
+
+from aloha.bom import _performance_metrics, _performance_metrics_omitted, _tags, _tags_omitted
+from aloha.dataset import _config_properties
+from aloha.limits import _decode_capped, configure_limits, dataset_decode_caps, get_limits, model_decode_caps
+
+
+def data_files(n, paths):
+    return {"split": f"split-{n}", "path": paths}
+
+
+DATASET_CONFIGS = {
+    "empty paths first": [{"config_name": "default", "data_files": [data_files(n, []) for n in range(6)] + [data_files(6, ["a", "b", "c"])]}],
+    "single split": [{"config_name": "default", "data_files": data_files(0, [f"shard-{n}" for n in range(10)])}],
+    "single pattern": [{"config_name": "default", "data_files": "data/*.parquet"}],
+    "mixed entries": [{"config_name": "default", "data_files": ["data/*.csv", {"split": "test"}, data_files(2, "one.csv"),
+                                                               data_files(3, ["x", "y"]), "more/*.csv", data_files(5, ["z"] * 3)]}],
+    "many configs": [{"config_name": f"config-{c}", "data_files": [data_files(n, [f"{c}-{n}-{k}" for k in range(c)]) for n in range(c)]}
+                     for c in range(8)],
+}
+
+MODEL_INDEXES = {
+    "results without metrics first": [{"name": "m", "results": [{"dataset": {"type": f"d{n}"}} for n in range(6)] +
+                                       [{"dataset": {"type": "d6"}, "metrics": [{"type": "accuracy", "value": 0.5}] * 3}]}],
+    "many metrics": [{"name": "m", "results": [{"dataset": {"type": f"d{n}", "split": "test"},
+                                                "metrics": [{"type": f"metric-{k}", "value": k} for k in range(n)]} for n in range(9)]}],
+    "several entries": [{"name": f"m{e}", "results": [{"dataset": {"type": "d"}, "metrics": [{"type": "f1", "value": 1}] * 4}] * 3}
+                        for e in range(3)],
+}
+
+
+@unittest.skipUnless(importlib.util.find_spec("ijson"), "ijson is not installed")
+class DecodeCappedTest(unittest.TestCase):
+    """The summaries of a document decoded with caps are the same as those of the whole document."""
+
+    def setUp(self):
+        self.limits = get_limits()
+        configure_limits(performance_metrics=5, tags=3, configs=3, data_files=4)
+
+    def tearDown(self):
+        configure_limits(**self.limits)
+
+    def decode(self, document, caps):
+        import ijson
+        body = json.dumps(document).encode()
+        return _decode_capped(ijson.parse(io.BytesIO(body), use_float=True), caps), json.loads(body)
+
+    def test_dataset_configs(self):
+        for name, configs in DATASET_CONFIGS.items():
+            with self.subTest(name):
+                streamed, loaded = self.decode({"id": "a/b", "cardData": {"configs": configs}}, dataset_decode_caps())
+                self.assertEqual(_config_properties(streamed["cardData"]["configs"]), _config_properties(loaded["cardData"]["configs"]))
+
+    def test_model_index_and_tags(self):
+        for name, model_index in MODEL_INDEXES.items():
+            with self.subTest(name):
+                record = {"id": "a/b", "tags": [f"tag-{n}" for n in range(7)], "cardData": {"model-index": model_index}}
+                streamed, loaded = self.decode(record, model_decode_caps())
+                for summary in (_performance_metrics, _performance_metrics_omitted):
+                    self.assertEqual(summary(streamed["cardData"]["model-index"]), summary(loaded["cardData"]["model-index"]))
+                for summary in (_tags, _tags_omitted):
+                    self.assertEqual(summary(streamed["tags"]), summary(loaded["tags"]))
+
+    def test_listing_items(self):
+        listing = [{"id": f"a/{n}", "tags": ["x"] * n, "cardData": {"model-index": MODEL_INDEXES["many metrics"]}} for n in range(5)]
+        streamed, loaded = self.decode(listing, model_decode_caps("item."))
+        for streamed_record, loaded_record in zip(streamed, loaded, strict=True):
+            self.assertEqual(_tags_omitted(streamed_record["tags"]), _tags_omitted(loaded_record["tags"]))
+            self.assertEqual(_performance_metrics_omitted(streamed_record["cardData"]["model-index"]),
+                             _performance_metrics_omitted(loaded_record["cardData"]["model-index"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import collections
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from aloha.bom import assemble_aibom
+from aloha.exceptions import ModelNotFoundError
+from aloha.lineage import LineageRegistry
+from aloha.utils import generate_bom_ref
+
+
+def model(model_id, base_model=None, relation=None):
+    card_data = {}
+    if base_model:
+        card_data["base_model"] = base_model
+    if relation:
+        card_data["base_model_relation"] = relation
+    return {"id": model_id, "cardData": card_data}
+
+
+def component(data, readme=None, transport=None):
+    properties = [{"name": "base_model_relation", "value": data["cardData"]["base_model_relation"]}] if "base_model_relation" in data["cardData"] else []
+    return {"type": "machine-learning-model", "bom-ref": generate_bom_ref(data["id"]), "name": data["id"], "modelCard": {"properties": properties}}
+
+
+class LineageTest(unittest.TestCase):
+
+    def resolve(self, models, root_id, max_depth):
+        fetched = collections.Counter()
+
+        def get_model_data(model_id, transport=None):
+            fetched[model_id] += 1
+            if model_id not in models:
+                raise ModelNotFoundError(model_id)
+            return models[model_id]
+
+        root = models[root_id]
+        with mock.patch("aloha.lineage.get_model_data", get_model_data), mock.patch("aloha.lineage.generate_cyclonedx_component", component), \
+                contextlib.redirect_stdout(io.StringIO()):
+            ancestors, dependencies = LineageRegistry().resolve(root, max_depth=max_depth)
+        return assemble_aibom(component(root), [], ancestors, dependencies), fetched
+
+    def edges(self, aibom):
+        return {(dependency["ref"], ref) for dependency in aibom.get("dependencies", []) for ref in dependency["dependsOn"]}
+
+    def relations(self, aibom):
+        return {prop["name"]: prop["value"] for prop in aibom["metadata"].get("properties", []) if prop["name"].startswith("base_model_relation:")}
+
+    def test_diamond(self):
+        # A merge of two fine-tunes of the same base model: the base is fetched and added once.
+        models = {
+            "org/merge": model("org/merge", ["org/chat", "org/code"], "merge"),
+            "org/chat": model("org/chat", "org/base", "finetune"),
+            "org/code": model("org/code", "org/base", "finetune"),
+            "org/base": model("org/base"),
+        }
+        aibom, fetched = self.resolve(models, "org/merge", max_depth=5)
+        ref = generate_bom_ref
+        self.assertEqual(fetched, {"org/chat": 1, "org/code": 1, "org/base": 1})
+        self.assertEqual([c["name"] for c in aibom["components"]], ["org/chat", "org/code", "org/base"])
+        self.assertEqual(self.edges(aibom), {(ref("org/merge"), ref("org/chat")), (ref("org/merge"), ref("org/code")),
+                                             (ref("org/chat"), ref("org/base")), (ref("org/code"), ref("org/base"))})
+        self.assertEqual(aibom["metadata"]["component"]["pedigree"]["ancestors"], [
+            {"type": "machine-learning-model", "bom-ref": ref(name), "name": name} for name in ("org/chat", "org/code", "org/base")])
+        self.assertEqual(self.relations(aibom), {
+            "base_model_relation:org/chat->org/merge": "merge",
+            "base_model_relation:org/code->org/merge": "merge",
+            "base_model_relation:org/base->org/chat": "finetune",
+            "base_model_relation:org/base->org/code": "finetune",
+        })
+
+    def test_depth_cut_off(self):
+        models = {
+            "org/gguf": model("org/gguf", "org/instruct", "quantized"),
+            "org/instruct": model("org/instruct", "org/base", "finetune"),
+            "org/base": model("org/base", "org/older", "finetune"),
+            "org/older": model("org/older"),
+        }
+        aibom, fetched = self.resolve(models, "org/gguf", max_depth=2)
+        ref = generate_bom_ref
+        self.assertEqual(fetched, {"org/instruct": 1, "org/base": 1})
+        self.assertEqual([c["name"] for c in aibom["components"]], ["org/instruct", "org/base"])
+        self.assertEqual(self.edges(aibom), {(ref("org/gguf"), ref("org/instruct")), (ref("org/instruct"), ref("org/base"))})
+        self.assertEqual([a["name"] for a in aibom["metadata"]["component"]["pedigree"]["ancestors"]], ["org/instruct", "org/base"])
+        self.assertEqual(self.relations(aibom), {
+            "base_model_relation:org/instruct->org/gguf": "quantized",
+            "base_model_relation:org/base->org/instruct": "finetune",
+        })
+
+    def test_inaccessible_base_model(self):
+        models = {"org/tune": model("org/tune", ["org/gated", "org/base"], "adapter"), "org/base": model("org/base")}
+        aibom, _ = self.resolve(models, "org/tune", max_depth=1)
+        self.assertEqual([a["name"] for a in aibom["metadata"]["component"]["pedigree"]["ancestors"]], ["org/base"])
+        self.assertEqual(self.relations(aibom), {"base_model_relation:org/base->org/tune": "adapter"})
+
+    def test_memoized_models_expire(self):
+        models = {"org/base": model("org/base")}
+        loaded = []
+
+        def get_model_data(model_id, transport=None):
+            loaded.append(model_id)
+            if model_id not in models:
+                raise ModelNotFoundError(model_id)
+            return models[model_id]
+
+        with mock.patch("aloha.lineage.get_model_data", get_model_data), mock.patch("aloha.lineage.generate_cyclonedx_component", component), \
+                contextlib.redirect_stdout(io.StringIO()):
+            registry = LineageRegistry()
+            self.assertIsNone(registry.get("org/gated"))
+            self.assertIsNotNone(registry.get("org/base"))
+            registry.get("org/base")
+            self.assertEqual(loaded, ["org/gated", "org/base"])
+            # Once expired, a model is loaded again: a model that was not accessible can now be resolved.
+            models["org/gated"] = model("org/gated")
+            registry.ttl = 0
+            self.assertIsNotNone(registry.get("org/gated"))
+            registry.get("org/base")
+            self.assertEqual(loaded, ["org/gated", "org/base", "org/gated", "org/base"])
+
+    def test_no_lineage(self):
+        aibom, fetched = self.resolve({"org/base": model("org/base", "org/older")}, "org/base", max_depth=0)
+        self.assertEqual(fetched, {})
+        self.assertNotIn("pedigree", aibom["metadata"]["component"])
+        self.assertNotIn("dependencies", aibom)
+
+
+if __name__ == "__main__":
+    unittest.main()
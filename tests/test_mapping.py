@@ -0,0 +1,77 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Golden tests of the mapping of the Hub metadata to CycloneDX components.
+
+tests/golden holds recorded model and dataset records (with variants of their card data: licenses,
+emissions, base models, subsets with many data files...) and the components generated from them
+before the mappings were declared as aloha.mapping fields. The components must stay the same, field by field.
+"""
+
+import contextlib
+import io
+import json
+import os
+import unittest
+from unittest import mock
+
+from aloha.bom import generate_cyclonedx_component
+from aloha.dataset import generate_dataset_component
+from aloha.licenses import configure_spdx_license_index
+from aloha.readme import ModelReadme
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+
+def load_golden(name):
+    with open(os.path.join(GOLDEN_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode("utf-8")
+
+
+class MappingGoldenTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        configure_spdx_license_index(snapshot=os.path.join(GOLDEN_DIR, "spdx_licenses.json"))
+
+    @classmethod
+    def tearDownClass(cls):
+        configure_spdx_license_index()
+
+    def assertSameComponent(self, component, expected):
+        self.assertEqual(sorted(component), sorted(expected))
+        for field in expected:
+            with self.subTest(field=field):
+                self.assertEqual(component[field], expected[field])
+
+    def test_model_components(self):
+        expected = load_golden("models_expected.json")
+        for model_id, record in load_golden("models.json").items():
+            for readme, text in (("readme", record["readme"]), ("no_readme", "")):
+                with self.subTest(model_id=model_id, readme=readme):
+                    self.assertSameComponent(generate_cyclonedx_component(record["data"], ModelReadme(text)), expected[model_id][readme])
+
+    def test_dataset_components(self):
+        expected = load_golden("datasets_expected.json")
+        for dataset_id, response in load_golden("datasets.json").items():
+            with self.subTest(dataset_id=dataset_id):
+                get = lambda url, revision, transport: Response(response["status"], response["body"])  # noqa: E731
+                with mock.patch("aloha.dataset.http_get_cached", get), contextlib.redirect_stdout(io.StringIO()):
+                    component = generate_dataset_component(dataset_id)
+                self.assertSameComponent(component, expected[dataset_id])
+                # The dataset description itself (contents, governance...), field by field.
+                self.assertEqual(len(component["data"]), len(expected[dataset_id]["data"]))
+                for dataset, expected_dataset in zip(component["data"], expected[dataset_id]["data"]):
+                    self.assertSameComponent(dataset, expected_dataset)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import json
+import os
+import tempfile
+import unittest
+
+from aloha.metrics import Metrics
+
+
+class MetricsTest(unittest.TestCase):
+
+    def generate(self, metrics, model_id, requests=1):
+        with metrics.span("generate_aibom", model_id):
+            metrics.count("http_requests", requests)
+
+    def test_model_totals_are_capped(self):
+        metrics = Metrics(max_models=3)
+        for n in range(10):
+            self.generate(metrics, f"a/{n}")
+        self.assertEqual(sorted(metrics.get_model_stats()), ["a/7", "a/8", "a/9"])
+        self.assertEqual(metrics.get_model_count()[0], 10)
+        self.assertIn("aloha_models_total 10\n", metrics.format_prometheus())
+        self.assertIn("over 10 models", metrics.format_profile())
+
+    def test_least_recently_active_model_is_evicted(self):
+        metrics = Metrics(max_models=2)
+        self.generate(metrics, "a/1")
+        self.generate(metrics, "a/2")
+        self.generate(metrics, "a/1", requests=2)
+        self.generate(metrics, "a/3")
+        stats = metrics.get_model_stats()
+        self.assertEqual(sorted(stats), ["a/1", "a/3"])
+        self.assertEqual(stats["a/1"]["http_requests"], 3)
+
+    def test_evicted_models_are_written_to_the_jsonl_file(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "metrics.jsonl")
+            metrics = Metrics(jsonl_path=path, max_models=2)
+            for n in range(5):
+                self.generate(metrics, f"a/{n}", requests=n)
+            metrics.close()
+            with open(path, "r", encoding="utf-8") as f:
+                models = [event for event in map(json.loads, f) if event["type"] == "model"]
+        self.assertEqual(sorted((event["model"], event["http_requests"]) for event in models), [(f"a/{n}", n) for n in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
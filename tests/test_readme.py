@@ -0,0 +1,81 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import unittest
+
+from aloha.readme import ModelReadme, get_front_matter, iter_sections
+
+
+def sections(text):
+    return list(iter_sections(text))
+
+
+class ReadmeScannerTest(unittest.TestCase):
+
+    def test_front_matter_is_skipped(self):
+        text = "---\nlicense: mit\n# not a heading\ntags:\n- a\n---\n# Model Card\nText\n"
+        self.assertEqual(sections(text), [("model card", ["Text"])])
+        self.assertEqual(get_front_matter(text), "license: mit\n# not a heading\ntags:\n- a")
+
+    def test_front_matter_closed_with_dots(self):
+        text = "---\nlicense: mit\n...\n# Model Card\nText"
+        self.assertEqual(sections(text), [("model card", ["Text"])])
+        self.assertEqual(get_front_matter(text), "license: mit")
+
+    def test_front_matter_only_at_the_top(self):
+        text = "# Model Card\n---\nlicense: mit\n"
+        self.assertIsNone(get_front_matter(text))
+        self.assertEqual(sections(text), [("model card", ["---", "license: mit"])])
+
+    def test_unclosed_front_matter(self):
+        self.assertIsNone(get_front_matter("---\nlicense: mit\n# Model Card\n"))
+        self.assertEqual(sections("---\nlicense: mit\n# Model Card\n"), [])
+
+    def test_headings_inside_code_fences_are_ignored(self):
+        text = "# Usage\n```python\n# a comment\nx = 1\n```\nAfter\n~~~~\n# other\n~~~\nstill code\n~~~~\n# Next\n"
+        self.assertEqual(sections(text), [
+            ("usage", ["```python", "# a comment", "x = 1", "```", "After", "~~~~", "# other", "~~~", "still code", "~~~~"]),
+            ("next", []),
+        ])
+
+    def test_fence_is_not_closed_by_the_other_marker(self):
+        text = "# Usage\n```\n~~~\n# code\n```\n# Next\nText"
+        self.assertEqual([title for title, _ in sections(text)], ["usage", "next"])
+
+    def test_unclosed_fence_runs_to_the_end(self):
+        self.assertEqual(sections("# Usage\n```\n# code\n"), [("usage", ["```", "# code"])])
+
+    def test_setext_headings(self):
+        text = "Model Card\n==========\nText\nUsage\n-----\nCode\n"
+        self.assertEqual(sections(text), [("model card", ["Text"]), ("usage", ["Code"])])
+
+    def test_setext_underline_inside_a_fence(self):
+        text = "# Usage\n```\ntext\n---\n```\n"
+        self.assertEqual(sections(text), [("usage", ["```", "text", "---", "```"])])
+
+    def test_headings_at_the_end(self):
+        self.assertEqual(sections("# Model Card\nText\n# Citation"), [("model card", ["Text"]), ("citation", [])])
+        self.assertEqual(sections("# Model Card\nText\n# Citation\n"), [("model card", ["Text"]), ("citation", [])])
+        self.assertEqual(sections("# Model Card\nText\nCitation\n---"), [("model card", ["Text"]), ("citation", [])])
+
+    def test_no_sections(self):
+        for text in ("", "\n\n", "Only a paragraph,\nwithout any heading.\n", "---\nlicense: mit\n---\nText"):
+            with self.subTest(text):
+                self.assertEqual(sections(text), [])
+                readme = ModelReadme(text)
+                self.assertEqual(readme.sections, {})
+                self.assertIsNone(readme.get_section(["model card"]))
+
+    def test_headings_are_normalized(self):
+        self.assertEqual(sections("## 🤗 Model   Description ##\nText"), [("model description", ["Text"])])
+
+    def test_first_matching_section_of_the_readme(self):
+        readme = ModelReadme("Intro\n# Description\nfirst\n# Model Card\nsecond\n# Description\nrepeated\n")
+        self.assertEqual(readme.get_section(["model card", "description"]), "first")
+        self.assertEqual(readme.get_section(["model card"]), "second")
+        self.assertIsNone(ModelReadme(None).get_section(["description"]))
+
+
+if __name__ == "__main__":
+    unittest.main()